@@ -2,6 +2,7 @@
 import os
 import glob
 import json
+from collections import OrderedDict
 import nibabel as nib
 import torch
 import torch.nn as nn
@@ -50,6 +51,74 @@ class LunaDataset(Dataset):
         return patch, target
 
 
+def convert_to_npy_store(nifti_folder, npy_folder, dtype=np.float32):
+    """
+    One-off preprocessing: decompress every .nii.gz into an uncompressed .npy
+    that can be memory-mapped. Volumes already converted (and newer than their
+    source) are skipped, so re-running is cheap.
+    """
+    os.makedirs(npy_folder, exist_ok=True)
+    converted = 0
+    for path in sorted(glob.glob(f"{nifti_folder}/*.nii.gz")):
+        name = os.path.basename(path)[:-len(".nii.gz")] + ".npy"
+        out = os.path.join(npy_folder, name)
+        if os.path.exists(out) and os.path.getmtime(out) >= os.path.getmtime(path):
+            continue
+        vol = np.asarray(nib.load(path).get_fdata(), dtype=dtype)
+        tmp = out + ".tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, vol)
+        os.replace(tmp, out)
+        converted += 1
+    print(f"NPY store: {converted} converted, {len(glob.glob(f'{npy_folder}/*.npy'))} total in {npy_folder}")
+    return npy_folder
+
+
+class MmapLunaDataset(Dataset):
+    """
+    LunaDataset over the .npy store: volumes are memory-mapped per worker
+    and a patch is sliced straight from the map, so only the patch's pages
+    are read. At most `max_open` maps stay open per worker (LRU); evicted
+    maps are dropped, which closes their file descriptor and mapping.
+    """
+    def __init__(self, folder, patch_size=(64,64,64), max_open=32):
+        self.files = sorted(glob.glob(f"{folder}/*.npy"))
+        self.patch_size = patch_size
+        self.max_open = max(1, max_open)
+        self._maps = OrderedDict()
+
+    def __len__(self):
+        return len(self.files)
+
+    def _volume(self, idx):
+        vol = self._maps.get(idx)
+        if vol is not None:
+            self._maps.move_to_end(idx)
+            return vol
+        vol = np.load(self.files[idx], mmap_mode="r")
+        self._maps[idx] = vol
+        if len(self._maps) > self.max_open:
+            self._maps.popitem(last=False)  # patches are copies, so nothing else holds the map
+        return vol
+
+    def __getitem__(self, idx):
+        vol = self._volume(idx)
+        D,H,W = vol.shape
+        dz, dy, dx = self.patch_size
+        startz = np.random.randint(0, max(D-dz,1))
+        starth = np.random.randint(0, max(H-dy,1))
+        startw = np.random.randint(0, max(W-dx,1))
+        patch = np.array(vol[startz:startz+dz, starth:starth+dy, startw:startw+dx], dtype=np.float32)
+        patch = torch.from_numpy(patch).unsqueeze(0)  # channel dim
+        target = torch.zeros_like(patch)  # placeholder segmentation
+        return patch, target
+
+
+def _seed_worker(worker_id):
+    # each DataLoader worker gets its own numpy RNG stream for random crops
+    np.random.seed(torch.initial_seed() % 2**32)
+
+
 class UNet3D(nn.Module):
     def __init__(self, in_channels=1, out_channels=1, base_features=16):
         super(UNet3D, self).__init__()
@@ -117,10 +186,28 @@ class UNet3D(nn.Module):
         return x
 
 
-def train_model(processed_folder, epochs=2, patch_size=(64,64,64)):
+def train_model(processed_folder, epochs=2, patch_size=(64,64,64),
+                npy_folder=None, num_workers=None, prefetch_factor=4):
+    """
+    npy_folder: if given, volumes are converted once into an .npy store there
+    and patches are read through MmapLunaDataset instead of decompressing
+    the NIfTI on every sample.
+    """
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    dataset = LunaDataset(processed_folder, patch_size)
-    dataloader = DataLoader(dataset, batch_size=1, shuffle=True)
+    if npy_folder:
+        convert_to_npy_store(processed_folder, npy_folder)
+        dataset = MmapLunaDataset(npy_folder, patch_size)
+    else:
+        dataset = LunaDataset(processed_folder, patch_size)
+
+    if num_workers is None:
+        num_workers = min(8, os.cpu_count() or 1)
+    loader_kwargs = {}
+    if num_workers > 0:
+        loader_kwargs = dict(prefetch_factor=prefetch_factor, persistent_workers=True,
+                             worker_init_fn=_seed_worker)
+    dataloader = DataLoader(dataset, batch_size=1, shuffle=True, num_workers=num_workers,
+                            pin_memory=device.type == "cuda", **loader_kwargs)
 
     model = UNet3D().to(device)
     optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
@@ -209,6 +296,7 @@ def infer_single_scan(model, scan_path, output_folder):
 
 if __name__ == "__main__":
     processed_folder = "LUNA16_preprocessed"  # path to preprocessed NIfTI
+    npy_folder = "LUNA16_npy"                  # uncompressed, memory-mappable copy
     output_folder = "output_results"
     
     print("=" * 60)
@@ -231,7 +319,7 @@ if __name__ == "__main__":
     else:
         print("\nStep 1: Training model on LUNA16 dataset...")
         print(f"Found {len(os.listdir(processed_folder))} scans")
-        model = train_model(processed_folder, epochs=2, patch_size=(64,64,64))
+        model = train_model(processed_folder, epochs=2, patch_size=(64,64,64), npy_folder=npy_folder)
         
         # Save trained model
         torch.save(model.state_dict(), model_path)
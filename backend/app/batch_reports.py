@@ -0,0 +1,444 @@
+# backend/app/batch_reports.py
+"""
+Batch Report Generation for Phase-3.
+
+Regenerates reports for a backlog of cases in one job (e.g. after a
+template or threshold change) instead of one /reports/generate call each:
+- Case IDs from arguments, a file, or a patient_ct_scans query
+- Findings streamed from local outputs or the Supabase 'ml_json' bucket
+- Bounded case pool on top of the shared render pool and report cache
+- PDFs uploaded to the 'reports' bucket; scan_results (bucket paths)
+  written back in bulk upserts
+- Throughput/failure summary and a checkpoint file to resume a partial run
+
+Usage (from backend/):
+    python -m app.batch_reports CASE_ID [CASE_ID ...]
+    python -m app.batch_reports --ids-file cases.txt
+    python -m app.batch_reports --status completed --limit 500
+    python -m app.batch_reports --status completed --resume app/.cache/batch/<job>.jsonl
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from app.supabase_client import supabase
+from app.audit import log
+from app.reporter import REPORTS_BUCKET, generate_all_reports
+from app.routes.reports import build_report_row
+from app.storage_service import save_local, upload_bytes
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+# Cases processed concurrently (PDF renders are capped separately by the pool)
+BATCH_REPORT_WORKERS = int(os.getenv("BATCH_REPORT_WORKERS", "4"))
+
+# scan_results rows per bulk upsert
+BATCH_UPSERT_SIZE = int(os.getenv("BATCH_UPSERT_SIZE", "50"))
+
+BATCH_STATE_DIR = Path(__file__).parent / ".cache" / "batch"
+OUTPUTS_DIR = Path(__file__).parent / "outputs"
+FINDINGS_DIR = Path(__file__).parent.parent.parent / "backend-dinesh" / "outputs"
+
+
+# =============================================================================
+# Case Selection
+# =============================================================================
+
+def iter_case_ids_from_file(path: str) -> Iterator[str]:
+    """Yield case IDs from a text file (one per line, # comments allowed)."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            case_id = line.split("#", 1)[0].strip()
+            if case_id:
+                yield case_id
+
+
+def iter_case_ids_from_query(
+    status: Optional[str] = None,
+    page_size: int = 500
+) -> Iterator[str]:
+    """
+    Yield case IDs from patient_ct_scans, newest first, one page at a time.
+
+    Args:
+        status: Only cases with this status (e.g. "completed")
+        page_size: Rows fetched per request
+    """
+    offset = 0
+    while True:
+        query = supabase.table("patient_ct_scans").select("id").order("uploaded_at", desc=True)
+        if status:
+            query = query.eq("status", status)
+        rows = query.range(offset, offset + page_size - 1).execute().data or []
+        for row in rows:
+            yield row["id"]
+        if len(rows) < page_size:
+            return
+        offset += page_size
+
+
+# =============================================================================
+# Findings
+# =============================================================================
+
+def fetch_findings(case_id: str) -> Optional[str]:
+    """
+    Get a local findings.json path for a case.
+
+    Looks in the pipeline outputs and the legacy locations first, then
+    downloads ml_json/{case_id}/findings.json from Supabase Storage into
+    the outputs directory (so later runs find it locally).
+
+    Returns:
+        Path to findings.json, or None if the case has none
+    """
+    local_path = OUTPUTS_DIR / case_id / f"{case_id}_findings.json"
+    for path in (
+        local_path,
+        FINDINGS_DIR / f"{case_id}_findings.json",
+        Path(__file__).parent / f"{case_id}_findings.json",
+    ):
+        if path.exists():
+            return str(path)
+
+    try:
+        content = supabase.storage.from_("ml_json").download(f"{case_id}/findings.json")
+    except Exception as e:
+        print(f"[batch] ⚠️ Findings download failed for {case_id}: {e}")
+        return None
+    if not content:
+        return None
+
+    local_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(local_path, "wb") as f:
+        f.write(content)
+    return str(local_path)
+
+
+# =============================================================================
+# Checkpoint
+# =============================================================================
+
+class BatchCheckpoint:
+    """
+    Append-only JSONL record of finished cases.
+
+    A case is recorded "ok" only after its scan_results row is written, so
+    resuming with the same file skips exactly the cases that are done and
+    retries everything that failed or never ran.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.done = set()
+        self._lock = threading.Lock()
+
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line from an interrupted run
+                    if entry.get("status") == "ok":
+                        self.done.add(entry["case_id"])
+                    else:
+                        self.done.discard(entry.get("case_id"))
+
+    def record(self, case_id: str, status: str, **info) -> None:
+        entry = {"case_id": case_id, "status": status,
+                 "at": datetime.utcnow().isoformat() + "Z", **info}
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            if status == "ok":
+                self.done.add(case_id)
+
+
+# =============================================================================
+# Per-Case Work
+# =============================================================================
+
+@dataclass
+class CaseResult:
+    """Outcome of regenerating one case's reports."""
+    case_id: str
+    status: str                      # "ok" or "failed"
+    reports: Dict[str, str] = field(default_factory=dict)  # report key → bucket path
+    error: str = ""
+    cache_hits: int = 0
+    rendered: int = 0
+    seconds: float = 0.0
+
+
+def process_case(case_id: str, patient_lang: str = "en", include_hindi: bool = True) -> CaseResult:
+    """
+    Generate one case's reports and upload them (never raises).
+
+    Each PDF goes to the 'reports' bucket at {case_id}/{file name}, the path
+    the frontend resolves from scan_results. A failed upload fails the case,
+    so a resumed run retries it.
+    """
+    t0 = time.perf_counter()
+    try:
+        findings_path = fetch_findings(case_id)
+        if not findings_path:
+            return CaseResult(case_id, "failed", error="findings not found",
+                              seconds=time.perf_counter() - t0)
+
+        cache_info = {}
+        reports = generate_all_reports(
+            findings_path,
+            patient_lang=patient_lang,
+            include_hindi=include_hindi,
+            cache_info=cache_info
+        )
+        errors = {k: v for k, v in reports.items() if "error" in k}
+
+        paths = {}
+        for key, path in reports.items():
+            if "error" in key:
+                continue
+            if not os.path.exists(path):
+                errors[f"{key}_error"] = "rendered PDF missing"
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            filename = os.path.basename(path)
+            save_local(case_id, filename, data)
+            storage_path = f"{case_id}/{filename}"
+            if upload_bytes(REPORTS_BUCKET, storage_path, data, upsert=True):
+                paths[key] = storage_path
+            else:
+                errors[f"{key}_error"] = "upload to reports bucket failed"
+
+        error = "; ".join(f"{k}: {v}" for k, v in errors.items())
+        if not paths:
+            error = error or "no reports generated"
+        return CaseResult(
+            case_id,
+            "failed" if error else "ok",
+            reports=paths,
+            error=error,
+            cache_hits=sum(1 for hit in cache_info.values() if hit),
+            rendered=sum(1 for hit in cache_info.values() if not hit),
+            seconds=time.perf_counter() - t0,
+        )
+    except Exception as e:
+        return CaseResult(case_id, "failed", error=str(e), seconds=time.perf_counter() - t0)
+
+
+# =============================================================================
+# Batch Job
+# =============================================================================
+
+class BatchReportJob:
+    """
+    Regenerate reports for a stream of case IDs.
+
+    Case IDs are consumed lazily with at most 2 x workers cases in flight,
+    so a query over the whole backlog never loads every case up front.
+    Results are collected on the calling thread and written to scan_results
+    in bulk upserts.
+    """
+
+    def __init__(
+        self,
+        patient_lang: str = "en",
+        include_hindi: bool = True,
+        workers: int = BATCH_REPORT_WORKERS,
+        upsert_size: int = BATCH_UPSERT_SIZE,
+        checkpoint: Optional[BatchCheckpoint] = None,
+        progress_every: int = 10
+    ):
+        self.patient_lang = patient_lang
+        self.include_hindi = include_hindi
+        self.workers = max(1, workers)
+        self.upsert_size = max(1, upsert_size)
+        self.checkpoint = checkpoint
+        self.progress_every = progress_every
+
+        self._pending: List[CaseResult] = []
+        self.failures: List[Dict] = []
+        self.counts = {"ok": 0, "failed": 0, "skipped": 0, "cache_hits": 0, "rendered": 0}
+        self._started = 0.0
+        self._last_progress = 0
+
+    def run(self, case_ids: Iterable[str]) -> Dict:
+        """
+        Process every case and return the job summary.
+
+        Returns:
+            Dict with counts, elapsed time, throughput and failures
+        """
+        self._started = time.perf_counter()
+        self._last_progress = 0
+        seen = set()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch-report") as pool:
+            in_flight = set()
+            for case_id in case_ids:
+                if case_id in seen:
+                    continue
+                seen.add(case_id)
+                if self.checkpoint and case_id in self.checkpoint.done:
+                    self.counts["skipped"] += 1
+                    continue
+
+                in_flight.add(pool.submit(process_case, case_id, self.patient_lang, self.include_hindi))
+                if len(in_flight) >= self.workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._collect(future.result())
+
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._collect(future.result())
+
+        self._flush()
+        summary = self.summary()
+        log(None, "batch_reports_complete", {k: v for k, v in summary.items() if k != "failures"})
+        return summary
+
+    def summary(self) -> Dict:
+        elapsed = time.perf_counter() - self._started
+        processed = self.counts["ok"] + self.counts["failed"]
+        return {
+            **self.counts,
+            "processed": processed,
+            "elapsed_s": round(elapsed, 2),
+            "cases_per_min": round(processed / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "failures": self.failures,
+        }
+
+    def _collect(self, result: CaseResult) -> None:
+        self.counts["cache_hits"] += result.cache_hits
+        self.counts["rendered"] += result.rendered
+
+        if result.reports:
+            # Partial sets are written too; the case stays failed so a resume retries it
+            self._pending.append(result)
+            if len(self._pending) >= self.upsert_size:
+                self._flush()
+        else:
+            self._finish(result)
+
+        # A flush finishes many cases at once, so compare against the last
+        # threshold printed rather than testing an exact multiple
+        processed = self.counts["ok"] + self.counts["failed"] + len(self._pending)
+        if self.progress_every and processed >= self._last_progress + self.progress_every:
+            self._last_progress = processed - processed % self.progress_every
+            elapsed = time.perf_counter() - self._started
+            print(f"[batch] {processed} cases, {self.counts['failed']} failed, "
+                  f"{processed / elapsed * 60:.1f} cases/min")
+
+    def _flush(self) -> None:
+        """
+        Bulk upsert the pending scan_results rows.
+
+        A bulk upsert sets columns missing from a row to NULL, so rows are
+        sent in groups with identical columns: a partial report set leaves
+        the paths of the reports it lacks untouched, as store_report_paths does.
+        """
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        groups: Dict[tuple, List] = {}
+        for result in batch:
+            row = build_report_row(result.case_id, result.reports, self.patient_lang)
+            groups.setdefault(tuple(sorted(row)), []).append((result, row))
+
+        for group in groups.values():
+            rows = [row for _, row in group]
+            try:
+                supabase.table("scan_results").upsert(rows, on_conflict="scan_id").execute()
+            except Exception as e:
+                print(f"[batch] ⚠️ Bulk upsert of {len(rows)} rows failed: {e}")
+                for result, _ in group:
+                    result.status = "failed"
+                    result.error = f"db upsert failed: {e}"
+        for result in batch:
+            self._finish(result)
+
+    def _finish(self, result: CaseResult) -> None:
+        self.counts[result.status] += 1
+        if result.status != "ok":
+            self.failures.append({"case_id": result.case_id, "error": result.error})
+            print(f"[batch] ❌ {result.case_id}: {result.error}")
+        if self.checkpoint:
+            self.checkpoint.record(
+                result.case_id, result.status,
+                error=result.error, seconds=round(result.seconds, 2)
+            )
+
+
+# =============================================================================
+# CLI Entry
+# =============================================================================
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Regenerate reports for many cases.")
+    parser.add_argument("case_ids", nargs="*", help="Case IDs to process")
+    parser.add_argument("--ids-file", help="File with one case ID per line")
+    parser.add_argument("--status", help="Select cases from patient_ct_scans with this status")
+    parser.add_argument("--limit", type=int, help="Max cases to select")
+    parser.add_argument("--lang", default="en", help="Patient report language")
+    parser.add_argument("--no-hindi", action="store_true", help="Skip the Hindi patient report")
+    parser.add_argument("--workers", type=int, default=BATCH_REPORT_WORKERS)
+    parser.add_argument("--upsert-size", type=int, default=BATCH_UPSERT_SIZE)
+    parser.add_argument("--resume", help="Checkpoint file of an earlier run to continue")
+    args = parser.parse_args()
+
+    if args.case_ids:
+        case_ids = iter(args.case_ids)
+    elif args.ids_file:
+        case_ids = iter_case_ids_from_file(args.ids_file)
+    elif args.status:
+        case_ids = iter_case_ids_from_query(args.status)
+    else:
+        parser.error("give case IDs, --ids-file or --status")
+    if args.limit:
+        case_ids = islice(case_ids, args.limit)
+
+    checkpoint_path = args.resume or BATCH_STATE_DIR / f"batch_{datetime.utcnow():%Y%m%dT%H%M%S}.jsonl"
+    checkpoint = BatchCheckpoint(checkpoint_path)
+    print(f"📝 Checkpoint: {checkpoint.path} ({len(checkpoint.done)} cases already done)")
+
+    job = BatchReportJob(
+        patient_lang=args.lang,
+        include_hindi=not args.no_hindi,
+        workers=args.workers,
+        upsert_size=args.upsert_size,
+        checkpoint=checkpoint,
+    )
+    summary = job.run(case_ids)
+
+    print(f"\n✅ OK: {summary['ok']}   ❌ Failed: {summary['failed']}   ⏭️  Skipped: {summary['skipped']}")
+    print(f"📄 PDFs rendered: {summary['rendered']}   ♻️  From cache: {summary['cache_hits']}")
+    print(f"⏱️  {summary['elapsed_s']}s  ({summary['cases_per_min']} cases/min)")
+    if summary["failures"]:
+        print("\nFailures:")
+        for failure in summary["failures"][:25]:
+            print(f"  • {failure['case_id']}: {failure['error']}")
+        if len(summary["failures"]) > 25:
+            print(f"  ... and {len(summary['failures']) - 25} more")
+        print(f"\nRe-run with --resume {checkpoint.path} to retry them.")
+
+
+if __name__ == "__main__":
+    main()
@@ -131,10 +131,24 @@ def get_cached_llm_response(prompt_hash: str) -> Optional[str]:
     return cache_get(f"llm:{prompt_hash}")
 
 
-def make_prompt_hash(prompt: str, context: str = "") -> str:
-    """Create a deterministic hash for an LLM prompt + context."""
-    content = f"{prompt}|{context}"
-    return hashlib.sha256(content.encode()).hexdigest()[:16]
+def make_prompt_hash(
+    prompt: str,
+    context: str = "",
+    model: str = "",
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None
+) -> str:
+    """
+    Create a deterministic hash for an LLM request.
+    
+    Covers everything that changes the response: user prompt, full
+    system prompt/context, model and sampling parameters.
+    """
+    content = json.dumps(
+        [prompt, context, model, temperature, max_tokens],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(content.encode()).hexdigest()[:32]
 
 
 def cache_report_path(case_id: str, report_type: str, path: str) -> bool:
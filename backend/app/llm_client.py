@@ -0,0 +1,291 @@
+# backend/app/llm_client.py
+"""
+Async Pooled LLM Client for Phase-3.
+
+Talks to any OpenAI-compatible /chat/completions endpoint (Groq by default):
+- One shared httpx.AsyncClient (keep-alive connection pool)
+- Max in-flight requests per process (backpressure for bursts)
+- Token-bucket rate limiting (requests per minute)
+- Retries on 429 / 5xx / transport errors with jittered exponential
+  backoff, honouring Retry-After
+- Per-call timeouts
+
+The client lives on one background event loop. Async code awaits chat();
+existing sync code paths call chat_sync(), which blocks only the calling
+thread while the request runs on the shared loop.
+
+LLM_BASE_URL points it at a local stub server for testing
+(see test_llm_client.py).
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+# Load env
+load_dotenv(Path(__file__).parent / ".env")
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+LLM_API_KEY = os.getenv("GROQ_API_KEY", "")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.groq.com/openai/v1")
+LLM_MODEL = os.getenv("GROQ_MODEL", "openai/gpt-oss-120b")
+
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+LLM_RATE_PER_MIN = float(os.getenv("LLM_RATE_PER_MIN", "60"))
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """LLM request failed (after retries, or with a non-retryable status)."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+# =============================================================================
+# Rate Limiting
+# =============================================================================
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Retry-After if the server sent one, else full-jitter exponential backoff."""
+    if retry_after:
+        try:
+            return min(float(retry_after), LLM_BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+
+
+# =============================================================================
+# Async Client
+# =============================================================================
+
+class AsyncLLMClient:
+    """
+    Pooled chat-completions client. Use from a single event loop
+    (get_llm_client() runs it on the shared background loop).
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        max_in_flight: int = LLM_MAX_IN_FLIGHT,
+        rate_per_min: float = LLM_RATE_PER_MIN,
+        burst: int = LLM_BURST,
+        timeout: float = LLM_TIMEOUT,
+        max_retries: int = LLM_MAX_RETRIES
+    ):
+        self.api_key = api_key if api_key is not None else LLM_API_KEY
+        self.base_url = (base_url or LLM_BASE_URL).rstrip("/")
+        self.model = model or LLM_MODEL
+        self.max_in_flight = max(1, max_in_flight)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(rate_per_min / 60.0, burst)
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._http: Optional[httpx.AsyncClient] = None
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "in_flight": 0}
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"} if self.api_key else {},
+                limits=httpx.Limits(
+                    max_connections=self.max_in_flight,
+                    max_keepalive_connections=self.max_in_flight,
+                ),
+                timeout=self.timeout,
+            )
+        return self._http
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.3,
+        max_tokens: int = 1024,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Run one chat completion.
+
+        Args:
+            messages: OpenAI-style message list
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            model: Model override (default: client model)
+            timeout: Seconds for each attempt (default: client timeout)
+
+        Returns:
+            Assistant message content
+
+        Raises:
+            LLMError: Non-retryable status, or retries exhausted
+        """
+        payload = {
+            "model": model or self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        timeout = timeout or self.timeout
+
+        async with self._slots:
+            self.stats["in_flight"] += 1
+            try:
+                return await self._post_with_retries(payload, timeout)
+            finally:
+                self.stats["in_flight"] -= 1
+
+    async def _post_with_retries(self, payload: Dict, timeout: float) -> str:
+        last_error: Optional[LLMError] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+            await self.bucket.acquire()
+            self.stats["requests"] += 1
+
+            retry_after = None
+            try:
+                response = await self._client().post("/chat/completions", json=payload, timeout=timeout)
+            except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError) as e:
+                last_error = LLMError(f"{type(e).__name__}: {e}")
+            else:
+                if response.status_code == 200:
+                    try:
+                        return response.json()["choices"][0]["message"]["content"]
+                    except (ValueError, KeyError, IndexError) as e:
+                        self.stats["failures"] += 1
+                        raise LLMError(f"Malformed response: {e}", response.status_code)
+                last_error = LLMError(
+                    f"HTTP {response.status_code}: {response.text[:200]}", response.status_code
+                )
+                if response.status_code not in RETRY_STATUS:
+                    break
+                retry_after = response.headers.get("retry-after")
+
+            if attempt < self.max_retries:
+                delay = backoff_delay(attempt, retry_after)
+                print(f"[llm] ⚠️ {last_error} — retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+        self.stats["failures"] += 1
+        raise last_error
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+# =============================================================================
+# Shared Loop + Sync Facade
+# =============================================================================
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_client: Optional[AsyncLLMClient] = None
+_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+        threading.Thread(target=_loop.run_forever, name="llm-client", daemon=True).start()
+    return _loop
+
+
+def get_llm_client() -> AsyncLLMClient:
+    """Get the shared client (lazy init on the background loop)."""
+    global _client
+    with _lock:
+        loop = _get_loop()
+        if _client is None:
+            async def create():
+                return AsyncLLMClient()
+            _client = asyncio.run_coroutine_threadsafe(create(), loop).result()
+        return _client
+
+
+async def chat(messages: List[Dict[str, str]], **kwargs) -> str:
+    """Await a chat completion from any event loop (runs on the shared loop)."""
+    client = get_llm_client()
+    future = asyncio.run_coroutine_threadsafe(client.chat(messages, **kwargs), _get_loop())
+    return await asyncio.wrap_future(future)
+
+
+def chat_sync(messages: List[Dict[str, str]], **kwargs) -> str:
+    """
+    Blocking chat completion for sync callers (threads, background tasks).
+
+    Must not be called from a coroutine on a running event loop; use chat().
+    """
+    client = get_llm_client()
+    return asyncio.run_coroutine_threadsafe(client.chat(messages, **kwargs), _get_loop()).result()
+
+
+def get_llm_client_stats() -> Dict:
+    """Get shared client statistics."""
+    if _client is None:
+        return {"initialised": False}
+    return {
+        "initialised": True,
+        "base_url": _client.base_url,
+        "max_in_flight": _client.max_in_flight,
+        "rate_per_min": _client.bucket.rate * 60,
+        **_client.stats,
+    }
+
+
+def shutdown_llm_client() -> None:
+    """Close the shared connection pool (recreated on next use)."""
+    global _client
+    with _lock:
+        if _client is not None and _loop is not None:
+            asyncio.run_coroutine_threadsafe(_client.aclose(), _loop).result()
+            _client = None
@@ -14,7 +14,9 @@ No hallucinations — system prompts enforce data-only responses.
 
 import os
 import json
+import threading
 import traceback
+from concurrent.futures import Future
 from typing import Dict, Optional, List
 from pathlib import Path
 from dotenv import load_dotenv
@@ -27,33 +29,16 @@ from app.cache_service import (
     get_cached_llm_response,
     make_prompt_hash
 )
+from app.llm_client import LLM_MODEL, chat_sync, get_llm_client, get_llm_client_stats
 
 # Groq API setup
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
-GROQ_MODEL = os.getenv("GROQ_MODEL", "openai/gpt-oss-120b")
-GROQ_BASE_URL = "https://api.groq.com/openai/v1"
-
-# Try to import Groq client
-try:
-    from groq import Groq
-    GROQ_AVAILABLE = True
-except ImportError:
-    GROQ_AVAILABLE = False
-    print("[llm] ⚠️ groq package not installed. Run: pip install groq")
-
-_client = None
-
-def get_groq_client():
-    """Get or create Groq client (lazy init)."""
-    global _client
-    if not GROQ_AVAILABLE:
-        return None
-    if not GROQ_API_KEY:
-        print("[llm] ⚠️ GROQ_API_KEY not set in .env")
-        return None
-    if _client is None:
-        _client = Groq(api_key=GROQ_API_KEY)
-    return _client
+# Sent with every request and part of every cache key (one source of truth)
+GROQ_MODEL = LLM_MODEL
+
+# Single-flight: prompt hash → Future of the upstream call in progress
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
 
 
 # =============================================================================
@@ -112,39 +97,83 @@ def _call_llm(
     """
     Make a grounded LLM call via Groq.
     
+    Runs on the shared pooled client (app.llm_client); blocks only the
+    calling thread. Cached per prompt hash; concurrent identical calls
+    wait for the first one and get its result (or its exception).
+    
     Returns response text or None on failure.
     """
+    if not use_cache:
+        return _request_llm(system_prompt, user_prompt, temperature, max_tokens)
+    
     # Check cache first
-    if use_cache:
-        prompt_hash = make_prompt_hash(user_prompt, system_prompt[:100])
-        cached = get_cached_llm_response(prompt_hash)
-        if cached:
-            print("[llm] ✅ Cache hit")
-            return cached
+    prompt_hash = make_prompt_hash(
+        user_prompt, system_prompt,
+        model=GROQ_MODEL, temperature=temperature, max_tokens=max_tokens
+    )
+    cached = get_cached_llm_response(prompt_hash)
+    if cached:
+        print("[llm] ✅ Cache hit")
+        return cached
+    
+    # Single-flight: concurrent identical calls share one upstream request
+    with _inflight_lock:
+        future = _inflight.get(prompt_hash)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[prompt_hash] = future
+    
+    if not leader:
+        print("[llm] ⏳ Joined in-flight request")
+        return future.result()
     
-    client = get_groq_client()
-    if client is None:
+    try:
+        # A call that finished just before we took the lead has cached it
+        result = get_cached_llm_response(prompt_hash)
+        if not result:
+            result = _request_llm(system_prompt, user_prompt, temperature, max_tokens)
+            if result:
+                cache_llm_response(prompt_hash, result)
+    except BaseException as e:
+        _release_inflight(prompt_hash)
+        future.set_exception(e)
+        raise
+    
+    _release_inflight(prompt_hash)
+    future.set_result(result)
+    return result
+
+
+def _release_inflight(prompt_hash: str) -> None:
+    """Later identical calls start a new request (or hit the cache)."""
+    with _inflight_lock:
+        _inflight.pop(prompt_hash, None)
+
+
+def _request_llm(
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float,
+    max_tokens: int
+) -> Optional[str]:
+    """One upstream Groq call. Returns response text or None on failure."""
+    if not GROQ_API_KEY:
+        print("[llm] ⚠️ GROQ_API_KEY not set in .env")
         return None
     
     try:
-        response = client.chat.completions.create(
-            model=GROQ_MODEL,
-            messages=[
+        # Pooled client: shared connections, in-flight cap, rate limit, retries
+        return chat_sync(
+            [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
             temperature=temperature,
             max_tokens=max_tokens,
+            model=GROQ_MODEL,
         )
         
-        result = response.choices[0].message.content
-        
-        # Cache the response
-        if use_cache and result:
-            cache_llm_response(prompt_hash, result)
-        
-        return result
-        
     except Exception as e:
         print(f"[llm] ❌ Groq API error: {e}")
         traceback.print_exc()
@@ -327,21 +356,13 @@ def chat_response(
     Returns:
         Response text or None
     """
-    client = get_groq_client()
-    if client is None:
+    if not GROQ_API_KEY:
         return None
     
     try:
         all_messages = [{"role": "system", "content": system_prompt}] + messages
         
-        response = client.chat.completions.create(
-            model=GROQ_MODEL,
-            messages=all_messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
-        
-        return response.choices[0].message.content
+        return chat_sync(all_messages, temperature=temperature, max_tokens=max_tokens, model=GROQ_MODEL)
         
     except Exception as e:
         print(f"[llm] ❌ Chat response error: {e}")
@@ -353,10 +374,23 @@ def chat_response(
 # =============================================================================
 
 def llm_health_check() -> Dict:
-    """Check if LLM service is operational."""
+    """Check if LLM service is operational (builds the pooled client if needed)."""
+    try:
+        client = get_llm_client()
+    except Exception as e:
+        return {
+            "client_available": False,
+            "api_key_set": bool(GROQ_API_KEY),
+            "model": GROQ_MODEL,
+            "status": "unavailable",
+            "error": str(e),
+        }
+    
     return {
-        "groq_available": GROQ_AVAILABLE,
-        "api_key_set": bool(GROQ_API_KEY),
-        "model": GROQ_MODEL,
-        "status": "ready" if (GROQ_AVAILABLE and GROQ_API_KEY) else "unavailable"
+        "client_available": True,
+        "api_key_set": bool(client.api_key),
+        "model": client.model,
+        "base_url": client.base_url,
+        "status": "ready" if client.api_key else "unavailable",
+        "client": get_llm_client_stats()
     }
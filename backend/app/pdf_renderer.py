@@ -0,0 +1,286 @@
+# backend/app/pdf_renderer.py
+"""
+PDF Rendering Pool for Phase-3 Reports.
+
+WeasyPrint layout is CPU-bound and holds the GIL, so rendering threads in
+the API process would still run one at a time. This module provides:
+- A shared process pool that renders report HTML to PDF (lazy init)
+- A global cap on concurrent renders across all cases
+- Inline fallback when the pool is disabled or breaks
+- A warm PdfRenderer per process: stylesheet parsed once, @font-face
+  fonts loaded once, bundled static/fonts registered with fontconfig
+
+Workers only import this module and WeasyPrint, never the app stack
+(Supabase client, Jinja environment, LLM service). They are started with
+forkserver (spawn on Windows), not fork: the API process already runs
+threads (narrative pool, LLM client loop, translator worker) and a forked
+child could inherit a lock one of them held.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Optional
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+# Max renders in flight per server process (0 = render inline, no pool)
+REPORT_RENDER_WORKERS = int(os.getenv(
+    "REPORT_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))
+))
+
+# Worker start method; never fork from the multi-threaded API process
+REPORT_RENDER_START_METHOD = os.getenv(
+    "REPORT_RENDER_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Bump when rendering output can change for the same HTML (fonts, CSS, engine)
+RENDERER_VERSION = "1"
+
+FONTS_DIR = Path(__file__).parent / "static" / "fonts"
+FONTCONFIG_CACHE_DIR = Path(__file__).parent / ".cache" / "fontconfig"
+
+# WeasyPrint keeps decoded images here; reset after this many entries
+IMAGE_CACHE_MAX_ENTRIES = 256
+
+# Touches every bundled script so fonts are loaded before the first report
+WARMUP_HTML = """<html><body>
+<p>Warm-up Latin 0123456789</p>
+<p>हिन्दी देवनागरी</p>
+<p>తెలుగు లిపి</p>
+</body></html>"""
+
+_RENDER_SLOTS = threading.BoundedSemaphore(max(1, REPORT_RENDER_WORKERS))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+_renderers: Dict[str, "PdfRenderer"] = {}
+_renderers_lock = threading.Lock()
+
+
+# =============================================================================
+# Fonts
+# =============================================================================
+
+def font_face_css(families: Dict[str, str], fonts_dir: Path = FONTS_DIR) -> str:
+    """
+    @font-face rules for the bundled fonts that exist on disk.
+    
+    Args:
+        families: Mapping of CSS font-family name to font file name
+        fonts_dir: Directory holding the font files
+        
+    Returns:
+        CSS string (missing files are skipped instead of failing slowly)
+    """
+    rules = []
+    for family, filename in families.items():
+        path = (fonts_dir / filename).resolve()
+        if path.exists():
+            rules.append(
+                f'@font-face {{\n  font-family: "{family}";\n'
+                f'  src: url("{path.as_uri()}") format("truetype");\n}}'
+            )
+    return "\n\n".join(rules)
+
+
+def configure_fontconfig() -> None:
+    """
+    Point fontconfig at the bundled fonts with a persistent cache directory.
+
+    Must run before WeasyPrint (Pango) is first imported in the process.
+    Skipped on Windows and when FONTCONFIG_FILE is already set.
+    """
+    if os.name == "nt" or os.environ.get("FONTCONFIG_FILE"):
+        return
+    try:
+        FONTCONFIG_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        conf_path = FONTCONFIG_CACHE_DIR / "fonts.conf"
+        conf = f"""<?xml version="1.0"?>
+<!DOCTYPE fontconfig SYSTEM "fonts.dtd">
+<fontconfig>
+  <include ignore_missing="yes">/etc/fonts/fonts.conf</include>
+  <dir>{FONTS_DIR.resolve()}</dir>
+  <cachedir>{FONTCONFIG_CACHE_DIR.resolve()}</cachedir>
+</fontconfig>
+"""
+        if not conf_path.exists() or conf_path.read_text(encoding="utf-8") != conf:
+            conf_path.write_text(conf, encoding="utf-8")
+        os.environ["FONTCONFIG_FILE"] = str(conf_path)
+    except OSError as e:
+        print(f"[renderer] ⚠️ fontconfig setup skipped: {e}")
+
+
+# =============================================================================
+# Warm Renderer
+# =============================================================================
+
+class PdfRenderer:
+    """
+    WeasyPrint renderer that stays warm across documents.
+    
+    The stylesheet is parsed once and its @font-face fonts are loaded into a
+    single FontConfiguration, so each render only lays out the document.
+    Decoded images (embedded XAI thumbnails) are shared between renders.
+    """
+    
+    def __init__(self, css: str):
+        configure_fontconfig()
+        from weasyprint import CSS
+        from weasyprint.text.fonts import FontConfiguration
+        
+        self.font_config = FontConfiguration()
+        self.stylesheet = CSS(string=css, font_config=self.font_config)
+        self._image_cache: Dict = {}
+        self._lock = threading.Lock()
+        self.renders = 0
+    
+    def warm_up(self) -> None:
+        """Render a throwaway page so fonts are loaded and shaped once."""
+        self.write_pdf(WARMUP_HTML)
+    
+    def write_pdf(self, html: str, out_path: Optional[str] = None):
+        """Render HTML to out_path (or return the PDF bytes if None)."""
+        from weasyprint import HTML
+        
+        # FontConfiguration is not thread-safe; one render at a time per renderer
+        with self._lock:
+            if len(self._image_cache) > IMAGE_CACHE_MAX_ENTRIES:
+                self._image_cache.clear()
+            result = HTML(string=html).write_pdf(
+                out_path,
+                stylesheets=[self.stylesheet],
+                font_config=self.font_config,
+                cache=self._image_cache,
+            )
+            self.renders += 1
+        return result
+
+
+def get_renderer(css: str) -> PdfRenderer:
+    """Get the warm renderer for a stylesheet in this process (lazy init)."""
+    key = hashlib.sha256(css.encode("utf-8")).hexdigest()
+    with _renderers_lock:
+        renderer = _renderers.get(key)
+        if renderer is None:
+            renderer = PdfRenderer(css)
+            _renderers[key] = renderer
+    return renderer
+
+
+# =============================================================================
+# Worker
+# =============================================================================
+
+def _init_worker(css: Optional[str] = None) -> None:
+    """Pool initializer: build and warm the renderer before the first task."""
+    configure_fontconfig()  # fresh interpreter: set up before WeasyPrint loads
+    if css is None:
+        return
+    try:
+        get_renderer(css).warm_up()
+    except Exception as e:
+        print(f"[renderer] ⚠️ Warm-up failed: {e}")
+
+
+def _render_worker(html: str, out_path: str, css: str) -> str:
+    """Render one HTML document to a PDF file (runs in a pool process)."""
+    get_renderer(css).write_pdf(html, out_path)
+    return out_path
+
+
+# =============================================================================
+# Pool Management
+# =============================================================================
+
+def get_pool(warm_css: Optional[str] = None) -> Optional[ProcessPoolExecutor]:
+    """
+    Get or create the shared render pool (None if disabled).
+    
+    Args:
+        warm_css: Stylesheet each new worker parses and warms up on start
+    """
+    global _pool
+    if REPORT_RENDER_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            configure_fontconfig()  # inherited by the workers' environment
+            _pool = ProcessPoolExecutor(
+                max_workers=REPORT_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context(REPORT_RENDER_START_METHOD),
+                initializer=_init_worker,
+                initargs=(warm_css,),
+            )
+        return _pool
+
+
+def shutdown_pool(wait: bool = True) -> None:
+    """Stop the render pool (it is recreated on next use)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait)
+            _pool = None
+
+
+def _inline_render(html: str, out_path: str, css: str) -> Future:
+    fut = Future()
+    try:
+        fut.set_result(_render_worker(html, out_path, css))
+    except Exception as e:
+        fut.set_exception(e)
+    return fut
+
+
+# =============================================================================
+# Public API
+# =============================================================================
+
+def submit_render(html: str, out_path: str, css: str) -> Future:
+    """
+    Queue a PDF render and return a Future resolving to out_path.
+
+    Blocks while REPORT_RENDER_WORKERS renders are already in flight, so
+    the cap holds across every case handled by this process.
+
+    Args:
+        html: Fully rendered report HTML
+        out_path: Destination PDF path
+        css: Stylesheet source applied to the document
+
+    Returns:
+        concurrent.futures.Future
+    """
+    _RENDER_SLOTS.acquire()
+    try:
+        pool = get_pool(warm_css=css)
+        if pool is None:
+            fut = _inline_render(html, out_path, css)
+        else:
+            try:
+                fut = pool.submit(_render_worker, html, out_path, css)
+            except (BrokenProcessPool, RuntimeError) as e:
+                print(f"[renderer] ⚠️ Render pool unavailable ({e}), rendering inline")
+                shutdown_pool(wait=False)
+                fut = _inline_render(html, out_path, css)
+    except BaseException:
+        _RENDER_SLOTS.release()
+        raise
+
+    fut.add_done_callback(lambda _: _RENDER_SLOTS.release())
+    return fut
+
+
+def render_pdf(html: str, out_path: str, css: str) -> str:
+    """Render a PDF through the pool and wait for it. Returns out_path."""
+    return submit_render(html, out_path, css).result()
@@ -0,0 +1,248 @@
+# backend/app/report_cache.py
+"""
+Content-addressed Rendered-Report Cache for Phase-3.
+
+A rendered PDF is stored under a hash of everything that determines it:
+- Normalised findings (minus volatile fields like generation_time)
+- Template source
+- Language
+- LLM narrative text
+- Stylesheet and renderer version
+
+Regenerating an unchanged case copies the cached PDFs instead of rendering
+them again; only variants whose inputs changed are re-rendered.
+
+Storage is plain files on disk (no diskcache dependency) with LRU eviction
+by access time, bounded by total size and file count.
+
+generation_time is left out of the key, so a cache hit is the PDF exactly
+as first rendered, stamped with its original generation time. That time is
+kept next to the PDF (get_report_generation_time) so callers can report
+the time the served PDF actually shows.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.pdf_renderer import RENDERER_VERSION
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+REPORT_CACHE_DIR = Path(__file__).parent / ".cache" / "reports"
+REPORT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_MB", "1024")) * 1024 * 1024
+REPORT_CACHE_MAX_FILES = int(os.getenv("REPORT_CACHE_MAX_FILES", "5000"))
+
+# Fields that change on every run without changing the report content.
+# generation_time is printed in every template: a hit keeps the old stamp.
+VOLATILE_FIELDS = {"generation_time"}
+
+_evict_lock = threading.Lock()
+
+# Running totals of the cache directory, so stores don't re-scan it.
+# Filled on first use and re-synced by every full eviction pass.
+_usage: Dict[str, int] = {}
+
+
+# =============================================================================
+# Keys
+# =============================================================================
+
+def make_report_key(
+    data: Dict,
+    template_source: str,
+    lang: str,
+    narrative: str = "",
+    css: str = ""
+) -> str:
+    """
+    Create the content hash for one report variant.
+
+    Args:
+        data: Normalised template data for the variant
+        template_source: Jinja template file contents
+        lang: Report language
+        narrative: LLM narrative/discussion text injected into the report
+        css: Stylesheet source passed to the renderer
+
+    Returns:
+        Hex digest used as the cache file name
+    """
+    payload = {k: v for k, v in data.items() if k not in VOLATILE_FIELDS}
+    h = hashlib.sha256()
+    for part in (
+        json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str),
+        template_source,
+        lang or "",
+        narrative or "",
+        css,
+        RENDERER_VERSION,
+    ):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _entry_path(key: str) -> Path:
+    return REPORT_CACHE_DIR / f"{key}.pdf"
+
+
+def _meta_path(key: str) -> Path:
+    return REPORT_CACHE_DIR / f"{key}.json"
+
+
+# =============================================================================
+# Cache Operations
+# =============================================================================
+
+def fetch_report(key: str, out_path: str) -> bool:
+    """
+    Copy a cached PDF to out_path. Returns True on a hit.
+
+    A hit refreshes the entry's access time for LRU eviction.
+    """
+    entry = _entry_path(key)
+    try:
+        shutil.copyfile(entry, out_path)
+        os.utime(entry)
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        print(f"[report_cache] ⚠️ Read failed for {key[:12]}: {e}")
+        return False
+
+
+def get_report_generation_time(key: str) -> Optional[str]:
+    """Generation time printed in a cached PDF (None if unknown)."""
+    try:
+        return json.loads(_meta_path(key).read_text(encoding="utf-8")).get("generation_time")
+    except (OSError, ValueError):
+        return None
+
+
+def store_report(key: str, pdf_path: str, generation_time: Optional[str] = None) -> bool:
+    """
+    Store a freshly rendered PDF under its content key.
+
+    Args:
+        key: Content key from make_report_key()
+        pdf_path: Rendered PDF
+        generation_time: Generation time printed in the PDF
+    """
+    entry = _entry_path(key)
+    tmp = entry.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        try:
+            replaced = entry.stat().st_size
+        except FileNotFoundError:
+            replaced = None
+        shutil.copyfile(pdf_path, tmp)
+        size = tmp.stat().st_size
+        os.replace(tmp, entry)
+        if generation_time:
+            _meta_path(key).write_text(
+                json.dumps({"generation_time": generation_time}), encoding="utf-8"
+            )
+    except OSError as e:
+        print(f"[report_cache] ⚠️ Store failed for {key[:12]}: {e}")
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return False
+
+    with _evict_lock:
+        if not _usage:
+            _scan_usage()
+        else:
+            _usage["bytes"] += size - (replaced or 0)
+            _usage["files"] += replaced is None
+        over = _usage["bytes"] > REPORT_CACHE_MAX_BYTES or _usage["files"] > REPORT_CACHE_MAX_FILES
+    if over:
+        evict(REPORT_CACHE_MAX_BYTES, REPORT_CACHE_MAX_FILES)
+    return True
+
+
+def _scan_usage() -> list:
+    """Re-sync the running totals from disk (caller holds _evict_lock)."""
+    entries = []
+    for p in REPORT_CACHE_DIR.glob("*.pdf"):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+    _usage["bytes"] = sum(size for _, size, _ in entries)
+    _usage["files"] = len(entries)
+    return entries
+
+
+def evict(
+    max_bytes: int = REPORT_CACHE_MAX_BYTES,
+    max_files: int = REPORT_CACHE_MAX_FILES
+) -> int:
+    """
+    Delete least-recently-used PDFs until the cache fits its limits.
+
+    store_report() calls this only once its running totals exceed a limit.
+
+    Returns:
+        Number of entries removed
+    """
+    with _evict_lock:
+        entries = _scan_usage()
+        total = _usage["bytes"]
+
+        if total <= max_bytes and len(entries) <= max_files:
+            return 0
+
+        entries.sort()
+        removed = 0
+        count = len(entries)
+        for _, size, p in entries:
+            if total <= max_bytes and count <= max_files:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            try:
+                p.with_suffix(".json").unlink()
+            except OSError:
+                pass
+            total -= size
+            count -= 1
+            removed += 1
+        _usage["bytes"], _usage["files"] = total, count
+        return removed
+
+
+def clear_report_cache() -> int:
+    """Remove every cached PDF. Returns the number removed."""
+    return evict(max_bytes=-1, max_files=-1)
+
+
+# =============================================================================
+# Stats
+# =============================================================================
+
+def get_report_cache_stats() -> Dict:
+    """Get report cache statistics."""
+    sizes = [p.stat().st_size for p in REPORT_CACHE_DIR.glob("*.pdf")]
+    return {
+        "num_reports": len(sizes),
+        "size_bytes": sum(sizes),
+        "max_bytes": REPORT_CACHE_MAX_BYTES,
+        "max_files": REPORT_CACHE_MAX_FILES,
+        "cache_dir": str(REPORT_CACHE_DIR),
+    }
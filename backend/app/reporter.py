@@ -20,16 +20,20 @@ Corporate Standards:
 Upgraded for Phase-3: Feb 2026
 """
 
+import copy
 import json
 import os
 import traceback
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional, List, Tuple
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from typing import Callable, Dict, Optional, List, Tuple
 from datetime import datetime
 import math
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
-from weasyprint import HTML, CSS
 
 # Import Phase-2 modules
 from app.validators import validate_findings
@@ -41,6 +45,9 @@ from app.xai_service import (
     get_xai_gallery_html
 )
 from app.audit import log
+from app.pdf_renderer import font_face_css, submit_render
+from app.report_cache import fetch_report, get_report_generation_time, make_report_key, store_report
+from app.storage_service import delete_local, get_local_path, load_local, save_local, upload_bytes
 
 # Optional numpy for mask computation
 try:
@@ -60,6 +67,13 @@ FONTS_DIR = BASE_DIR / "static" / "fonts"
 
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# LLM narratives: seconds to wait per report set, and concurrent requests
+REPORT_LLM_TIMEOUT = float(os.getenv("REPORT_LLM_TIMEOUT", "30"))
+REPORT_LLM_WORKERS = int(os.getenv("REPORT_LLM_WORKERS", "8"))
+
+_llm_pool: Optional[ThreadPoolExecutor] = None
+_llm_pool_lock = threading.Lock()
+
 # Jinja2 environment
 ENV = Environment(
     loader=FileSystemLoader(str(TEMPLATE_DIR)),
@@ -71,6 +85,12 @@ ENV = Environment(
 # CSS Styling for PDFs
 # =============================================================================
 
+# Bundled fonts (static/fonts); families whose file is missing are skipped
+PDF_FONT_FILES = {
+    "NotoDevanagari": "NotoSansDevanagari-Regular.ttf",
+    "NotoTelugu": "NotoSansTelugu-Regular.ttf",
+}
+
 PDF_CSS = """
 @page { 
   size: A4; 
@@ -78,23 +98,10 @@ PDF_CSS = """
 }
 
 /* Font fallbacks with bundled fonts */
-@font-face {
-  font-family: "NotoDevanagari";
-  src: url("file:///C:/Windows/Fonts/NotoSansDevanagari-Regular.ttf") format("truetype");
-}
-
-@font-face {
-  font-family: "NotoTelugu";
-  src: url("file:///C:/Windows/Fonts/NotoSansTelugu-Regular.ttf") format("truetype");
-}
-
-@font-face {
-  font-family: "NotoLatin";
-  src: url("file:///C:/Windows/Fonts/NotoSans-Regular.ttf") format("truetype");
-}
+""" + font_face_css(PDF_FONT_FILES, FONTS_DIR) + """
 
 body {
-  font-family: "NotoTelugu", "NotoDevanagari", "NotoLatin", "Segoe UI", Arial, sans-serif;
+  font-family: "NotoTelugu", "NotoDevanagari", "Segoe UI", Arial, sans-serif;
   color: #1a1a2e;
   font-size: 12px;
   line-height: 1.5;
@@ -311,11 +318,330 @@ def normalize_fields(data: Dict, lang: str = "en") -> Dict:
         raise
 
 
+# =============================================================================
+# Shared Report Context
+# =============================================================================
+
+@dataclass(frozen=True)
+class ReportContext:
+    """
+    Findings loaded, validated and normalised once for a whole report set.
+
+    The fields are shared between reports and never mutated; each report
+    takes its own copy through for_report() and only derives the
+    language-specific parts (risk labels, template, narrative).
+    """
+    findings_path: str
+    study_uid: str
+    data: Dict
+    warnings: List[str]
+    summary: Dict
+    xai_summary: Dict
+    xai_gallery: str
+    embedded_nodules: Optional[List[Dict]] = None
+
+    def for_report(self, lang: str = "en", clinician: bool = False) -> Dict:
+        """
+        Per-report copy of the normalised data.
+
+        Args:
+            lang: Language for the nodule risk labels
+            clinician: Use the nodules with embedded XAI thumbnails and
+                include the XAI summary and validation warnings
+
+        Returns:
+            Template data dict owned by the caller
+        """
+        data = copy.deepcopy(self.data)
+        if clinician and self.embedded_nodules is not None:
+            data["nodules"] = copy.deepcopy(self.embedded_nodules)
+
+        for n in data.get("nodules", []):
+            n["risk_label"] = get_risk_label(n.get("prob_malignant", 0), lang)
+
+        data["xai_gallery"] = self.xai_gallery
+        if clinician:
+            data["validation_warnings"] = list(self.warnings)
+            data["xai_summary"] = copy.deepcopy(self.xai_summary)
+        else:
+            data["validation_warnings"] = []  # Don't show technical warnings to patients
+        return data
+
+
+def build_report_context(findings_path: str, embed_xai: bool = True) -> ReportContext:
+    """
+    Load, validate and normalise findings.json once for a report set.
+
+    Args:
+        findings_path: Path to findings.json
+        embed_xai: Also build the embedded XAI thumbnails used by the
+            clinician report
+
+    Returns:
+        ReportContext shared by every report of the case
+    """
+    findings = load_json(findings_path)
+    is_valid, warnings, summary = validate_findings(findings)
+
+    data = normalize_fields(findings, lang="en")
+    nodules = data.get("nodules", [])
+
+    embedded = None
+    if embed_xai and nodules:
+        embedded = enrich_nodules_with_embedded_xai(nodules, embed_size=80)
+
+    return ReportContext(
+        findings_path=str(findings_path),
+        study_uid=data.get("study_uid", "unknown"),
+        data=data,
+        warnings=warnings,
+        summary=summary,
+        xai_summary=get_xai_summary_for_report(data, "en"),
+        xai_gallery=get_xai_gallery_html(nodules, high_risk_only=True),
+        embedded_nodules=embedded,
+    )
+
+
+# =============================================================================
+# Report Preparation (HTML) and Audit
+# =============================================================================
+
+@dataclass
+class ReportDraft:
+    """One report variant before its LLM narrative is known."""
+    data: Dict
+    template_name: str
+    out_path: Path
+    lang: Optional[str]  # None for the clinician report
+    html: str = ""  # template HTML without the LLM section
+
+    @property
+    def narrative_field(self) -> str:
+        return "llm_clinical_discussion" if self.lang is None else "llm_narrative"
+
+
+@dataclass
+class PreparedReport:
+    """One report variant with its HTML built, ready to render."""
+    data: Dict
+    html: str
+    out_path: Path
+    lang: Optional[str]  # None for the clinician report
+    cache_key: str
+    # Generation time printed in the delivered PDF (the original one on a cache hit)
+    generation_time: Optional[str] = None
+
+
+def _template_source(template_name: str) -> str:
+    """Template file contents (part of the rendered-report cache key)."""
+    return ENV.loader.get_source(ENV, template_name)[0]
+
+
+def _draft_clinician_report(context: ReportContext) -> ReportDraft:
+    """Per-report data and output path for the clinician report."""
+    warnings = context.warnings
+    
+    # Log validation issues
+    if warnings:
+        log(None, "report_validation_warnings", {
+            "study_uid": context.study_uid,
+            "report_type": "clinician",
+            "warning_count": len(warnings),
+            "warnings": warnings[:10]
+        })
+    
+    # Per-report data with XAI summary, embedded images and gallery
+    data = context.for_report("en", clinician=True)
+    study_id = data.get("study_uid", "unknown")
+    return ReportDraft(
+        data=data,
+        template_name="clinician_report.md",
+        out_path=(OUTPUT_DIR / f"clinician_{study_id}.pdf").resolve(),
+        lang=None,
+    )
+
+
+def _draft_patient_report(context: ReportContext, lang: str = "en") -> ReportDraft:
+    """Per-report data and output path for a patient report (lang may fall back to en)."""
+    # Select template based on language
+    template_name = f"patient_report_{lang}.md"
+    
+    # Fallback to English if template doesn't exist
+    template_path = TEMPLATE_DIR / template_name
+    if not template_path.exists():
+        print(f"[reporter] Template {template_name} not found, falling back to English")
+        template_name = "patient_report_en.md"
+        lang = "en"
+    
+    # Per-report data with language-specific labels and XAI gallery
+    data = context.for_report(lang)
+    study_id = data.get("study_uid", "unknown")
+    return ReportDraft(
+        data=data,
+        template_name=template_name,
+        out_path=(OUTPUT_DIR / f"patient_{lang}_{study_id}.pdf").resolve(),
+        lang=lang,
+    )
+
+
+def _render_draft_html(draft: ReportDraft) -> None:
+    """Render the template part of a report (independent of the LLM)."""
+    draft.html = ENV.get_template(draft.template_name).render(**draft.data)
+
+
+def _generate_narrative(draft: ReportDraft) -> str:
+    """Phase-3: LLM clinical discussion or patient narrative for a draft."""
+    if draft.lang is None:
+        from app.llm_service import generate_clinical_discussion
+        return generate_clinical_discussion(draft.data) or ""
+    from app.llm_service import generate_narrative_summary
+    return generate_narrative_summary(draft.data, lang=draft.lang) or ""
+
+
+def _get_llm_pool() -> ThreadPoolExecutor:
+    """Get or create the thread pool for narrative requests (lazy init)."""
+    global _llm_pool
+    with _llm_pool_lock:
+        if _llm_pool is None:
+            _llm_pool = ThreadPoolExecutor(
+                max_workers=REPORT_LLM_WORKERS,
+                thread_name_prefix="report-llm"
+            )
+        return _llm_pool
+
+
+def _request_narrative(draft: ReportDraft) -> Future:
+    """Start the LLM request for a draft in the background."""
+    return _get_llm_pool().submit(_generate_narrative, draft)
+
+
+def _await_narrative(draft: ReportDraft, future: Future, timeout: Optional[float]) -> str:
+    """
+    Wait for a narrative; on timeout or error fall back to the
+    deterministic report (no LLM section).
+    """
+    label = "clinical discussion" if draft.lang is None else f"patient narrative ({draft.lang})"
+    try:
+        narrative = future.result(timeout=timeout)
+    except FuturesTimeout:
+        future.cancel()
+        print(f"[reporter] ⚠️ LLM {label} timed out after {REPORT_LLM_TIMEOUT}s, using deterministic report")
+        return ""
+    except Exception as llm_err:
+        print(f"[reporter] ⚠️ LLM {label} unavailable: {llm_err}")
+        return ""
+    if narrative:
+        print(f"[reporter] 🤖 LLM {label} generated")
+    return narrative
+
+
+def _complete_report(draft: ReportDraft, narrative: str) -> PreparedReport:
+    """Inject the narrative into the draft HTML and compute the cache key."""
+    data = draft.data
+    data[draft.narrative_field] = narrative
+    if not draft.html:
+        _render_draft_html(draft)
+    rendered_html = draft.html
+    
+    # Inject LLM section if available
+    if narrative and draft.lang is None:
+        llm_section = f"""
+        <div style="margin-top: 20px; padding: 16px; background: #f0f9ff; border-left: 4px solid #2563eb; border-radius: 8px;">
+            <h3 style="color: #1e40af; margin: 0 0 8px 0; font-size: 14px;">🤖 AI-Assisted Clinical Discussion</h3>
+            <p style="margin: 0; font-size: 12px; line-height: 1.6; color: #1e3a5f;">{narrative}</p>
+            <p style="margin: 8px 0 0 0; font-size: 10px; color: #6b7280; font-style: italic;">Generated by HealthATM AI (Groq/openai-gpt-oss-120b) — Clinical correlation required.</p>
+        </div>
+        """
+        rendered_html = rendered_html.replace("</body>", f"{llm_section}</body>")
+    elif narrative:
+        llm_section = f"""
+        <div style="margin-top: 20px; padding: 16px; background: #f0fdf4; border-left: 4px solid #16a34a; border-radius: 8px;">
+            <h3 style="color: #166534; margin: 0 0 8px 0; font-size: 14px;">🤖 AI Summary — What Your Scan Shows</h3>
+            <p style="margin: 0; font-size: 12px; line-height: 1.6; color: #14532d;">{narrative}</p>
+            <p style="margin: 8px 0 0 0; font-size: 10px; color: #6b7280; font-style: italic;">This summary is generated by AI and should be reviewed with your doctor.</p>
+        </div>
+        """
+        rendered_html = rendered_html.replace("</body>", f"{llm_section}</body>")
+    
+    return PreparedReport(
+        data=data,
+        html=rendered_html,
+        out_path=draft.out_path,
+        lang=draft.lang,
+        cache_key=make_report_key(
+            data, _template_source(draft.template_name), draft.lang or "en",
+            narrative, PDF_CSS
+        ),
+    )
+
+
+def _prepare_report(draft: ReportDraft) -> PreparedReport:
+    """Single report: request the narrative, render the template meanwhile."""
+    future = _request_narrative(draft)
+    _render_draft_html(draft)
+    return _complete_report(draft, _await_narrative(draft, future, REPORT_LLM_TIMEOUT))
+
+
+def _render_report(report: PreparedReport) -> Tuple[Future, bool]:
+    """
+    Start rendering a prepared report, or serve it from the report cache.
+    
+    Returns:
+        Tuple of (future resolving to the PDF path, cache hit)
+    """
+    out_path = str(report.out_path)
+    if fetch_report(report.cache_key, out_path):
+        done = Future()
+        done.set_result(out_path)
+        return done, True
+    return submit_render(report.html, out_path, PDF_CSS), False
+
+
+def _finish_report(report: PreparedReport, future: Future, cache_hit: bool) -> str:
+    """Wait for the render, cache the new PDF and audit-log the report."""
+    future.result()
+    if cache_hit:
+        report.generation_time = get_report_generation_time(report.cache_key)
+    else:
+        report.generation_time = report.data.get("generation_time")
+        store_report(report.cache_key, str(report.out_path), report.generation_time)
+    _log_report_generated(report, cache_hit)
+    return str(report.out_path)
+
+
+def _log_report_generated(report: PreparedReport, cache_hit: bool = False) -> None:
+    """Print and audit-log a finished report."""
+    data, out_path, lang = report.data, report.out_path, report.lang
+    details = {
+        "study_uid": data.get("study_uid", "unknown"),
+        "report_type": "clinician" if lang is None else "patient",
+    }
+    source = " (cached)" if cache_hit else ""
+    if lang is None:
+        print(f"[reporter] ✅ Clinician PDF{source}: {out_path}")
+        llm_enhanced = bool(data.get("llm_clinical_discussion"))
+    else:
+        print(f"[reporter] ✅ Patient PDF ({lang}){source}: {out_path}")
+        details["language"] = lang
+        llm_enhanced = bool(data.get("llm_narrative"))
+    
+    details.update({
+        "path": str(out_path),
+        "nodule_count": len(data.get("nodules", [])),
+        "high_risk_count": data.get("high_risk_count", 0),
+        "llm_enhanced": llm_enhanced,
+        "cache_hit": cache_hit,
+        "cache_key": report.cache_key[:16],
+        "generation_time": report.generation_time,
+    })
+    log(None, "report_generated", details)
+
+
 # =============================================================================
 # Report Generation Functions
 # =============================================================================
 
-def generate_clinician_report(findings_path: str) -> str:
+def generate_clinician_report(findings_path: str, context: Optional[ReportContext] = None) -> str:
     """
     Generate clinician PDF report.
     
@@ -327,86 +653,24 @@ def generate_clinician_report(findings_path: str) -> str:
     
     Args:
         findings_path: Path to findings.json
+        context: Prebuilt ReportContext (skips loading and normalisation)
         
     Returns:
         Path to generated PDF
     """
     try:
-        # 1. Load and validate
-        findings = load_json(findings_path)
-        is_valid, warnings, summary = validate_findings(findings)
-        
-        # 2. Log validation issues
-        if warnings:
-            log(None, "report_validation_warnings", {
-                "study_uid": findings.get("study_uid") or findings.get("study_id"),
-                "report_type": "clinician",
-                "warning_count": len(warnings),
-                "warnings": warnings[:10]
-            })
-        
-        # 3. Normalize data
-        data = normalize_fields(findings, lang="en")
-        data["validation_warnings"] = warnings
-        
-        # 4. Add XAI summary
-        data["xai_summary"] = get_xai_summary_for_report(findings, "en")
-        
-        # 4b. Add embedded XAI images to nodules
-        if data.get("nodules"):
-            data["nodules"] = enrich_nodules_with_embedded_xai(data["nodules"], embed_size=80)
+        # 1. Load, validate and normalise (once per report set)
+        if context is None:
+            context = build_report_context(findings_path)
         
-        # 4c. Generate XAI gallery for high-risk nodules
-        data["xai_gallery"] = get_xai_gallery_html(findings.get("nodules", []), high_risk_only=True)
+        # 2. Build HTML (validation log, XAI, LLM discussion)
+        report = _prepare_report(_draft_clinician_report(context))
         
-        # 4d. Phase-3: Generate LLM clinical discussion
-        try:
-            from app.llm_service import generate_clinical_discussion
-            llm_discussion = generate_clinical_discussion(data)
-            data["llm_clinical_discussion"] = llm_discussion or ""
-            if llm_discussion:
-                print("[reporter] 🤖 LLM clinical discussion generated")
-        except Exception as llm_err:
-            print(f"[reporter] ⚠️ LLM discussion unavailable: {llm_err}")
-            data["llm_clinical_discussion"] = ""
-        
-        # 5. Render template
-        template = ENV.get_template("clinician_report.md")
-        rendered_html = template.render(**data)
-        
-        # 5b. Inject LLM discussion section if available
-        if data.get("llm_clinical_discussion"):
-            llm_section = f"""
-            <div style="margin-top: 20px; padding: 16px; background: #f0f9ff; border-left: 4px solid #2563eb; border-radius: 8px;">
-                <h3 style="color: #1e40af; margin: 0 0 8px 0; font-size: 14px;">🤖 AI-Assisted Clinical Discussion</h3>
-                <p style="margin: 0; font-size: 12px; line-height: 1.6; color: #1e3a5f;">{data['llm_clinical_discussion']}</p>
-                <p style="margin: 8px 0 0 0; font-size: 10px; color: #6b7280; font-style: italic;">Generated by HealthATM AI (Groq/openai-gpt-oss-120b) — Clinical correlation required.</p>
-            </div>
-            """
-            rendered_html = rendered_html.replace("</body>", f"{llm_section}</body>")
-        
-        # 6. Generate PDF
-        study_id = data.get("study_uid", "unknown")
-        out_path = (OUTPUT_DIR / f"clinician_{study_id}.pdf").resolve()
-        
-        HTML(string=rendered_html).write_pdf(
-            str(out_path),
-            stylesheets=[CSS(string=PDF_CSS)]
-        )
-        
-        print(f"[reporter] ✅ Clinician PDF: {out_path}")
-        
-        # 7. Audit log
-        log(None, "report_generated", {
-            "study_uid": study_id,
-            "report_type": "clinician",
-            "path": str(out_path),
-            "nodule_count": len(data.get("nodules", [])),
-            "high_risk_count": data.get("high_risk_count", 0),
-            "llm_enhanced": bool(data.get("llm_clinical_discussion"))
-        })
+        # 3. Generate PDF in the render pool (or reuse an identical one)
+        future, cache_hit = _render_report(report)
         
-        return str(out_path)
+        # 4. Cache and audit log
+        return _finish_report(report, future, cache_hit)
         
     except Exception as e:
         print(f"[reporter] ❌ generate_clinician_report error: {e}")
@@ -414,7 +678,11 @@ def generate_clinician_report(findings_path: str) -> str:
         raise
 
 
-def generate_patient_report(findings_path: str, lang: str = "en") -> str:
+def generate_patient_report(
+    findings_path: str,
+    lang: str = "en",
+    context: Optional[ReportContext] = None
+) -> str:
     """
     Generate patient-friendly PDF report.
     
@@ -427,80 +695,24 @@ def generate_patient_report(findings_path: str, lang: str = "en") -> str:
     Args:
         findings_path: Path to findings.json
         lang: Language code ("en", "hi", etc.)
+        context: Prebuilt ReportContext (skips loading and normalisation)
         
     Returns:
         Path to generated PDF
     """
     try:
-        # 1. Load and validate
-        findings = load_json(findings_path)
-        is_valid, warnings, summary = validate_findings(findings)
-        
-        # 2. Normalize data with language-specific labels
-        data = normalize_fields(findings, lang=lang)
-        data["validation_warnings"] = []  # Don't show technical warnings to patients
+        # 1. Load, validate and normalise (once per report set)
+        if context is None:
+            context = build_report_context(findings_path, embed_xai=False)
         
-        # 3. Select template based on language
-        template_name = f"patient_report_{lang}.md"
+        # 2. Build HTML (template, labels, LLM narrative)
+        report = _prepare_report(_draft_patient_report(context, lang))
         
-        # Fallback to English if template doesn't exist
-        template_path = TEMPLATE_DIR / template_name
-        if not template_path.exists():
-            print(f"[reporter] Template {template_name} not found, falling back to English")
-            template_name = "patient_report_en.md"
-            lang = "en"
+        # 3. Generate PDF in the render pool (or reuse an identical one)
+        future, cache_hit = _render_report(report)
         
-        # 3b. Add simplified XAI gallery for patient (high-risk only)
-        data["xai_gallery"] = get_xai_gallery_html(findings.get("nodules", []), high_risk_only=True)
-        
-        # 3c. Phase-3: Generate LLM patient narrative
-        try:
-            from app.llm_service import generate_narrative_summary
-            llm_narrative = generate_narrative_summary(data, lang=lang)
-            data["llm_narrative"] = llm_narrative or ""
-            if llm_narrative:
-                print(f"[reporter] 🤖 LLM patient narrative generated ({lang})")
-        except Exception as llm_err:
-            print(f"[reporter] ⚠️ LLM narrative unavailable: {llm_err}")
-            data["llm_narrative"] = ""
-        
-        template = ENV.get_template(template_name)
-        rendered_html = template.render(**data)
-        
-        # 3d. Inject LLM narrative section if available
-        if data.get("llm_narrative"):
-            llm_section = f"""
-            <div style="margin-top: 20px; padding: 16px; background: #f0fdf4; border-left: 4px solid #16a34a; border-radius: 8px;">
-                <h3 style="color: #166534; margin: 0 0 8px 0; font-size: 14px;">🤖 AI Summary — What Your Scan Shows</h3>
-                <p style="margin: 0; font-size: 12px; line-height: 1.6; color: #14532d;">{data['llm_narrative']}</p>
-                <p style="margin: 8px 0 0 0; font-size: 10px; color: #6b7280; font-style: italic;">This summary is generated by AI and should be reviewed with your doctor.</p>
-            </div>
-            """
-            rendered_html = rendered_html.replace("</body>", f"{llm_section}</body>")
-        
-        # 4. Generate PDF
-        study_id = data.get("study_uid", "unknown")
-        out_path = (OUTPUT_DIR / f"patient_{lang}_{study_id}.pdf").resolve()
-        
-        HTML(string=rendered_html).write_pdf(
-            str(out_path),
-            stylesheets=[CSS(string=PDF_CSS)]
-        )
-        
-        print(f"[reporter] ✅ Patient PDF ({lang}): {out_path}")
-        
-        # 5. Audit log
-        log(None, "report_generated", {
-            "study_uid": study_id,
-            "report_type": "patient",
-            "language": lang,
-            "path": str(out_path),
-            "nodule_count": len(data.get("nodules", [])),
-            "high_risk_count": data.get("high_risk_count", 0),
-            "llm_enhanced": bool(data.get("llm_narrative"))
-        })
-        
-        return str(out_path)
+        # 4. Cache and audit log
+        return _finish_report(report, future, cache_hit)
         
     except Exception as e:
         print(f"[reporter] ❌ generate_patient_report error: {e}")
@@ -508,10 +720,88 @@ def generate_patient_report(findings_path: str, lang: str = "en") -> str:
         raise
 
 
+def _report_variants(patient_lang: str = "en", include_hindi: bool = True) -> List[Tuple[str, Optional[str]]]:
+    """Report set as (report key, language); language None = clinician."""
+    variants = [("clinician", None), ("patient_en", "en")]
+    if include_hindi:
+        variants.append(("patient_hi", "hi"))
+    if patient_lang and patient_lang.lower() not in ["en", "hi", "english", "hindi"]:
+        variants.append((f"patient_{patient_lang}", patient_lang.lower()))
+    return variants
+
+
+def _prepare_report_set(
+    context: ReportContext,
+    variants: List[Tuple[str, Optional[str]]],
+    on_ready: Callable[[str, PreparedReport], None]
+) -> Dict[str, str]:
+    """
+    Build the HTML of every variant with concurrent LLM narratives.
+    
+    Drafts every variant, fires all narrative requests at once, renders the
+    templates while they are in flight, then completes each report as its
+    narrative arrives and hands it to on_ready(key, report). Narratives not
+    back within REPORT_LLM_TIMEOUT fall back to the deterministic report.
+    
+    Returns:
+        Dict of report key -> error message for variants that failed
+    """
+    # 1. Draft every variant and fire all LLM narrative requests at once
+    drafts = {}
+    narratives = {}
+    errors = {}
+    for key, lang in variants:
+        try:
+            if lang is None:
+                drafts[key] = _draft_clinician_report(context)
+            else:
+                drafts[key] = _draft_patient_report(context, lang)
+            narratives[key] = _request_narrative(drafts[key])
+        except Exception as e:
+            print(f"[reporter] Failed to generate {key} report: {e}")
+            errors[key] = str(e)
+    
+    # 2. Render the templates while the LLM requests are in flight
+    for key in list(drafts):
+        try:
+            _render_draft_html(drafts[key])
+        except Exception as e:
+            print(f"[reporter] Failed to generate {key} report: {e}")
+            errors[key] = str(e)
+            narratives.pop(key).cancel()
+            del drafts[key]
+    
+    # 3. Complete each report as its narrative arrives; requests still
+    #    pending at the deadline use the deterministic report
+    def complete(key: str) -> None:
+        draft = drafts[key]
+        try:
+            on_ready(key, _complete_report(draft, _await_narrative(draft, narratives[key], 0)))
+        except Exception as e:
+            print(f"[reporter] Failed to generate {key} report: {e}")
+            errors[key] = str(e)
+    
+    done = set()
+    key_of = {future: key for key, future in narratives.items()}
+    try:
+        for future in as_completed(key_of, timeout=REPORT_LLM_TIMEOUT):
+            done.add(key_of[future])
+            complete(key_of[future])
+    except FuturesTimeout:
+        pass
+    for key in narratives:
+        if key not in done:
+            complete(key)
+    
+    return errors
+
+
 def generate_all_reports(
     findings_path: str,
     patient_lang: str = "en",
-    include_hindi: bool = True
+    include_hindi: bool = True,
+    cache_info: Optional[Dict[str, bool]] = None,
+    generation_times: Optional[Dict[str, Optional[str]]] = None
 ) -> Dict[str, str]:
     """
     Generate all required reports for a case.
@@ -522,51 +812,268 @@ def generate_all_reports(
     - Patient report (Hindi) - mandatory
     - Patient report (regional) - if different from EN/HI
     
+    The findings are normalised once and the LLM narratives of all variants
+    are requested concurrently while the templates render. Each narrative is
+    injected as it arrives and its PDF queued in the render pool; narratives
+    not back within REPORT_LLM_TIMEOUT fall back to the deterministic report.
+    Variants whose inputs are unchanged are served from the rendered-report
+    cache.
+    
     Args:
         findings_path: Path to findings.json
         patient_lang: Patient's preferred language
         include_hindi: Whether to generate Hindi report (default True)
+        cache_info: Optional dict filled with {report key: cache hit}
+        generation_times: Optional dict filled with {report key: generation
+            time printed in the PDF}; a cached PDF keeps its original time
         
     Returns:
         Dict mapping report type to file path
     """
+    variants = _report_variants(patient_lang, include_hindi)
     reports = {}
     
-    # 1. Clinician report (English only)
+    # 1. Load, validate and normalise once for the whole set
     try:
-        reports["clinician"] = generate_clinician_report(findings_path)
+        context = build_report_context(findings_path)
     except Exception as e:
-        print(f"[reporter] Failed to generate clinician report: {e}")
-        reports["clinician_error"] = str(e)
+        print(f"[reporter] Failed to load findings for report set: {e}")
+        for key, _ in variants:
+            reports[f"{key}_error"] = str(e)
+        return reports
     
-    # 2. Patient report - English (mandatory)
-    try:
-        reports["patient_en"] = generate_patient_report(findings_path, "en")
-    except Exception as e:
-        print(f"[reporter] Failed to generate English patient report: {e}")
-        reports["patient_en_error"] = str(e)
+    # 2. Build HTML with concurrent narratives; queue each PDF render
+    #    as soon as its report is complete
+    pending = {}
     
-    # 3. Patient report - Hindi (mandatory)
-    if include_hindi:
-        try:
-            reports["patient_hi"] = generate_patient_report(findings_path, "hi")
-        except Exception as e:
-            print(f"[reporter] Failed to generate Hindi patient report: {e}")
-            reports["patient_hi_error"] = str(e)
+    def queue_render(key: str, report: PreparedReport) -> None:
+        pending[key] = (report, *_render_report(report))
     
-    # 4. Patient report - Regional (if different)
-    if patient_lang and patient_lang.lower() not in ["en", "hi", "english", "hindi"]:
+    errors = _prepare_report_set(context, variants, queue_render)
+    
+    # 3. Collect renders in variant order
+    for key, _ in variants:
+        if key in errors:
+            reports[f"{key}_error"] = errors[key]
+            continue
+        report, future, cache_hit = pending[key]
         try:
-            reports[f"patient_{patient_lang}"] = generate_patient_report(
-                findings_path, patient_lang.lower()
-            )
+            reports[key] = _finish_report(report, future, cache_hit)
+            if cache_info is not None:
+                cache_info[key] = cache_hit
+            if generation_times is not None:
+                generation_times[key] = report.generation_time
         except Exception as e:
-            print(f"[reporter] Failed to generate {patient_lang} patient report: {e}")
-            reports[f"patient_{patient_lang}_error"] = str(e)
+            print(f"[reporter] Failed to render {key} report: {e}")
+            reports[f"{key}_error"] = str(e)
     
     return reports
 
 
+# =============================================================================
+# Lazy Report Materialisation (HTML first, PDF on demand)
+# =============================================================================
+
+REPORT_MANIFEST_FILE = "report_manifest.json"
+REPORT_CONTEXT_FILE = "report_context.json"
+
+# Materialised PDFs are uploaded here at the path recorded in scan_results
+REPORTS_BUCKET = "reports"
+
+# Fixed set of striped locks: bounded memory however many cases are served.
+# Two reports sharing a stripe only serialise, they never render twice.
+MATERIALIZE_LOCK_STRIPES = 64
+_materialize_locks = [threading.Lock() for _ in range(MATERIALIZE_LOCK_STRIPES)]
+
+
+def prepare_lazy_reports(
+    findings_path: str,
+    case_id: str,
+    patient_lang: str = "en",
+    include_hindi: bool = True
+) -> Dict[str, str]:
+    """
+    Lazy alternative to generate_all_reports().
+    
+    Builds every variant's final HTML (with LLM narratives) but renders no
+    PDF. The normalised report context, each variant's HTML and a manifest
+    are stored in local storage; materialize_report() renders a PDF the
+    first time it is requested. get_lazy_report_paths() gives the 'reports'
+    bucket paths the PDFs are uploaded to, for the scan_results columns.
+    
+    Args:
+        findings_path: Path to findings.json
+        case_id: Case identifier (local storage folder)
+        patient_lang: Patient's preferred language
+        include_hindi: Whether to prepare the Hindi report
+        
+    Returns:
+        Dict mapping report type to stored HTML URL (plus *_error entries)
+    """
+    variants = _report_variants(patient_lang, include_hindi)
+    reports = {}
+    
+    try:
+        context = build_report_context(findings_path)
+    except Exception as e:
+        print(f"[reporter] Failed to load findings for report set: {e}")
+        for key, _ in variants:
+            reports[f"{key}_error"] = str(e)
+        return reports
+    
+    manifest = {
+        "case_id": case_id,
+        "study_uid": context.study_uid,
+        "prepared_at": datetime.utcnow().isoformat() + "Z",
+        "reports": {},
+    }
+    urls = {}
+    
+    def store_html(key: str, report: PreparedReport) -> None:
+        html_name = f"{key}.html"
+        urls[key] = save_local(case_id, html_name, report.html.encode("utf-8"))
+        # A PDF materialised for an earlier preparation is stale now
+        delete_local(case_id, report.out_path.name)
+        manifest["reports"][key] = {
+            "html": html_name,
+            "pdf": report.out_path.name,
+            "lang": report.lang,
+            "cache_key": report.cache_key,
+            "generation_time": report.data.get("generation_time"),
+            "nodule_count": len(report.data.get("nodules", [])),
+            "high_risk_count": report.data.get("high_risk_count", 0),
+            "llm_enhanced": bool(report.data.get("llm_clinical_discussion" if report.lang is None else "llm_narrative")),
+        }
+    
+    errors = _prepare_report_set(context, variants, store_html)
+    
+    save_local(case_id, REPORT_CONTEXT_FILE,
+               json.dumps(context.data, ensure_ascii=False, default=str).encode("utf-8"))
+    save_local(case_id, REPORT_MANIFEST_FILE,
+               json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+    
+    log(None, "reports_prepared", {
+        "case_id": case_id,
+        "study_uid": context.study_uid,
+        "reports": list(manifest["reports"].keys()),
+        "mode": "lazy"
+    })
+    
+    for key, _ in variants:
+        if key in errors:
+            reports[f"{key}_error"] = errors[key]
+        elif key in urls:
+            reports[key] = urls[key]
+    return reports
+
+
+def _materialize_lock(case_id: str, report_type: str) -> threading.Lock:
+    return _materialize_locks[hash((case_id, report_type)) % MATERIALIZE_LOCK_STRIPES]
+
+
+def materialize_report(case_id: str, report_type: str) -> Optional[str]:
+    """
+    Return the local PDF for a lazily prepared report, rendering it on
+    first request.
+    
+    The PDF is served from the rendered-report cache when its content key
+    is known, otherwise rendered from the stored HTML in the render pool.
+    It is uploaded to the 'reports' bucket (the path scan_results points
+    at) and kept in local storage so later requests are plain file reads;
+    if the upload fails, the next request retries it.
+    Concurrent requests for the same report render it once.
+    
+    Args:
+        case_id: Case identifier
+        report_type: Report key (clinician, patient_en, patient_hi, ...)
+        
+    Returns:
+        Path to the local PDF, or None if the case has no lazy report of
+        this type
+    """
+    raw = load_local(case_id, REPORT_MANIFEST_FILE)
+    if raw is None:
+        return None
+    entry = json.loads(raw).get("reports", {}).get(report_type)
+    if entry is None:
+        return None
+    
+    with _materialize_lock(case_id, report_type):
+        existing = get_local_path(case_id, entry["pdf"])
+        if existing:
+            return str(existing)
+        
+        html = load_local(case_id, entry["html"])
+        if html is None:
+            return None
+        
+        out_path = str((OUTPUT_DIR / entry["pdf"]).resolve())
+        cache_hit = fetch_report(entry["cache_key"], out_path)
+        if cache_hit:
+            generation_time = get_report_generation_time(entry["cache_key"])
+        else:
+            # The stored HTML carries the time it was prepared
+            generation_time = entry.get("generation_time")
+            submit_render(html.decode("utf-8"), out_path, PDF_CSS).result()
+            store_report(entry["cache_key"], out_path, generation_time)
+        
+        with open(out_path, "rb") as f:
+            pdf_bytes = f.read()
+        if not upload_bytes(REPORTS_BUCKET, f"{case_id}/{entry['pdf']}", pdf_bytes, upsert=True):
+            # Not kept locally, so the next request uploads again
+            print(f"[reporter] ⚠️ {report_type} PDF not uploaded; serving {out_path}")
+            return out_path
+        save_local(case_id, entry["pdf"], pdf_bytes)
+        
+        print(f"[reporter] ✅ Materialised {report_type} PDF{' (cached)' if cache_hit else ''}: {out_path}")
+        log(None, "report_generated", {
+            "case_id": case_id,
+            "report_type": "clinician" if entry["lang"] is None else "patient",
+            "language": entry["lang"],
+            "path": out_path,
+            "nodule_count": entry.get("nodule_count", 0),
+            "high_risk_count": entry.get("high_risk_count", 0),
+            "llm_enhanced": entry.get("llm_enhanced", False),
+            "cache_hit": cache_hit,
+            "cache_key": entry["cache_key"][:16],
+            "generation_time": generation_time,
+            "mode": "lazy"
+        })
+        return str(get_local_path(case_id, entry["pdf"]))
+
+
+def get_lazy_report_paths(case_id: str) -> Dict[str, str]:
+    """
+    'reports' bucket paths of a case's lazily prepared reports.
+    
+    Returns:
+        Dict mapping report key to bucket path ({case_id}/{pdf name});
+        empty if the case was not prepared lazily
+    """
+    raw = load_local(case_id, REPORT_MANIFEST_FILE)
+    if raw is None:
+        return {}
+    return {
+        key: f"{case_id}/{entry['pdf']}"
+        for key, entry in json.loads(raw).get("reports", {}).items()
+    }
+
+
+def materialize_report_path(case_id: str, storage_path: Optional[str]) -> None:
+    """
+    Make sure a bucket path handed to a client exists.
+    
+    Renders and uploads the lazy report stored at storage_path if it has
+    not been materialised yet; no-op for eagerly generated reports.
+    """
+    if not storage_path:
+        return
+    for key, path in get_lazy_report_paths(case_id).items():
+        if path == storage_path:
+            materialize_report(case_id, key)
+            return
+
+
 # =============================================================================
 # Legacy API Compatibility
 # =============================================================================
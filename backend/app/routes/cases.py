@@ -1,8 +1,9 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Header
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Header, Query
 from typing import Optional
 from app.ml_processor import process_case
 from app.supabase_client import supabase
 from app.audit import log
+from app.reporter import materialize_report_path
 
 router = APIRouter(prefix="/cases", tags=["cases"])
 
@@ -34,7 +35,17 @@ def get_scan_results(case_id: str):
 
 
 @router.get("/reports/{case_id}")
-def get_report_urls(case_id: str, x_user_id: Optional[str] = Header(None, alias="x-user-id")):
+def get_report_urls(
+    case_id: str,
+    x_user_id: Optional[str] = Header(None, alias="x-user-id"),
+    report_type: Optional[str] = Query(None, description="clinician_report or patient_report about to be opened")
+):
+    """
+    Get report bucket paths for the user's role.
+    
+    A lazily prepared report is rendered and uploaded only when it is the
+    requested report_type, so opening one report never renders the others.
+    """
     user_id = x_user_id
     if not user_id:
         raise HTTPException(status_code=400, detail="Missing user ID header")
@@ -64,6 +75,10 @@ def get_report_urls(case_id: str, x_user_id: Optional[str] = Header(None, alias=
          urls["patient_report"] = {"url": scan.data.get("patient_pdf")}
          urls["clinician_report"] = {"url": scan.data.get("clinician_pdf")}
 
+    # Render + upload the report about to be opened if it was prepared lazily
+    if report_type in urls:
+        materialize_report_path(case_id, urls[report_type]["url"])
+
     return urls
 
 
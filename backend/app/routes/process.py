@@ -27,6 +27,9 @@ STAGING_DIR = Path(__file__).parent.parent / "uploads"
 OUTPUTS_DIR = Path(__file__).parent.parent / "outputs"
 OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
 
+# Lazy mode stores report HTML only; PDFs render on first download
+REPORT_LAZY_MODE = os.getenv("REPORT_LAZY_MODE", "false").lower() in ("1", "true", "yes")
+
 
 # =============================================================================
 # Background Processing Task
@@ -127,54 +130,74 @@ def run_ml_pipeline(case_id: str, patient_id: str = None):
 
         # 7. Generate reports (try, don't fail pipeline)
         try:
-            from app.reporter import generate_all_reports
+            from app.reporter import generate_all_reports, get_lazy_report_paths, prepare_lazy_reports
+            from app.routes.reports import build_report_row
             from app.storage_service import save_local
 
-            reports = generate_all_reports(
-                findings_path,
-                patient_lang="en",
-                include_hindi=True
-            )
-
-                # Save locally and update DB
-            paths_update = {}
-            for rtype, rpath in reports.items():
-                if "error" not in rtype and os.path.exists(rpath):
-                    with open(rpath, "rb") as rf:
-                        content = rf.read()
-                    filename = os.path.basename(rpath)
+            if REPORT_LAZY_MODE:
+                reports = prepare_lazy_reports(
+                    findings_path,
+                    case_id,
+                    patient_lang="en",
+                    include_hindi=True
+                )
+                # Same 'reports' bucket paths as eager mode; each PDF is
+                # rendered and uploaded when a client first asks for it
+                bucket_paths = {k: v for k, v in get_lazy_report_paths(case_id).items() if k in reports}
+                paths_update = build_report_row(case_id, bucket_paths, patient_lang="en")
+                paths_update.pop("scan_id")
+                if bucket_paths:
+                    try:
+                        supabase.table("scan_results").update(paths_update).eq("scan_id", case_id).execute()
+                    except Exception as e:
+                        print(f"[process] DB update error for reports: {e}")
+                print(f"[process] [OK] Reports prepared (PDF on demand): {list(reports.keys())}")
+            else:
+                reports = generate_all_reports(
+                    findings_path,
+                    patient_lang="en",
+                    include_hindi=True
+                )
+
+                    # Save locally and update DB
+                paths_update = {}
+                for rtype, rpath in reports.items():
+                    if "error" not in rtype and os.path.exists(rpath):
+                        with open(rpath, "rb") as rf:
+                            content = rf.read()
+                        filename = os.path.basename(rpath)
                     
-                    # 1. Save locally (backup)
-                    save_local(case_id, filename, content)
-
-                    # 2. Upload to Supabase 'reports' bucket
-                    storage_path = f"{case_id}/{filename}"
+                        # 1. Save locally (backup)
+                        save_local(case_id, filename, content)
+
+                        # 2. Upload to Supabase 'reports' bucket
+                        storage_path = f"{case_id}/{filename}"
+                        try:
+                            supabase.storage.from_("reports").upload(
+                                storage_path,
+                                content,
+                                file_options={"content-type": "application/pdf"}
+                            )
+                            print(f"[process] Uploaded report to Supabase: {storage_path}")
+
+                            # Map to DB columns
+                            if "clinician" in rtype:
+                                paths_update["clinician_pdf"] = storage_path
+                            elif "patient_en" in rtype:
+                                paths_update["patient_pdf"] = storage_path
+
+                        except Exception as e:
+                             print(f"[process] Report upload error ({filename}): {e}")
+
+                # 3. Update scan_results table with report paths
+                if paths_update:
                     try:
-                        supabase.storage.from_("reports").upload(
-                            storage_path,
-                            content,
-                            file_options={"content-type": "application/pdf"}
-                        )
-                        print(f"[process] Uploaded report to Supabase: {storage_path}")
-
-                        # Map to DB columns
-                        if "clinician" in rtype:
-                            paths_update["clinician_pdf"] = storage_path
-                        elif "patient_en" in rtype:
-                            paths_update["patient_pdf"] = storage_path
-
+                        supabase.table("scan_results").update(paths_update).eq("scan_id", case_id).execute()
+                        print(f"[process] Updated scan_results with report paths: {list(paths_update.keys())}")
                     except Exception as e:
-                         print(f"[process] Report upload error ({filename}): {e}")
-
-            # 3. Update scan_results table with report paths
-            if paths_update:
-                try:
-                    supabase.table("scan_results").update(paths_update).eq("scan_id", case_id).execute()
-                    print(f"[process] Updated scan_results with report paths: {list(paths_update.keys())}")
-                except Exception as e:
-                    print(f"[process] DB update error for reports: {e}")
+                        print(f"[process] DB update error for reports: {e}")
 
-            print(f"[process] [OK] Reports generated: {list(reports.keys())}")
+                print(f"[process] [OK] Reports generated: {list(reports.keys())}")
 
         except Exception as e:
             print(f"[process] [WARN] Report generation skipped: {e}")
@@ -16,6 +16,8 @@ Created for Phase-2: Feb 2026
 """
 
 from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 from typing import Optional, Dict, List
 from datetime import datetime
 import os
@@ -24,9 +26,12 @@ from pathlib import Path
 
 from app.supabase_client import supabase
 from app.audit import log, log_api_request
-from app.reporter import generate_all_reports, generate_clinician_report, generate_patient_report
+from app.reporter import (
+    generate_all_reports, generate_clinician_report, generate_patient_report,
+    materialize_report, materialize_report_path
+)
 from app.validators import validate_findings
-from app.storage_service import save_local, load_local
+from app.storage_service import save_local, load_local, list_local_reports, get_local_path
 
 
 router = APIRouter(prefix="/reports", tags=["reports"])
@@ -66,6 +71,44 @@ def get_findings_path(case_id: str) -> Optional[str]:
     return None
 
 
+def build_report_row(
+    case_id: str,
+    reports: Dict[str, str],
+    patient_lang: str = "en"
+) -> Dict:
+    """
+    Build the scan_results row holding a case's report paths.
+    """
+    row = {
+        "scan_id": case_id,
+        "report_generated_at": datetime.utcnow().isoformat() + "Z",
+    }
+    
+    # Map report types to DB columns
+    if "clinician" in reports:
+        row["clinician_pdf"] = reports["clinician"]
+    if "patient_en" in reports:
+        row["patient_pdf"] = reports["patient_en"]
+        row["patient_pdf_en"] = reports["patient_en"]
+    if "patient_hi" in reports:
+        row["patient_pdf_hi"] = reports["patient_hi"]
+    
+    # Store regional language report
+    regional_key = f"patient_{patient_lang}"
+    if regional_key in reports and patient_lang not in ["en", "hi"]:
+        row["patient_pdf_native"] = reports[regional_key]
+    
+    # Store language codes
+    lang_codes = ["en"]
+    if "patient_hi" in reports:
+        lang_codes.append("hi")
+    if regional_key in reports and patient_lang not in ["en", "hi"]:
+        lang_codes.append(patient_lang)
+    row["report_lang_codes"] = lang_codes
+    
+    return row
+
+
 def store_report_paths(
     case_id: str,
     reports: Dict[str, str],
@@ -75,37 +118,9 @@ def store_report_paths(
     Store report paths in database.
     """
     try:
-        # Build update payload
-        update_data = {
-            "scan_id": case_id,
-            "report_generated_at": datetime.utcnow().isoformat() + "Z",
-        }
-        
-        # Map report types to DB columns
-        if "clinician" in reports:
-            update_data["clinician_pdf"] = reports["clinician"]
-        if "patient_en" in reports:
-            update_data["patient_pdf"] = reports["patient_en"]
-            update_data["patient_pdf_en"] = reports["patient_en"]
-        if "patient_hi" in reports:
-            update_data["patient_pdf_hi"] = reports["patient_hi"]
-        
-        # Store regional language report
-        regional_key = f"patient_{patient_lang}"
-        if regional_key in reports and patient_lang not in ["en", "hi"]:
-            update_data["patient_pdf_native"] = reports[regional_key]
-        
-        # Store language codes
-        lang_codes = ["en"]
-        if "patient_hi" in reports:
-            lang_codes.append("hi")
-        if regional_key in reports and patient_lang not in ["en", "hi"]:
-            lang_codes.append(patient_lang)
-        update_data["report_lang_codes"] = lang_codes
-        
         # Upsert to database
         supabase.table("scan_results").upsert(
-            update_data,
+            build_report_row(case_id, reports, patient_lang),
             on_conflict="scan_id"
         ).execute()
         
@@ -138,6 +153,9 @@ async def generate_reports_endpoint(
     5. Generates patient report in regional language if different
     6. Stores report paths in database
     
+    Reports whose inputs are unchanged since a previous call are copied from
+    the rendered-report cache; the response lists them under "cache".
+    
     Returns:
         Dict with report paths and generation status
     """
@@ -154,12 +172,16 @@ async def generate_reports_endpoint(
     # 2. Validate findings
     is_valid, warnings, summary = validate_findings(findings_path)
     
-    # 3. Generate reports
+    # 3. Generate reports (unchanged variants come from the report cache)
+    cache_info = {}
+    generation_times = {}
     try:
         reports = generate_all_reports(
             findings_path,
             patient_lang=patient_lang,
-            include_hindi=include_hindi
+            include_hindi=include_hindi,
+            cache_info=cache_info,
+            generation_times=generation_times
         )
     except Exception as e:
         log(None, "report_generation_failed", {
@@ -191,6 +213,12 @@ async def generate_reports_endpoint(
         "reports": {k: v for k, v in reports.items() if "error" not in k},
         "errors": {k: v for k, v in reports.items() if "error" in k},
         "languages": ["en", "hi"] + ([patient_lang] if patient_lang not in ["en", "hi"] else []),
+        "cache": {
+            "hits": [k for k, hit in cache_info.items() if hit],
+            "rendered": [k for k, hit in cache_info.items() if not hit],
+            # Time printed in each PDF (cache hits keep their original time)
+            "generation_time": generation_times
+        },
         "db_updated": db_updated
     }
 
@@ -199,12 +227,15 @@ async def generate_reports_endpoint(
 async def get_reports(
     case_id: str,
     lang: Optional[str] = Query(None, description="Preferred language for patient report"),
-    user_id: Optional[str] = Query(None, description="User ID for access control")
+    user_id: Optional[str] = Query(None, description="User ID for access control"),
+    report_type: Optional[str] = Query(None, description="Response key of the report about to be opened")
 ):
     """
     Get report URLs for a case.
     
-    Returns paths to available reports based on user role.
+    Returns paths to available reports based on user role. A lazily
+    prepared report is rendered and uploaded only when it is the requested
+    report_type (e.g. clinician_report, patient_report_hi).
     """
     log_api_request(f"/reports/{case_id}", "GET", user_id=user_id, params={"lang": lang})
     
@@ -252,9 +283,46 @@ async def get_reports(
         else:
             response["patient_report"] = data.get("patient_pdf_en") or data.get("patient_pdf")
     
+    # Render + upload the report about to be opened if it was prepared lazily
+    if report_type and "_report" in report_type and response.get(report_type):
+        await run_in_threadpool(materialize_report_path, case_id, response[report_type])
+    
     return response
 
 
+@router.get("/{case_id}/download")
+async def download_report(
+    case_id: str,
+    report_type: str = Query(default="patient_en", description="clinician, patient_en, patient_hi, ..."),
+    user_id: Optional[str] = Query(None, description="User ID for access control")
+):
+    """
+    Download a report PDF.
+    
+    Lazily prepared cases (REPORT_LAZY_MODE) render the PDF on first
+    request and keep it for later downloads; eagerly generated cases are
+    served from local storage.
+    """
+    log_api_request(f"/reports/{case_id}/download", "GET", user_id=user_id,
+                    params={"report_type": report_type})
+    
+    # Lazy mode: render from stored HTML (no-op if already rendered)
+    path = await run_in_threadpool(materialize_report, case_id, report_type)
+    
+    # Eager mode: PDF saved by the pipeline
+    if path is None:
+        for report in list_local_reports(case_id):
+            name = report["filename"]
+            if name.startswith(f"{report_type}_") and name.endswith(".pdf"):
+                path = str(get_local_path(case_id, name))
+                break
+    
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Report not found: {report_type}")
+    
+    return FileResponse(path, media_type="application/pdf", filename=os.path.basename(path))
+
+
 @router.get("/{case_id}/validate")
 async def validate_case_findings(case_id: str):
     """
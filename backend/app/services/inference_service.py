@@ -25,6 +25,8 @@ from datetime import datetime
 
 import numpy as np
 
+from app.xai_service import write_xai_thumbnails
+
 # Lazy imports for torch (avoids startup crash if torch missing)
 _model = None
 _device = None
@@ -44,6 +46,27 @@ STRIDE = 48  # Overlap for smoother predictions
 HU_MIN = -1000
 HU_MAX = 400
 
+# Overall (clinician impression, patient summary) per risk tier;
+# {n} = nodules found, {k} = nodules in the tier
+IMPRESSION_TEMPLATES = {
+    "high": (
+        "AI detected {n} nodule(s), {k} classified as high-risk for malignancy. Clinical correlation and follow-up recommended.",
+        "The AI scan found {n} spot(s) in your lungs. {k} need(s) attention. Please consult your doctor for next steps.",
+    ),
+    "moderate": (
+        "AI detected {n} nodule(s), {k} with moderate risk. Monitoring recommended.",
+        "The AI scan found {n} spot(s). Some may need monitoring. Your doctor will advise on follow-up.",
+    ),
+    "low": (
+        "AI detected {n} nodule(s), all classified as low risk. Routine follow-up suggested.",
+        "The AI scan found {n} small spot(s) that appear low risk. Regular check-ups are recommended.",
+    ),
+    "none": (
+        "No significant nodules detected by AI analysis.",
+        "The AI scan did not find any concerning spots in your lungs. Continue with regular health check-ups.",
+    ),
+}
+
 
 # =============================================================================
 # Model Definition (Must match training)
@@ -652,6 +675,10 @@ def analyze_scan(
         nodule["overlay_path"] = "not_available"
         nodule["mask_path"] = "not_available"
 
+        # Report thumbnails (80px table, 300px gallery) rendered once here
+        if nodule["gradcam_path"] != "not_available":
+            write_xai_thumbnails(nodule)
+
     # 8. Save mask
     mask_path = os.path.join(output_dir, f"{case_id}_mask.npy")
     np.save(mask_path, mask)
@@ -664,17 +691,16 @@ def analyze_scan(
     moderate_risk = [n for n in nodules if 0.4 <= n.get("prob_malignant", 0) < 0.7]
 
     if high_risk:
-        impression = f"AI detected {len(nodules)} nodule(s), {len(high_risk)} classified as high-risk for malignancy. Clinical correlation and follow-up recommended."
-        summary_text = f"The AI scan found {len(nodules)} spot(s) in your lungs. {len(high_risk)} need(s) attention. Please consult your doctor for next steps."
+        tier, tier_count = "high", len(high_risk)
     elif moderate_risk:
-        impression = f"AI detected {len(nodules)} nodule(s), {len(moderate_risk)} with moderate risk. Monitoring recommended."
-        summary_text = f"The AI scan found {len(nodules)} spot(s). Some may need monitoring. Your doctor will advise on follow-up."
+        tier, tier_count = "moderate", len(moderate_risk)
     elif nodules:
-        impression = f"AI detected {len(nodules)} nodule(s), all classified as low risk. Routine follow-up suggested."
-        summary_text = f"The AI scan found {len(nodules)} small spot(s) that appear low risk. Regular check-ups are recommended."
+        tier, tier_count = "low", len(nodules)
     else:
-        impression = "No significant nodules detected by AI analysis."
-        summary_text = "The AI scan did not find any concerning spots in your lungs. Continue with regular health check-ups."
+        tier, tier_count = "none", 0
+    impression, summary_text = (
+        t.format(n=len(nodules), k=tier_count) for t in IMPRESSION_TEMPLATES[tier]
+    )
 
     findings = {
         "study_id": case_id,
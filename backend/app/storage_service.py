@@ -64,9 +64,17 @@ def download_bytes(bucket: str, path: str) -> Optional[bytes]:
         return None
 
 
-def upload_bytes(bucket: str, path: str, data: bytes, content_type: str = "application/pdf") -> bool:
+def upload_bytes(
+    bucket: str,
+    path: str,
+    data: bytes,
+    content_type: str = "application/pdf",
+    upsert: bool = False
+) -> bool:
     """
     Upload to Supabase Storage via REST API.
+    
+    upsert=True overwrites an existing object at the same path.
     """
     url = f"{SUPABASE_URL}/storage/v1/object/{bucket}/{path}"
     headers = {
@@ -74,6 +82,8 @@ def upload_bytes(bucket: str, path: str, data: bytes, content_type: str = "appli
         "apikey": SUPABASE_SERVICE_KEY,
         "Content-Type": content_type
     }
+    if upsert:
+        headers["x-upsert"] = "true"
 
     try:
         r = requests.post(url, headers=headers, data=data, timeout=60)
@@ -0,0 +1,326 @@
+# backend/app/translation_memory.py
+"""
+Sentence-level Translation Memory for the NLLB translator.
+
+Reports reuse a small set of sentences (impressions, disclaimers, template
+text), so each translation is stored under
+(normalised source sentence, target language, model id):
+- SQLite file under app/.cache (persistent, no extra dependency)
+- LRU eviction by last use, bounded by entry count
+- Consulted by translator.translate_many() before the model runs
+- Seedable offline from the report templates and analyze_scan impressions
+
+Usage (from backend/):
+    python -m app.translation_memory --seed [--langs hindi telugu ...]
+    python -m app.translation_memory --stats
+"""
+
+import html
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+TRANSLATION_MEMORY_ENABLED = os.getenv("TRANSLATION_MEMORY", "true").lower() in ("1", "true", "yes")
+TRANSLATION_MEMORY_PATH = Path(os.getenv(
+    "TRANSLATION_MEMORY_PATH",
+    str(Path(__file__).parent / ".cache" / "translation_memory.sqlite3")
+))
+TRANSLATION_MEMORY_MAX_ENTRIES = int(os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", "200000"))
+
+# Run eviction after this many new entries
+EVICT_EVERY = 500
+
+# SQLite host-parameter limit is 999 on older builds
+_QUERY_CHUNK = 500
+
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+SEED_TEMPLATES = ["patient_report_en.md", "patient_summary_en_hi.txt", "patient_summary_sectioned.md"]
+SEED_MAX_NODULES = 10
+
+Key = Tuple[str, str]  # (source sentence, NLLB target code)
+
+
+def normalize_source(sentence: str) -> str:
+    """Memory key form of a source sentence (NFC, single spaces)."""
+    return " ".join(unicodedata.normalize("NFC", sentence).split())
+
+
+# =============================================================================
+# Store
+# =============================================================================
+
+class TranslationMemory:
+    """SQLite-backed sentence translation store with LRU eviction."""
+
+    def __init__(self, path: Path = TRANSLATION_MEMORY_PATH, max_entries: int = TRANSLATION_MEMORY_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tm (
+                    source TEXT NOT NULL,
+                    lang TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    last_used REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (source, lang, model)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS tm_last_used ON tm (last_used)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, keys: Iterable[Key], model: str) -> Dict[Key, str]:
+        """
+        Look up translations; refreshes last-use time of every hit.
+
+        Args:
+            keys: (source sentence, NLLB target code) pairs
+            model: Model identifier the translations came from
+
+        Returns:
+            Dict of the keys found → translated sentence
+        """
+        by_lang: Dict[str, Dict[str, List[Key]]] = {}
+        for key in keys:
+            sentence, lang = key
+            by_lang.setdefault(lang, {}).setdefault(normalize_source(sentence), []).append(key)
+
+        found: Dict[Key, str] = {}
+        touched = []
+        with self._lock:
+            db = self._db()
+            for lang, sources in by_lang.items():
+                names = list(sources)
+                for i in range(0, len(names), _QUERY_CHUNK):
+                    chunk = names[i:i + _QUERY_CHUNK]
+                    rows = db.execute(
+                        f"SELECT source, target FROM tm WHERE model = ? AND lang = ? "
+                        f"AND source IN ({','.join('?' * len(chunk))})",
+                        [model, lang, *chunk],
+                    ).fetchall()
+                    for source, target in rows:
+                        for key in sources[source]:
+                            found[key] = target
+                        touched.append((time.time(), source, lang, model))
+            if touched:
+                db.executemany(
+                    "UPDATE tm SET last_used = ?, hits = hits + 1 WHERE source = ? AND lang = ? AND model = ?",
+                    touched,
+                )
+                db.commit()
+            total = sum(len(v) for sources in by_lang.values() for v in sources.values())
+            self.hits += len(found)
+            self.misses += total - len(found)
+        return found
+
+    def put_many(self, translations: Dict[Key, str], model: str) -> None:
+        """Store translations (existing entries are replaced)."""
+        if not translations:
+            return
+        now = time.time()
+        rows = [
+            (normalize_source(sentence), lang, model, target, now)
+            for (sentence, lang), target in translations.items()
+        ]
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "INSERT OR REPLACE INTO tm (source, lang, model, target, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                rows,
+            )
+            db.commit()
+            self._writes += len(rows)
+            if self._writes >= EVICT_EVERY:
+                self._writes = 0
+                self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection) -> int:
+        excess = db.execute("SELECT COUNT(*) FROM tm").fetchone()[0] - self.max_entries
+        if excess <= 0:
+            return 0
+        db.execute(
+            "DELETE FROM tm WHERE (source, lang, model) IN "
+            "(SELECT source, lang, model FROM tm ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        db.commit()
+        return excess
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries above max_entries. Returns count removed."""
+        with self._lock:
+            return self._evict(self._db())
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM tm")
+            db.commit()
+
+    def stats(self) -> Dict:
+        """Get translation memory statistics."""
+        with self._lock:
+            db = self._db()
+            entries, stored_hits = db.execute("SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM tm").fetchone()
+            langs = dict(db.execute("SELECT lang, COUNT(*) FROM tm GROUP BY lang").fetchall())
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "by_lang": langs,
+            "lifetime_hits": stored_hits,
+            "session_hits": self.hits,
+            "session_misses": self.misses,
+            "path": str(self.path),
+        }
+
+
+_memory: Optional[TranslationMemory] = None
+_memory_lock = threading.Lock()
+
+
+def get_translation_memory() -> Optional[TranslationMemory]:
+    """Get the shared translation memory (None if disabled)."""
+    global _memory
+    if not TRANSLATION_MEMORY_ENABLED:
+        return None
+    with _memory_lock:
+        if _memory is None:
+            _memory = TranslationMemory()
+        return _memory
+
+
+# =============================================================================
+# Seeding
+# =============================================================================
+
+def template_texts(path: Path) -> List[str]:
+    """
+    Static English text of a report template (markup and Jinja removed).
+
+    Lines holding template expressions are skipped: their wording depends
+    on the case and cannot be pre-translated.
+    """
+    source = path.read_text(encoding="utf-8")
+    source = re.sub(r"\{#.*?#\}|<!--.*?-->|<style.*?</style>|<head.*?</head>", " ", source, flags=re.S)
+    source = re.sub(r"\{%.*?%\}", "\n", source, flags=re.S)
+
+    # Blocks end at tags, blank lines and ----/==== rules; wrapped lines are joined
+    texts = []
+    for chunk in re.split(r"<[^>]+>|\n\s*\n|^\s*[-=]{3,}\s*$", source, flags=re.M):
+        text = " ".join(html.unescape(chunk).split()).strip(" -=:|")
+        if "{{" in text or "}}" in text:
+            continue
+        if len(re.findall(r"[A-Za-z]{2,}", text)) >= 3:
+            texts.append(text)
+    return texts
+
+
+def impression_texts(max_nodules: int = SEED_MAX_NODULES) -> List[str]:
+    """analyze_scan impressions and patient summaries for 0..max_nodules nodules."""
+    from app.services.inference_service import IMPRESSION_TEMPLATES
+
+    texts = list(IMPRESSION_TEMPLATES["none"])
+    for n in range(1, max_nodules + 1):
+        texts.extend(t.format(n=n, k=n) for t in IMPRESSION_TEMPLATES["low"])
+        for k in range(1, n + 1):
+            for tier in ("high", "moderate"):
+                texts.extend(t.format(n=n, k=k) for t in IMPRESSION_TEMPLATES[tier])
+    return texts
+
+
+def seed_texts(max_nodules: int = SEED_MAX_NODULES) -> List[str]:
+    """Every text the seeder pre-translates (de-duplicated, stable order)."""
+    texts = []
+    for name in SEED_TEMPLATES:
+        path = TEMPLATE_DIR / name
+        if path.exists():
+            texts.extend(template_texts(path))
+    texts.extend(impression_texts(max_nodules))
+    return list(dict.fromkeys(texts))
+
+
+def seed_translation_memory(
+    langs: Optional[List[str]] = None,
+    max_nodules: int = SEED_MAX_NODULES,
+    chunk_size: int = 64
+) -> Dict:
+    """
+    Pre-translate the seed texts into every language (offline job).
+
+    Sentences already in memory are skipped, so re-running only fills gaps.
+
+    Args:
+        langs: Language names (default: all of translator.LANG_CODES)
+        max_nodules: Highest nodule count the impression templates are expanded for
+        chunk_size: Texts per translate_many() call
+
+    Returns:
+        Dict with texts, languages and the memory stats afterwards
+    """
+    from app.translator import LANG_CODES, translate_many
+
+    langs = langs or list(LANG_CODES)
+    texts = seed_texts(max_nodules)
+    print(f"[tm] Seeding {len(texts)} texts × {len(langs)} languages")
+
+    t0 = time.perf_counter()
+    for i in range(0, len(texts), chunk_size):
+        translate_many(texts[i:i + chunk_size], langs)
+        print(f"[tm] {min(i + chunk_size, len(texts))}/{len(texts)} texts ({time.perf_counter() - t0:.0f}s)")
+
+    memory = get_translation_memory()
+    return {
+        "texts": len(texts),
+        "languages": langs,
+        "seconds": round(time.perf_counter() - t0, 1),
+        "memory": memory.stats() if memory else None,
+    }
+
+
+# =============================================================================
+# CLI Entry
+# =============================================================================
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Translation memory maintenance.")
+    parser.add_argument("--seed", action="store_true", help="Pre-translate templates and impressions")
+    parser.add_argument("--langs", nargs="*", help="Languages to seed (default: all)")
+    parser.add_argument("--max-nodules", type=int, default=SEED_MAX_NODULES)
+    parser.add_argument("--stats", action="store_true", help="Print memory statistics")
+    args = parser.parse_args()
+
+    if args.seed:
+        print(json.dumps(seed_translation_memory(args.langs, args.max_nodules), indent=2, ensure_ascii=False))
+    elif args.stats:
+        memory = get_translation_memory()
+        print(json.dumps(memory.stats() if memory else {"enabled": False}, indent=2, ensure_ascii=False))
+    else:
+        parser.print_help()
@@ -1,13 +1,42 @@
 # translator.py
 # Final production-grade translator module for FYP
 # Model: Meta AI NLLB 200 distilled 600M (best stable model for Indian languages)
+#
+# The model is loaded on first use, not at import, and owned by one worker
+# thread shared by every caller. Texts are split into sentences and queued;
+# the worker translates everything queued (many sentences, many target
+# languages) in padded batches, one generate() call per batch. Sentences
+# already in the translation memory never reach the model.
 
-import torch
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+import gc
+import os
+import re
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.translation_memory import get_translation_memory
 
 # ---------- MODEL CONFIG ----------
-MODEL_ID = "facebook/nllb-200-distilled-600M"
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+MODEL_ID = os.getenv("TRANSLATOR_MODEL_ID", "facebook/nllb-200-distilled-600M")
+DEVICE = os.getenv("TRANSLATOR_DEVICE", "")  # empty = cuda if available, else cpu
+
+# fp32 | int8 (dynamic int8 Linear layers, CPU) | bf16
+# Check quality first: python eval_translator_precision.py
+PRECISION = os.getenv("TRANSLATOR_PRECISION", "fp32").lower()
+PRECISIONS = ("fp32", "int8", "bf16")
+
+# Beam search width for normal text; short UI strings use greedy decoding
+NUM_BEAMS = int(os.getenv("TRANSLATOR_NUM_BEAMS", "4"))
+SHORT_TEXT_CHARS = int(os.getenv("TRANSLATOR_SHORT_TEXT_CHARS", "40"))
+
+# Sentences per generate() call, and how long the worker waits to coalesce callers
+BATCH_SIZE = int(os.getenv("TRANSLATOR_BATCH_SIZE", "32"))
+BATCH_WAIT_MS = float(os.getenv("TRANSLATOR_BATCH_WAIT_MS", "5"))
+
+MAX_NEW_TOKENS = 256
 
 # Language → NLLB code mapping
 LANG_CODES = {
@@ -26,59 +55,320 @@ LANG_CODES = {
     "urdu": "urd_Arab",
 }
 
-# ---------- LOAD MODEL ----------
-print(f"[Translator] Loading {MODEL_ID} on {DEVICE} ...")
-tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
-model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_ID).to(DEVICE)
-model.eval()
-print("[Translator] Ready!")
+# Sentence boundary: . ! ? and the Devanagari danda, followed by whitespace
+SENTENCE_END = re.compile(r"(?<=[.!?।॥])\s+")
+
+# Symbols that corrupt Indic output
+NOISE_SYMBOLS = {
+    "•": "-", "|": " ", "→": " ", "⇒": " ", "►": " ", "✔": " ",
+    "✖": " ", "★": " ", "✦": " ", "👌": " ", "👉": " ",
+}
+
 
-# ---------- TRANSLATION FUNCTION ----------
-def translate(text: str, target_lang: str = "hindi") -> str:
+# ---------- TEXT PREP ----------
+def clean_text(text: str) -> str:
     """
-    Clean + safe translation to avoid Indic corruption.
+    Clean + safe input to avoid Indic corruption.
     """
-    target_lang = target_lang.lower()
+    for symbol, repl in NOISE_SYMBOLS.items():
+        text = text.replace(symbol, repl)
+    return " ".join(text.split())  # collapse spacing
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split cleaned text into sentences (translated independently)."""
+    return [s for s in SENTENCE_END.split(text) if s]
 
+
+def resolve_lang(target_lang: str) -> str:
+    """Language name → NLLB code (raises ValueError if unsupported)."""
+    target_lang = target_lang.lower()
     if target_lang not in LANG_CODES:
         raise ValueError(f"Language '{target_lang}' is not supported.")
+    return LANG_CODES[target_lang]
 
-    tgt_code = LANG_CODES[target_lang]
-
-    # --- CLEAN INPUT (very important) ---
-    clean = (
-        text.replace("•", "-")
-            .replace("|", " ")
-            .replace("→", " ")
-            .replace("⇒", " ")
-            .replace("►", " ")
-            .replace("✔", " ")
-            .replace("✖", " ")
-            .replace("★", " ")
-            .replace("✦", " ")
-            .replace("👌", " ")
-            .replace("👉", " ")
-    )
-
-    clean = " ".join(clean.split())  # collapse spacing
 
-    try:
-        inputs = tokenizer(clean, return_tensors="pt").to(DEVICE)
+def beams_for(text: str, num_beams: Optional[int] = None) -> int:
+    """Beam width for a text: explicit value, else greedy for short strings."""
+    if num_beams:
+        return num_beams
+    return 1 if len(text) <= SHORT_TEXT_CHARS else NUM_BEAMS
+
+
+# ---------- ENGINE ----------
+class TranslationEngine:
+    """
+    NLLB model behind a single worker thread.
+
+    submit() queues (sentence, NLLB code, beams) jobs and returns Futures.
+    The worker drains the queue, de-duplicates jobs, groups them by beam
+    width, sorts by length so each batch pads little, and decodes each
+    batch with one generate() call. The target language is set per row
+    through the decoder prompt, so one batch can mix languages.
+    """
+
+    def __init__(
+        self,
+        model_id: str = MODEL_ID,
+        device: str = DEVICE,
+        batch_size: int = BATCH_SIZE,
+        precision: str = PRECISION
+    ):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Precision '{precision}' is not supported ({', '.join(PRECISIONS)}).")
+        self.model_id = model_id
+        self.device = device
+        self.precision = precision
+        self.batch_size = max(1, batch_size)
+        self.tokenizer = None
+        self.model = None
+        self._torch = None
+        # None is the close() sentinel
+        self._queue: "queue.Queue[Optional[List[Tuple[str, str, int, Future]]]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {"batches": 0, "sentences": 0, "requests": 0}
+
+    @property
+    def model_key(self) -> str:
+        """Model identity for the translation memory (precision changes output)."""
+        return self.model_id if self.precision == "fp32" else f"{self.model_id}@{self.precision}"
+
+    # --- lifecycle ---
+    def _load(self) -> None:
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+        self._torch = torch
+        self.device = self.device or ("cuda" if torch.cuda.is_available() else "cpu")
+        if self.precision == "int8" and self.device != "cpu":
+            print(f"[Translator] ⚠️ int8 dynamic quantisation is CPU-only, using fp32 on {self.device}")
+            self.precision = "fp32"
+
+        print(f"[Translator] Loading {self.model_id} ({self.precision}) on {self.device} ...")
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_id)
+        model = AutoModelForSeq2SeqLM.from_pretrained(self.model_id)
+        model.eval()
+
+        if self.precision == "int8":
+            # Weights stored as int8, activations quantised on the fly per batch
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif self.precision == "bf16":
+            model = model.to(torch.bfloat16)
+
+        self.model = model.to(self.device)
+        print("[Translator] Ready!")
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="translator", daemon=True)
+                self._worker.start()
+
+    def close(self) -> None:
+        """
+        Stop the worker (after it finishes queued jobs) and release the model.
+
+        The engine stays usable: the next submit() reloads the model.
+        """
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None and worker.is_alive():
+            self._queue.put(None)
+            worker.join()
+        self.model = None
+        self.tokenizer = None
+        gc.collect()
+        if self._torch is not None and self._torch.cuda.is_available():
+            self._torch.cuda.empty_cache()
+
+    # --- public ---
+    def submit(self, requests: List[Tuple[str, str, int]]) -> List[Future]:
+        """
+        Queue sentences for translation.
+
+        Args:
+            requests: (sentence, NLLB target code, num_beams) tuples
+
+        Returns:
+            One Future per request, resolving to the translated sentence
+        """
+        jobs = [(sentence, code, beams, Future()) for sentence, code, beams in requests]
+        if jobs:
+            self._ensure_worker()
+            self._queue.put(jobs)
+        return [job[3] for job in jobs]
+
+    # --- worker ---
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:  # close()
+                return
+            jobs = list(first)
+            stop = False
+            deadline = time.monotonic() + BATCH_WAIT_MS / 1000
+            while True:
+                try:
+                    more = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if more is None:
+                    stop = True
+                    break
+                jobs.extend(more)
+            self._process(jobs)
+            if stop:
+                return
+
+    def _process(self, jobs: List[Tuple[str, str, int, Future]]) -> None:
+        if self.model is None:
+            try:
+                self._load()
+            except Exception as e:
+                self.model = None
+                for *_, future in jobs:
+                    future.set_exception(e)
+                return
+
+        # beams → (sentence, code) → futures waiting on it
+        groups: Dict[int, Dict[Tuple[str, str], List[Future]]] = {}
+        for sentence, code, beams, future in jobs:
+            groups.setdefault(beams, {}).setdefault((sentence, code), []).append(future)
+        self.stats["requests"] += len(jobs)
+
+        for beams, waiting in groups.items():
+            items = sorted(waiting, key=lambda k: len(k[0]))  # similar lengths pad less
+            for i in range(0, len(items), self.batch_size):
+                chunk = items[i:i + self.batch_size]
+                try:
+                    outputs = self._generate(chunk, beams)
+                except Exception as e:
+                    for key in chunk:
+                        for future in waiting[key]:
+                            future.set_exception(e)
+                    continue
+                for key, text in zip(chunk, outputs):
+                    for future in waiting[key]:
+                        future.set_result(text)
+
+    def _generate(self, chunk: List[Tuple[str, str]], num_beams: int) -> List[str]:
+        """Translate one padded batch; each row carries its own target language."""
+        torch = self._torch
+        inputs = self.tokenizer(
+            [sentence for sentence, _ in chunk], return_tensors="pt", padding=True
+        ).to(self.device)
+
+        # Decoder prompt </s> <tgt_lang> per row (what forced_bos_token_id does for one language)
+        start_id = self.model.config.decoder_start_token_id
+        decoder_input_ids = torch.tensor(
+            [[start_id, self.tokenizer.convert_tokens_to_ids(code)] for _, code in chunk],
+            device=self.device,
+        )
 
         with torch.no_grad():
-            output = model.generate(
+            output = self.model.generate(
                 **inputs,
-                forced_bos_token_id=tokenizer.convert_tokens_to_ids(tgt_code),
-                num_beams=4,
-                max_new_tokens=256,
+                decoder_input_ids=decoder_input_ids,
+                num_beams=num_beams,
+                max_new_tokens=MAX_NEW_TOKENS,
                 no_repeat_ngram_size=4,
                 repetition_penalty=1.1,
-                early_stopping=True,
+                early_stopping=num_beams > 1,
             )
 
-        translated = tokenizer.batch_decode(output, skip_special_tokens=True)[0]
-        return translated.strip()
+        self.stats["batches"] += 1
+        self.stats["sentences"] += len(chunk)
+        return [t.strip() for t in self.tokenizer.batch_decode(output, skip_special_tokens=True)]
+
+
+_engine: Optional[TranslationEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> TranslationEngine:
+    """Get the shared translation engine (model loads on first translation)."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = TranslationEngine()
+        return _engine
+
+
+# ---------- TRANSLATION FUNCTIONS ----------
+def translate_many(
+    texts: List[str],
+    target_langs: Union[str, List[str]] = "hindi",
+    num_beams: Optional[int] = None
+) -> Dict[str, List[str]]:
+    """
+    Translate several texts into several languages in shared batches.
+
+    Args:
+        texts: Source (English) texts
+        target_langs: Language name or list of names (see LANG_CODES)
+        num_beams: Beam width; None = greedy for short strings, NUM_BEAMS otherwise
+
+    Returns:
+        {language: [translation of each text]}
+    """
+    langs = [target_langs] if isinstance(target_langs, str) else list(target_langs)
+    codes = {lang.lower(): resolve_lang(lang) for lang in langs}
+
+    prepared = []
+    for text in texts:
+        clean = clean_text(text)
+        prepared.append((split_sentences(clean), beams_for(clean, num_beams)))
+
+    engine = get_engine()
+
+    # Sentences seen before come from the translation memory
+    wanted = {
+        (sentence, code)
+        for code in codes.values()
+        for sentences, _ in prepared
+        for sentence in sentences
+    }
+    memory = get_translation_memory()
+    known: Dict[Tuple[str, str], str] = {}
+    if memory and wanted:
+        try:
+            known = memory.get_many(wanted, engine.model_key)
+        except Exception as e:
+            print(f"[Translator] ⚠️ Translation memory lookup failed: {e}")
+
+    # Queue every miss at once so the worker batches across texts and languages
+    requests = {}
+    for code in codes.values():
+        for sentences, beams in prepared:
+            for sentence in sentences:
+                key = (sentence, code)
+                if key not in known and key not in requests:
+                    requests[key] = beams
+    futures = engine.submit([(sentence, code, beams) for (sentence, code), beams in requests.items()])
+    fresh = {key: future.result() for key, future in zip(requests, futures)}
+
+    if memory and fresh:
+        try:
+            memory.put_many(fresh, engine.model_key)
+        except Exception as e:
+            print(f"[Translator] ⚠️ Translation memory update failed: {e}")
 
+    translated = {**known, **fresh}
+    return {
+        lang: [" ".join(translated[(sentence, code)] for sentence in sentences) for sentences, _ in prepared]
+        for lang, code in codes.items()
+    }
+
+
+def translate(text: str, target_lang: str = "hindi", num_beams: Optional[int] = None) -> str:
+    """
+    Clean + safe translation to avoid Indic corruption.
+    """
+    resolve_lang(target_lang)
+
+    try:
+        return translate_many([text], target_lang, num_beams)[target_lang.lower()][0]
     except Exception as e:
         return f"[Translation Error] {str(e)}"
 
@@ -87,6 +377,7 @@ def translate(text: str, target_lang: str = "hindi") -> str:
 # ---------- QUICK TEST ----------
 if __name__ == "__main__":
     sample = "The lungs appear clear and well expanded. No nodules or infiltrates are seen."
+    langs = ["hindi", "telugu", "tamil", "malayalam", "marathi"]
 
-    for lang in ["hindi", "telugu", "tamil", "malayalam", "marathi"]:
-        print(f"\n{lang.upper()} →", translate(sample, lang))
+    for lang, (out,) in translate_many([sample], langs).items():
+        print(f"\n{lang.upper()} →", out)
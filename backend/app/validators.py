@@ -7,6 +7,8 @@ This module provides:
 - Graceful degradation with warnings instead of failures
 - Semantic validation beyond schema (business rules)
 - Audit-ready logging of validation issues
+- Compiled schema validator (recompiled only when the schema file changes)
+- Results memoised per findings content hash
 
 Corporate Standards:
 - All validation failures logged to audit_logs
@@ -16,7 +18,11 @@ Corporate Standards:
 Upgraded for Phase-2: Feb 2026
 """
 
+import hashlib
 import json
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Union
 from datetime import datetime
@@ -32,6 +38,19 @@ except ImportError:
 
 SCHEMA_PATH = Path(__file__).parent / "schema" / "findings.schema.json"
 
+# Max memoised validation results (keyed by findings content hash)
+VALIDATION_CACHE_SIZE = int(os.getenv("VALIDATION_CACHE_SIZE", "256"))
+
+XAI_PATH_KEYS = ["gradcam_path", "saliency_path", "overlay_path", "mask_path"]
+VALID_NODULE_TYPES = ["solid", "subsolid", "ground-glass", "ground_glass", "ggo", "unknown", ""]
+
+_schema_lock = threading.Lock()
+_schema_state = {"signature": None, "schema": {}, "validator": None, "compiles": 0}
+
+_results: "OrderedDict[str, Tuple[bool, Tuple[str, ...], Dict]]" = OrderedDict()
+_results_lock = threading.Lock()
+_results_stats = {"hits": 0, "misses": 0}
+
 
 # =============================================================================
 # Core Schema Validation
@@ -45,6 +64,38 @@ def load_schema() -> Dict:
         return json.load(f)
 
 
+def _schema_signature() -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of the schema file, or None if it is missing."""
+    try:
+        st = SCHEMA_PATH.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def get_schema_validator():
+    """
+    Get the compiled findings schema validator.
+    
+    The schema is read and compiled into a Draft7Validator once, and again
+    only when the schema file changes on disk.
+    
+    Returns:
+        Draft7Validator, or None if jsonschema or the schema file is missing
+    """
+    if not HAS_JSONSCHEMA:
+        return None
+    signature = _schema_signature()
+    with _schema_lock:
+        if signature != _schema_state["signature"]:
+            schema = load_schema() if signature else {}
+            _schema_state["schema"] = schema
+            _schema_state["validator"] = Draft7Validator(schema) if schema else None
+            _schema_state["signature"] = signature
+            _schema_state["compiles"] += 1
+        return _schema_state["validator"]
+
+
 def validate_against_schema(data: Dict) -> List[str]:
     """
     Validate findings against JSON schema.
@@ -55,13 +106,11 @@ def validate_against_schema(data: Dict) -> List[str]:
     if not HAS_JSONSCHEMA:
         return ["jsonschema module not installed - schema validation skipped"]
     
-    schema = load_schema()
-    if not schema:
+    validator = get_schema_validator()
+    if validator is None:
         return ["Schema file not found - validation skipped"]
     
     warnings = []
-    validator = Draft7Validator(schema)
-    
     for error in validator.iter_errors(data):
         path = " → ".join(str(p) for p in error.absolute_path) if error.absolute_path else "root"
         warnings.append(f"[Schema:{path}] {error.message}")
@@ -100,134 +149,87 @@ def validate_required_fields(data: Dict) -> List[str]:
 
 
 # =============================================================================
-# Nodule-Level Validation
+# Nodule-Level Validation (single pass)
 # =============================================================================
 
-def validate_nodule_fields(data: Dict) -> List[str]:
-    """
-    Validate each nodule has required fields for reporting.
-    
-    Required per nodule:
-    - id
-    - long_axis_mm or size
-    - p_malignant or prob_malignant
-    - type (solid/subsolid/ground-glass)
-    - location or lobe
-    """
-    warnings = []
-    nodules = data.get("nodules", [])
-    
-    for i, nodule in enumerate(nodules):
-        nodule_id = nodule.get("id", i)
-        
-        # Size validation
-        if not nodule.get("long_axis_mm") and not nodule.get("size"):
-            warnings.append(f"[Nodule {nodule_id}] Missing size measurement")
-        
-        # Malignancy probability
-        if nodule.get("p_malignant") is None and nodule.get("prob_malignant") is None:
-            warnings.append(f"[Nodule {nodule_id}] Missing malignancy probability")
-        
-        # Type validation
-        nodule_type = str(nodule.get("type", "")).lower()
-        valid_types = ["solid", "subsolid", "ground-glass", "ground_glass", "ggo", "unknown", ""]
-        if nodule_type and nodule_type not in valid_types:
-            warnings.append(f"[Nodule {nodule_id}] Unknown type '{nodule_type}' - expected solid/subsolid/ground-glass")
-        
-        # Location validation
-        if not nodule.get("location") and not nodule.get("lobe"):
-            warnings.append(f"[Nodule {nodule_id}] Missing anatomical location")
-    
-    return warnings
-
+def _has_xai(nodule: Dict) -> bool:
+    return any(
+        nodule.get(key) and nodule.get(key) != "not_available"
+        for key in ["gradcam_path", "saliency_path", "overlay_path"]
+    )
 
-# =============================================================================
-# XAI/Explainability Validation
-# =============================================================================
 
-def validate_xai_paths(data: Dict) -> List[str]:
+def validate_nodules(data: Dict) -> Tuple[List[str], List[str], List[str]]:
     """
-    Validate explainability asset paths exist.
+    Run every per-nodule check in one pass over the nodules.
     
-    Checks:
-    - gradcam_path
-    - saliency_path  
-    - overlay_path
-    - mask_path
+    Nodule fields (per nodule):
+    - size (long_axis_mm or size), malignancy probability
+    - type (solid/subsolid/ground-glass), location or lobe
     
-    Only warns for high-risk nodules missing XAI.
-    """
-    warnings = []
-    nodules = data.get("nodules", [])
-    
-    for nodule in nodules:
-        nodule_id = nodule.get("id", "unknown")
-        prob = nodule.get("p_malignant") or nodule.get("prob_malignant") or 0
-        
-        # Check file existence for all paths
-        for key in ["gradcam_path", "saliency_path", "overlay_path", "mask_path"]:
-            path_val = nodule.get(key)
-            if path_val and path_val != "not_available":
-                if not Path(path_val).exists():
-                    warnings.append(f"[XAI:Nodule {nodule_id}] {key} file missing: {path_val}")
-        
-        # High-risk nodules should have XAI
-        if prob >= 0.7:
-            has_xai = any([
-                nodule.get("gradcam_path") and nodule.get("gradcam_path") != "not_available",
-                nodule.get("saliency_path") and nodule.get("saliency_path") != "not_available",
-                nodule.get("overlay_path") and nodule.get("overlay_path") != "not_available",
-            ])
-            
-            if not has_xai:
-                warnings.append(
-                    f"[XAI:Nodule {nodule_id}] High-risk nodule (p={prob:.2f}) missing explainability visualization"
-                )
+    XAI (per nodule):
+    - gradcam/saliency/overlay/mask files exist
+    - high-risk nodules (p >= 0.7) have a visualisation
     
-    return warnings
-
-
-# =============================================================================
-# Sanity Checks
-# =============================================================================
-
-def validate_risk_thresholds(data: Dict) -> List[str]:
-    """
-    Sanity check malignancy probabilities.
-    
-    Flags:
-    - All probabilities > 0.9 (suspicious)
-    - All probabilities identical (likely synthetic)
-    - Negative or > 1.0 values
+    Sanity:
     - num_nodules mismatch
+    - probabilities outside 0-1, high malignancy with high uncertainty
+    - all probabilities > 0.9 or identical (suspicious/synthetic)
+    
+    Returns:
+        Tuple of (nodule_warnings, xai_warnings, sanity_warnings)
     """
-    warnings = []
+    nodule_warnings = []
+    xai_warnings = []
+    risk_warnings = []
     nodules = data.get("nodules", [])
     
     # Count mismatch
     declared_count = data.get("num_nodules", 0)
     actual_count = len(nodules)
     if declared_count != actual_count:
-        warnings.append(
+        risk_warnings.append(
             f"[Sanity] num_nodules mismatch: declared {declared_count} vs actual {actual_count}"
         )
     
-    if not nodules:
-        return warnings
-    
     probs = []
-    for nodule in nodules:
-        prob = nodule.get("p_malignant") or nodule.get("prob_malignant")
+    for i, nodule in enumerate(nodules):
         nodule_id = nodule.get("id", "unknown")
         
+        # --- Nodule fields ---
+        field_id = nodule.get("id", i)
+        if not nodule.get("long_axis_mm") and not nodule.get("size"):
+            nodule_warnings.append(f"[Nodule {field_id}] Missing size measurement")
+        
+        if nodule.get("p_malignant") is None and nodule.get("prob_malignant") is None:
+            nodule_warnings.append(f"[Nodule {field_id}] Missing malignancy probability")
+        
+        nodule_type = str(nodule.get("type", "")).lower()
+        if nodule_type and nodule_type not in VALID_NODULE_TYPES:
+            nodule_warnings.append(f"[Nodule {field_id}] Unknown type '{nodule_type}' - expected solid/subsolid/ground-glass")
+        
+        if not nodule.get("location") and not nodule.get("lobe"):
+            nodule_warnings.append(f"[Nodule {field_id}] Missing anatomical location")
+        
+        # --- XAI paths ---
+        for key in XAI_PATH_KEYS:
+            path_val = nodule.get(key)
+            if path_val and path_val != "not_available":
+                if not Path(path_val).exists():
+                    xai_warnings.append(f"[XAI:Nodule {nodule_id}] {key} file missing: {path_val}")
+        
+        prob = nodule.get("p_malignant") or nodule.get("prob_malignant")
+        if (prob or 0) >= 0.7 and not _has_xai(nodule):
+            xai_warnings.append(
+                f"[XAI:Nodule {nodule_id}] High-risk nodule (p={prob or 0:.2f}) missing explainability visualization"
+            )
+        
+        # --- Sanity ---
         if prob is not None:
             probs.append(prob)
-            
-            # Range check
             if prob < 0 or prob > 1:
-                warnings.append(f"[Nodule {nodule_id}] Invalid probability {prob} - must be 0-1")
+                risk_warnings.append(f"[Nodule {nodule_id}] Invalid probability {prob} - must be 0-1")
         
-        # High malignancy + high uncertainty check
         uncertainty = nodule.get("uncertainty", {})
         if isinstance(uncertainty, dict):
             u_val = uncertainty.get("entropy", 0) or uncertainty.get("confidence", 0)
@@ -235,19 +237,98 @@ def validate_risk_thresholds(data: Dict) -> List[str]:
             u_val = uncertainty if isinstance(uncertainty, (int, float)) else 0
         
         if prob and prob > 0.8 and u_val > 0.5:
-            warnings.append(
+            risk_warnings.append(
                 f"[Nodule {nodule_id}] High malignancy ({prob:.2f}) but high uncertainty ({u_val:.2f}) — flagging for review"
             )
     
     if probs:
-        # Suspicious patterns
         if all(p > 0.9 for p in probs) and len(probs) > 3:
-            warnings.append("[Sanity] All nodules show >90% malignancy - verify ML output")
+            risk_warnings.append("[Sanity] All nodules show >90% malignancy - verify ML output")
         
         if len(set(round(p, 4) for p in probs)) == 1 and len(probs) > 3:
-            warnings.append("[Sanity] All nodules have identical probability - possible synthetic data")
+            risk_warnings.append("[Sanity] All nodules have identical probability - possible synthetic data")
     
-    return warnings
+    return nodule_warnings, xai_warnings, risk_warnings
+
+
+def validate_nodule_fields(data: Dict) -> List[str]:
+    """Validate each nodule has required fields for reporting."""
+    return validate_nodules(data)[0]
+
+
+def validate_xai_paths(data: Dict) -> List[str]:
+    """Validate explainability asset paths exist (high-risk nodules need XAI)."""
+    return validate_nodules(data)[1]
+
+
+def validate_risk_thresholds(data: Dict) -> List[str]:
+    """Sanity check malignancy probabilities and the declared nodule count."""
+    return validate_nodules(data)[2]
+
+
+# =============================================================================
+# Result Memoisation
+# =============================================================================
+
+def _result_key(content: bytes, data: Dict) -> str:
+    """
+    Memo key for one validation: findings content, schema version and which
+    XAI files currently exist (so a later-written heatmap is noticed).
+    """
+    h = hashlib.sha256(content)
+    h.update(repr((HAS_JSONSCHEMA, _schema_signature())).encode("utf-8"))
+    for nodule in data.get("nodules", []) if isinstance(data.get("nodules"), list) else []:
+        if not isinstance(nodule, dict):
+            continue
+        for key in XAI_PATH_KEYS:
+            path_val = nodule.get(key)
+            if isinstance(path_val, str) and path_val and path_val != "not_available":
+                h.update(b"\1" if Path(path_val).exists() else b"\0")
+    return h.hexdigest()
+
+
+def _cached_result(key: str) -> Optional[Tuple[bool, List[str], Dict]]:
+    with _results_lock:
+        entry = _results.get(key)
+        if entry is None:
+            _results_stats["misses"] += 1
+            return None
+        _results.move_to_end(key)
+        _results_stats["hits"] += 1
+    is_valid, warnings, summary = entry
+    summary = dict(summary, warnings_sample=list(summary["warnings_sample"]))
+    summary["timestamp"] = datetime.utcnow().isoformat() + "Z"
+    return is_valid, list(warnings), summary
+
+
+def _store_result(key: str, is_valid: bool, warnings: List[str], summary: Dict) -> None:
+    if VALIDATION_CACHE_SIZE <= 0:
+        return
+    frozen = dict(summary, warnings_sample=list(summary["warnings_sample"]))
+    frozen.pop("timestamp", None)
+    with _results_lock:
+        _results[key] = (is_valid, tuple(warnings), frozen)
+        _results.move_to_end(key)
+        while len(_results) > VALIDATION_CACHE_SIZE:
+            _results.popitem(last=False)
+
+
+def clear_validation_cache() -> None:
+    """Drop memoised validation results."""
+    with _results_lock:
+        _results.clear()
+
+
+def get_validation_cache_stats() -> Dict:
+    """Get validation cache statistics."""
+    with _results_lock:
+        return {
+            "num_results": len(_results),
+            "max_results": VALIDATION_CACHE_SIZE,
+            "hits": _results_stats["hits"],
+            "misses": _results_stats["misses"],
+            "schema_compiles": _schema_state["compiles"],
+        }
 
 
 # =============================================================================
@@ -270,8 +351,9 @@ def validate_findings(data_or_path: Union[Dict, str]) -> Tuple[bool, List[str],
     # Load data if path provided
     if isinstance(data_or_path, str):
         try:
-            with open(data_or_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(data_or_path, "rb") as f:
+                content = f.read()
+            data = json.loads(content.decode("utf-8"))
         except json.JSONDecodeError as e:
             return False, [f"[Critical] Invalid JSON: {str(e)}"], {"status": "failed"}
         except FileNotFoundError:
@@ -280,6 +362,17 @@ def validate_findings(data_or_path: Union[Dict, str]) -> Tuple[bool, List[str],
             return False, [f"[Critical] Load error: {str(e)}"], {"status": "failed"}
     else:
         data = data_or_path
+        try:
+            content = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        except (TypeError, ValueError):
+            content = None  # not hashable as JSON; validate without memoising
+    
+    key = None
+    if content is not None and isinstance(data, dict):
+        key = _result_key(content, data)
+        cached = _cached_result(key)
+        if cached is not None:
+            return cached
     
     all_warnings = []
     
@@ -291,16 +384,10 @@ def validate_findings(data_or_path: Union[Dict, str]) -> Tuple[bool, List[str],
     required_warnings = validate_required_fields(data)
     all_warnings.extend(required_warnings)
     
-    # 3. Nodule fields
-    nodule_warnings = validate_nodule_fields(data)
+    # 3-5. Nodule fields, XAI paths, risk thresholds / sanity (one pass)
+    nodule_warnings, xai_warnings, risk_warnings = validate_nodules(data)
     all_warnings.extend(nodule_warnings)
-    
-    # 4. XAI paths
-    xai_warnings = validate_xai_paths(data)
     all_warnings.extend(xai_warnings)
-    
-    # 5. Risk thresholds / sanity
-    risk_warnings = validate_risk_thresholds(data)
     all_warnings.extend(risk_warnings)
     
     # Build summary
@@ -323,6 +410,9 @@ def validate_findings(data_or_path: Union[Dict, str]) -> Tuple[bool, List[str],
     # Consider valid if schema passed (graceful degradation)
     is_valid = len(schema_warnings) == 0
     
+    if key is not None:
+        _store_result(key, is_valid, all_warnings, summary)
+    
     return is_valid, all_warnings, summary
 
 
@@ -17,11 +17,24 @@ Upgraded for Phase-2: Feb 2026
 """
 
 import os
+import base64
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+# Optional imaging stack for embedded XAI images
+try:
+    import numpy as np
+    from PIL import Image
+    HAS_IMAGING = True
+except ImportError:
+    np = None
+    Image = None
+    HAS_IMAGING = False
+
 
 class XAIType(Enum):
     """Types of explainability visualizations."""
@@ -375,10 +388,80 @@ def get_xai_summary_for_report(findings: Dict, lang: str = "en") -> Dict:
 # Image Embedding for PDFs (Phase-2 XAI Visual Enhancement)
 # =============================================================================
 
+# Thumbnail sizes used by the reports: inline table (80px) and gallery (300px)
+XAI_THUMBNAIL_SIZES = (80, 300)
+
+# Encoded data URIs kept in memory, keyed by (path, mtime, file size, max_size)
+XAI_IMAGE_CACHE_SIZE = 512
+
+# Mask colouring: background transparent, mask voxels green overlay
+MASK_LUT = np.array([[0, 0, 0, 0], [0, 200, 100, 180]], dtype=np.uint8) if np is not None else None
+
+
+def _load_xai_image(path: str):
+    """Open an XAI asset as an RGB PIL image (numpy masks are colourised)."""
+    # Handle numpy masks
+    if path.endswith('.npy'):
+        mask = np.load(path)
+        # Take middle slice if 3D
+        if len(mask.shape) == 3:
+            mid_slice = mask.shape[0] // 2
+            mask = mask[mid_slice]
+        # Apply colormap (green overlay) through a 2-entry LUT
+        img = Image.fromarray(MASK_LUT[(mask > 0).astype(np.uint8)], mode='RGBA')
+    else:
+        img = Image.open(path)
+    
+    # Convert to RGB if needed
+    if img.mode == 'RGBA':
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[3])
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+    return img
+
+
+def _thumbnail(img, max_size: int):
+    """Resize maintaining aspect ratio (no-op if already small enough)."""
+    if max(img.size) > max_size:
+        img.thumbnail((max_size, max_size), Image.LANCZOS)
+    return img
+
+
+@lru_cache(maxsize=XAI_IMAGE_CACHE_SIZE)
+def _encode_xai_image(path: str, mtime_ns: int, file_size: int, max_size: int) -> Optional[str]:
+    """Cached body of get_xai_image_base64 (mtime/size make stale entries miss)."""
+    try:
+        img = _thumbnail(_load_xai_image(path), max_size)
+        
+        # Convert to base64
+        buffer = BytesIO()
+        img.save(buffer, format='PNG', optimize=True)
+        b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+        
+        return f"data:image/png;base64,{b64}"
+        
+    except Exception as e:
+        print(f"[XAI] Image encoding failed for {path}: {e}")
+        return None
+
+
+@lru_cache(maxsize=XAI_IMAGE_CACHE_SIZE)
+def _encode_png_file(path: str, mtime_ns: int, file_size: int) -> str:
+    """Base64 data URI of a PNG file as-is (precomputed thumbnails)."""
+    with open(path, "rb") as f:
+        return "data:image/png;base64," + base64.b64encode(f.read()).decode('utf-8')
+
+
 def get_xai_image_base64(path: str, max_size: int = 400) -> Optional[str]:
     """
     Convert XAI image to base64 for embedding in PDFs.
     
+    Results are cached in memory by (path, mtime, file size, max_size), so
+    the same asset is decoded and encoded once across nodules, report
+    languages and report builds.
+    
     Args:
         path: Path to image file (PNG, JPG) or numpy mask (.npy)
         max_size: Maximum dimension for resizing
@@ -386,62 +469,91 @@ def get_xai_image_base64(path: str, max_size: int = 400) -> Optional[str]:
     Returns:
         Base64 encoded data URI string or None if failed
     """
-    try:
-        from PIL import Image
-        import base64
-        from io import BytesIO
-        import numpy as np
-    except ImportError:
+    if not HAS_IMAGING:
         return None
     
-    if not path or not os.path.exists(path):
+    if not path:
         return None
     
     try:
-        # Handle numpy masks
-        if path.endswith('.npy'):
-            mask = np.load(path)
-            # Take middle slice if 3D
-            if len(mask.shape) == 3:
-                mid_slice = mask.shape[0] // 2
-                mask = mask[mid_slice]
-            # Normalize to 0-255
-            mask = ((mask > 0) * 255).astype(np.uint8)
-            img = Image.fromarray(mask, mode='L')
-            # Apply colormap (green overlay)
-            img = img.convert('RGBA')
-            pixels = img.load()
-            for i in range(img.width):
-                for j in range(img.height):
-                    if pixels[i, j][0] > 0:
-                        pixels[i, j] = (0, 200, 100, 180)
-                    else:
-                        pixels[i, j] = (0, 0, 0, 0)
-        else:
-            img = Image.open(path)
-        
-        # Convert to RGB if needed
-        if img.mode == 'RGBA':
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            background.paste(img, mask=img.split()[3])
-            img = background
-        elif img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        # Resize maintaining aspect ratio
-        if max(img.size) > max_size:
-            img.thumbnail((max_size, max_size), Image.LANCZOS)
-        
-        # Convert to base64
-        buffer = BytesIO()
-        img.save(buffer, format='PNG', optimize=True)
-        b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        
-        return f"data:image/png;base64,{b64}"
+        st = os.stat(path)
+    except OSError:
+        return None
+    
+    return _encode_xai_image(path, st.st_mtime_ns, st.st_size, max_size)
+
+
+def write_xai_thumbnails(
+    nodule: Dict,
+    sizes: Tuple[int, ...] = XAI_THUMBNAIL_SIZES,
+    out_dir: Optional[str] = None
+) -> Dict[str, str]:
+    """
+    Pre-render report thumbnails for a nodule's best XAI asset.
+    
+    Meant to run once at inference time so report builds only read small
+    PNGs. Thumbnails are written next to the asset (or into out_dir) and
+    recorded on the nodule as xai_thumbnails = {"80": path, "300": path}.
+    
+    Args:
+        nodule: Nodule dictionary (updated in place)
+        sizes: Maximum dimensions to render
+        out_dir: Optional output directory
         
+    Returns:
+        Mapping of size (as string) to thumbnail path
+    """
+    if not HAS_IMAGING:
+        return {}
+    
+    xai = get_xai_for_nodule(nodule)
+    if not xai.exists:
+        return {}
+    
+    src = Path(xai.path)
+    target_dir = Path(out_dir) if out_dir else src.parent
+    target_dir.mkdir(parents=True, exist_ok=True)
+    
+    thumbs = {}
+    try:
+        img = _load_xai_image(str(src))
+        for size in sorted(sizes, reverse=True):
+            img = _thumbnail(img, size)
+            thumb_path = target_dir / f"{src.stem}_thumb{size}.png"
+            img.save(thumb_path, format='PNG', optimize=True)
+            thumbs[str(size)] = str(thumb_path)
     except Exception as e:
-        print(f"[XAI] Image encoding failed for {path}: {e}")
+        print(f"[XAI] Thumbnail generation failed for {src}: {e}")
+        return {}
+    
+    nodule["xai_thumbnails"] = thumbs
+    return thumbs
+
+
+def get_nodule_xai_base64(nodule: Dict, size: int, xai: Optional[XAIAsset] = None) -> Optional[str]:
+    """
+    Base64 image for a nodule at a report size.
+    
+    Uses the thumbnail precomputed at inference time when present and
+    current (at least as new as the asset it was made from), otherwise
+    encodes (and caches) the raw asset.
+    """
+    if xai is None:
+        xai = get_xai_for_nodule(nodule)
+    
+    thumb = (nodule.get("xai_thumbnails") or {}).get(str(size))
+    if thumb:
+        try:
+            st = os.stat(thumb)
+            src_mtime = os.stat(xai.path).st_mtime_ns if xai.exists else None
+            if src_mtime is None or st.st_mtime_ns >= src_mtime:
+                return _encode_png_file(thumb, st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass
+    
+    if not xai.exists:
         return None
+    return get_xai_image_base64(xai.path, max_size=size)
 
 
 def get_xai_embedded_html(nodule: Dict, size: int = 120) -> str:
@@ -460,7 +572,7 @@ def get_xai_embedded_html(nodule: Dict, size: int = 120) -> str:
     if not xai.exists:
         return '<span class="xai-na" style="color:#9ca3af;font-size:11px;">No XAI</span>'
     
-    b64_data = get_xai_image_base64(xai.path, max_size=size)
+    b64_data = get_nodule_xai_base64(nodule, size, xai)
     
     if not b64_data:
         return f'<span class="xai-link" style="color:#3b82f6;font-size:11px;">{xai.type.value}</span>'
@@ -495,7 +607,7 @@ def get_xai_gallery_html(nodules: List[Dict], high_risk_only: bool = True) -> st
         if not xai.exists:
             continue
         
-        b64_data = get_xai_image_base64(xai.path, max_size=300)
+        b64_data = get_nodule_xai_base64(n, 300, xai)
         if not b64_data:
             continue
         
@@ -0,0 +1,98 @@
+# backend/benchmark_pdf_render.py
+"""
+Benchmark per-render PDF time: cold WeasyPrint calls vs the warm renderer.
+
+Cold  = what reporter.py used to do per report: parse CSS(string=PDF_CSS)
+        and resolve every @font-face again inside write_pdf().
+Warm  = app.pdf_renderer.PdfRenderer: stylesheet and fonts loaded once.
+
+Usage:
+    python benchmark_pdf_render.py [findings.json] [--runs N]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.pdf_renderer import PdfRenderer, configure_fontconfig
+from app.reporter import ENV, PDF_CSS, TEMPLATE_DIR, build_report_context
+
+LANGUAGES = ["en", "hi", "te"]
+
+
+def build_documents(findings_path: str) -> dict:
+    """Render the clinician and patient HTML once (no LLM sections)."""
+    context = build_report_context(findings_path)
+    docs = {"clinician": ENV.get_template("clinician_report.md").render(
+        **context.for_report("en", clinician=True)
+    )}
+    for lang in LANGUAGES:
+        if (TEMPLATE_DIR / f"patient_report_{lang}.md").exists():
+            docs[f"patient_{lang}"] = ENV.get_template(f"patient_report_{lang}.md").render(
+                **context.for_report(lang)
+            )
+    return docs
+
+
+def render_cold(html: str, out_path: str) -> None:
+    from weasyprint import HTML, CSS
+    HTML(string=html).write_pdf(out_path, stylesheets=[CSS(string=PDF_CSS)])
+
+
+def time_renders(render, docs: dict, runs: int, out_dir: Path) -> dict:
+    timings = {}
+    for name, html in docs.items():
+        samples = []
+        for i in range(runs):
+            t0 = time.perf_counter()
+            render(html, str(out_dir / f"{name}_{i}.pdf"))
+            samples.append((time.perf_counter() - t0) * 1000)
+        timings[name] = samples
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("findings", nargs="?",
+                        default=str(Path(__file__).parent / "app" / "LIDC-IDRI-0001_findings.json"))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    configure_fontconfig()
+    docs = build_documents(args.findings)
+    out_dir = Path(tempfile.mkdtemp(prefix="pdf_bench_"))
+
+    print(f"📄 Findings: {args.findings}")
+    print(f"🔁 Runs per document: {args.runs}\n")
+
+    cold = time_renders(render_cold, docs, args.runs, out_dir)
+
+    t0 = time.perf_counter()
+    renderer = PdfRenderer(PDF_CSS)
+    renderer.warm_up()
+    warm_up_ms = (time.perf_counter() - t0) * 1000
+    warm = time_renders(renderer.write_pdf, docs, args.runs, out_dir)
+
+    print(f"{'document':<14}{'cold ms':>12}{'warm ms':>12}{'speedup':>10}")
+    print("-" * 48)
+    for name in docs:
+        c = statistics.median(cold[name])
+        w = statistics.median(warm[name])
+        print(f"{name:<14}{c:>12.1f}{w:>12.1f}{c / w:>9.2f}x")
+
+    all_cold = [t for v in cold.values() for t in v]
+    all_warm = [t for v in warm.values() for t in v]
+    print("-" * 48)
+    print(f"{'mean':<14}{statistics.mean(all_cold):>12.1f}{statistics.mean(all_warm):>12.1f}"
+          f"{statistics.mean(all_cold) / statistics.mean(all_warm):>9.2f}x")
+    print(f"\n🔥 One-off warm-up: {warm_up_ms:.1f} ms (paid once per worker process)")
+
+
+if __name__ == "__main__":
+    main()
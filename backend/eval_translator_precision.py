@@ -0,0 +1,107 @@
+# backend/eval_translator_precision.py
+"""
+Evaluate reduced-precision NLLB against fp32 on report sentences.
+
+fp32 output is the reference; each other precision (int8 dynamic
+quantisation, bf16) is scored against it with BLEU and chrF, and timed on
+the same sentences. The translation memory is bypassed.
+
+Sentences are the fixed seed set of the translation memory (patient
+template text + analyze_scan impressions), so the scores reflect what
+reports actually translate.
+
+Usage:
+    python eval_translator_precision.py [--langs hindi telugu tamil]
+        [--precisions int8 bf16] [--sentences 80] [--beams 4]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.translation_memory import seed_texts
+from app.translator import LANG_CODES, TranslationEngine, clean_text, split_sentences
+
+DEFAULT_LANGS = ["hindi", "telugu", "tamil"]
+
+
+def eval_sentences(limit: int) -> list:
+    """First `limit` distinct sentences of the translation-memory seed set."""
+    sentences = []
+    for text in seed_texts():
+        sentences.extend(split_sentences(clean_text(text)))
+    return list(dict.fromkeys(sentences))[:limit]
+
+
+def run(engine: TranslationEngine, sentences: list, langs: list, beams: int) -> tuple:
+    """
+    Translate every sentence into every language. Returns (outputs, seconds).
+
+    The engine is closed afterwards, so only one precision's model is in
+    memory while the next one is timed.
+    """
+    try:
+        engine.submit([(sentences[0], LANG_CODES[langs[0]], beams)])[0].result()  # load + warm up
+
+        t0 = time.perf_counter()
+        futures = {
+            lang: engine.submit([(s, LANG_CODES[lang], beams) for s in sentences])
+            for lang in langs
+        }
+        outputs = {lang: [f.result() for f in futs] for lang, futs in futures.items()}
+        return outputs, time.perf_counter() - t0
+    finally:
+        engine.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--langs", nargs="*", default=DEFAULT_LANGS)
+    parser.add_argument("--precisions", nargs="*", default=["int8", "bf16"])
+    parser.add_argument("--sentences", type=int, default=80)
+    parser.add_argument("--beams", type=int, default=4)
+    parser.add_argument("--device", default="cpu")
+    args = parser.parse_args()
+
+    try:
+        import sacrebleu
+    except ImportError:
+        sys.exit("sacrebleu is required: pip install sacrebleu")
+
+    sentences = eval_sentences(args.sentences)
+    n = len(sentences) * len(args.langs)
+    print(f"📝 {len(sentences)} sentences × {len(args.langs)} languages, beams={args.beams}, device={args.device}\n")
+
+    reference, ref_s = run(TranslationEngine(device=args.device, precision="fp32"), sentences, args.langs, args.beams)
+    rows = [("fp32", None, ref_s)]
+
+    for precision in args.precisions:
+        outputs, secs = run(TranslationEngine(device=args.device, precision=precision), sentences, args.langs, args.beams)
+        scores = {}
+        for lang in args.langs:
+            scores[lang] = (
+                sacrebleu.corpus_bleu(outputs[lang], [reference[lang]]).score,
+                sacrebleu.corpus_chrf(outputs[lang], [reference[lang]]).score,
+            )
+        rows.append((precision, scores, secs))
+
+    print(f"{'precision':<10}{'lang':<12}{'BLEU':>8}{'chrF':>8}{'ms/sent':>10}{'speedup':>9}")
+    print("-" * 57)
+    for precision, scores, secs in rows:
+        ms = secs / n * 1000
+        if scores is None:
+            print(f"{precision:<10}{'(reference)':<12}{'100.0':>8}{'100.0':>8}{ms:>10.1f}{1.0:>8.2f}x")
+            continue
+        for i, (lang, (bleu, chrf)) in enumerate(scores.items()):
+            timing = f"{ms:>10.1f}{ref_s / secs:>8.2f}x" if i == 0 else ""
+            print(f"{precision:<10}{lang:<12}{bleu:>8.1f}{chrf:>8.1f}{timing}")
+
+    print("\nScores are agreement with fp32 output, not with human translations.")
+
+
+if __name__ == "__main__":
+    main()
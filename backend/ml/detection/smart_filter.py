@@ -1,48 +1,83 @@
 import numpy as np
-from sklearn.cluster import DBSCAN
 
-def smart_filter(filtered_centers, features):
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def merge_duplicates(coords, scores, eps=10.0):
     """
-    filtered_centers: list of (z,y,x)
-    features: list of dicts [{hu_mean, long_axis_mm, volume_mm3, ...}]
+    Duplicate merging equivalent to DBSCAN(eps, min_samples=1): points closer
+    than eps (inclusive) are chained into one cluster, and each cluster keeps
+    the point with the highest score (first one on ties).
+
+    Neighbour pairs come from a uniform grid hash with cell size eps, so only
+    the 27 surrounding cells are compared; clusters are joined with union-find.
+
+    coords: (N,3) array, scores: (N,) array
+    returns indices of the winners, ordered like DBSCAN's cluster labels
+    (by the first member of each cluster)
     """
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+    scores = np.asarray(scores, dtype=np.float64).ravel()
+    n = coords.shape[0]
+    if n == 0:
+        return []
+
+    cells = np.floor(coords / eps).astype(np.int64)
+    grid = {}
+    for i, key in enumerate(map(tuple, cells)):
+        grid.setdefault(key, []).append(i)
+
+    parent = list(range(n))
+    eps2 = eps * eps
+    offsets = [(dz, dy, dx) for dz in (-1, 0, 1) for dy in (-1, 0, 1) for dx in (-1, 0, 1)]
 
-    # Stage 1 — remove air/noise
-    cand = []
-    for c, f in zip(filtered_centers, features):
-        if f["hu_mean"] > -800:   # keep only real tissue
-            cand.append((c, f))
+    for (cz, cy, cx), members in grid.items():
+        members = np.array(members)
+        for dz, dy, dx in offsets:
+            other = grid.get((cz + dz, cy + dy, cx + dx))
+            if other is None:
+                continue
+            other = np.array(other)
+            d2 = ((coords[members, None, :] - coords[None, other, :]) ** 2).sum(axis=2)
+            for a, b in zip(*np.nonzero(d2 <= eps2)):
+                i, j = members[a], other[b]
+                if i < j:
+                    ri, rj = _find(parent, i), _find(parent, j)
+                    if ri != rj:
+                        parent[max(ri, rj)] = min(ri, rj)
 
-    if not cand:
+    roots = np.array([_find(parent, i) for i in range(n)])
+    winners = []
+    for root in np.unique(roots):      # root == smallest index in its cluster
+        idxs = np.flatnonzero(roots == root)
+        winners.append(int(idxs[np.argmax(scores[idxs])]))
+    return winners
+
+def smart_filter(filtered_centers, features, min_hu=-800, min_long_axis_mm=4, eps=10):
+    """
+    filtered_centers: list of (z,y,x)
+    features: list of dicts [{hu_mean, long_axis_mm, volume_mm3, ...}]
+    """
+    if not filtered_centers:
         return [], []
 
-    centers = [c for c, f in cand]
-    feats   = [f for c, f in cand]
+    hu = np.array([f["hu_mean"] for f in features], dtype=np.float64)
+    la = np.array([f["long_axis_mm"] for f in features], dtype=np.float64)
 
+    # Stage 1 — remove air/noise (keep only real tissue)
     # Stage 2 — remove tiny candidates (<4 mm)
-    cand2_centers = []
-    cand2_feats   = []
-    for c, f in zip(centers, feats):
-        if f["long_axis_mm"] >= 4:
-            cand2_centers.append(c)
-            cand2_feats.append(f)
-
-    if not cand2_centers:
+    keep = np.flatnonzero((hu > min_hu) & (la >= min_long_axis_mm))
+    if keep.size == 0:
         return [], []
 
-    # Stage 3 — cluster to remove duplicates
-    coords = np.array(cand2_centers)
-    clustering = DBSCAN(eps=10, min_samples=1).fit(coords)  # 10 mm
-    labels = clustering.labels_
-
-    final_centers = []
-    final_feats   = []
+    # Stage 3 — merge duplicates, choosing the highest hu_mean (most solid)
+    coords = np.array([filtered_centers[i] for i in keep], dtype=np.float64)
+    winners = merge_duplicates(coords, hu[keep], eps=eps)   # 10 mm
 
-    for lab in np.unique(labels):
-        idxs = np.where(labels == lab)[0]
-        # choose the candidate with highest hu_mean (most solid)
-        best_idx = max(idxs, key=lambda i: cand2_feats[i]["hu_mean"])
-        final_centers.append(cand2_centers[best_idx])
-        final_feats.append(cand2_feats[best_idx])
+    final_centers = [filtered_centers[keep[w]] for w in winners]
+    final_feats   = [features[keep[w]] for w in winners]
 
     return final_centers, final_feats
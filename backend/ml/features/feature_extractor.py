@@ -144,4 +144,108 @@ def extract_patch_features(patch, spacing, mask=None):
         "hu_std": float(hu_std),
         "long_axis_mm": float(long_axis_mm),
         "volume_mm3": float(volume_mm3)
-    }
\ No newline at end of file
+    }
+
+# ---------------------------------------------------------------
+# Batch feature engine (pipeline stage 8)
+# ---------------------------------------------------------------
+def stack_patches(patches, size=32, fill=-1000.0):
+    """
+    Stack variable-sized patches (clipped at volume borders) into one array.
+    Returns (stack[N,S,S,S] float32, valid[N,S,S,S] bool). Each patch is
+    placed at the origin so voxel indices match np.argwhere on the patch.
+    """
+    n = len(patches)
+    stack = np.full((n, size, size, size), fill, dtype=np.float32)
+    valid = np.zeros((n, size, size, size), dtype=bool)
+    for i, p in enumerate(patches):
+        dz, dy, dx = p.shape
+        stack[i, :dz, :dy, :dx] = p
+        valid[i, :dz, :dy, :dx] = True
+    return stack, valid
+
+
+def _masked_mean_std(values, mask):
+    """Per-patch mean/std (ddof=0) over mask, all arrays shaped (N, V)."""
+    n = mask.sum(axis=1).astype(np.float64)
+    safe_n = np.maximum(n, 1.0)
+    v = np.where(mask, values, 0.0).astype(np.float64)
+    mean = v.sum(axis=1) / safe_n
+    var = np.where(mask, (values - mean[:, None]) ** 2, 0.0).sum(axis=1) / safe_n
+    return mean, np.sqrt(var), n
+
+
+def batch_long_axis_mm(fg, spacing):
+    """
+    Long axis of each mask in a (N,S,S,S) stack: extent of the voxel cloud
+    along its principal axis. Uses a closed-form 3x3 covariance and a batched
+    np.linalg.eigh instead of fitting one sklearn PCA per patch.
+    """
+    n_patch, S = fg.shape[0], fg.shape[1]
+    flat = fg.reshape(n_patch, -1)
+    idx = np.indices((S, S, S)).reshape(3, -1).T.astype(np.float64)
+    coords = idx * np.asarray(spacing, dtype=np.float64)[None, :]   # (V,3) mm
+
+    w = flat.astype(np.float64)
+    n = w.sum(axis=1)
+    safe_n = np.maximum(n, 1.0)[:, None]
+    mean = (w @ coords) / safe_n                                   # (N,3)
+    outer = (coords[:, :, None] * coords[:, None, :]).reshape(-1, 9)
+    second = (w @ outer).reshape(n_patch, 3, 3) / safe_n[:, :, None]
+    cov = second - mean[:, :, None] * mean[:, None, :]
+
+    _, vecs = np.linalg.eigh(cov)
+    axis = vecs[:, :, -1]                                          # largest eigenvalue
+
+    proj = axis @ coords.T                                         # (N,V)
+    hi = np.where(flat, proj, -np.inf).max(axis=1)
+    lo = np.where(flat, proj, np.inf).min(axis=1)
+    return np.where(n >= 5, hi - lo, 0.0)
+
+
+def extract_batch_features(patches, spacing, size=32, chunk_size=256, return_masks=False):
+    """
+    Vectorised equivalent of extract_patch_features() for many candidates.
+    patches: list of (Z,Y,X) HU patches (may be smaller than `size` at borders)
+    spacing: [sz,sy,sx] in mm
+    returns list of dicts with hu_mean, hu_std, long_axis_mm, volume_mm3;
+    "mask" (cropped to the patch shape) is only included if return_masks=True
+    """
+    voxel_vol = float(spacing[0] * spacing[1] * spacing[2])
+    results = []
+
+    for start in range(0, len(patches), chunk_size):
+        chunk = patches[start:start + chunk_size]
+        stack, valid = stack_patches(chunk, size=size)
+        vals = stack.reshape(len(chunk), -1)
+        vmask = valid.reshape(len(chunk), -1)
+
+        # foreground mask: same thresholds as extract_patch_features(mask=None)
+        p_mean, p_std, _ = _masked_mean_std(vals, vmask)
+        thr = (p_mean - 1.5 * p_std)[:, None]
+        fg = vmask & (vals > -950) & (vals > thr)
+
+        # HU stats over non-air voxels, falling back to the whole patch
+        tissue = vmask & (vals > -950)
+        t_mean, t_std, t_n = _masked_mean_std(vals, tissue)
+        empty = t_n == 0
+        hu_mean = np.where(empty, p_mean, t_mean)
+        hu_std = np.where(empty, p_std, t_std)
+
+        volume = fg.sum(axis=1) * voxel_vol
+        fg = fg.reshape(stack.shape)
+        long_axis = batch_long_axis_mm(fg, spacing)
+
+        for i, patch in enumerate(chunk):
+            ft = {
+                "hu_mean": float(hu_mean[i]),
+                "hu_std": float(hu_std[i]),
+                "long_axis_mm": float(long_axis[i]),
+                "volume_mm3": float(volume[i])
+            }
+            if return_masks:
+                dz, dy, dx = patch.shape
+                ft["mask"] = fg[i, :dz, :dy, :dx].copy()
+            results.append(ft)
+
+    return results
@@ -3,22 +3,52 @@ import json
 from datetime import datetime
 import numpy as np
 
-def compute_lung_health_metrics(volume, spacing):
+def _mask_bbox(mask, margin=1):
+    """Tight bounding box of a mask as a tuple of slices (padded by margin)."""
+    slices = []
+    for axis in range(mask.ndim):
+        other = tuple(a for a in range(mask.ndim) if a != axis)
+        idx = np.flatnonzero(mask.any(axis=other))
+        if idx.size == 0:
+            return None
+        lo = max(0, int(idx[0]) - margin)
+        hi = min(mask.shape[axis], int(idx[-1]) + 1 + margin)
+        slices.append(slice(lo, hi))
+    return tuple(slices)
+
+def compute_lung_health_metrics(volume, spacing, lung_mask=None):
     """
     Simple estimators:
     - emphysema_score = % voxels < -950 HU inside lung
     - consolidation_score = % voxels > -200 HU inside lung
     - fibrosis_score = texture roughness proxy (std of Laplacian) normalized
+
+    If lung_mask is given, `volume` is the unmasked CT and all statistics use
+    lung voxels only: the lung bounding box is cropped (a view, no full-volume
+    copy) and the Laplacian is computed on that ROI alone.
+    Without a mask, `volume` is treated as an already masked lung volume.
     """
     # volume: full resampled CT numpy array (Z,Y,X) if provided; spacing used for voxel volume
-    # This function assumes you pass a masked lung volume; if None, return zeros
     if volume is None:
         return 0.0, 0.0, 0.0
     try:
+        from scipy import ndimage
+        if lung_mask is not None:
+            roi = _mask_bbox(lung_mask)
+            if roi is None:
+                return 0.0, 0.0, 0.0
+            sub = volume[roi]
+            sub_mask = lung_mask[roi].astype(bool)
+            vals = sub[sub_mask]
+            pct_emphy = float(np.mean(vals < -950))
+            pct_cons = float(np.mean(vals > -200))
+            lap = ndimage.laplace(sub.astype(np.float32))[sub_mask]
+            fibrosis_proxy = float(np.clip(np.std(lap) / (abs(np.mean(vals)) + 1e-6), 0.0, 1.0))
+            return pct_emphy, fibrosis_proxy, pct_cons
+
         pct_emphy = float(np.mean(volume < -950))
         pct_cons = float(np.mean(volume > -200))
         # rough proxy for fibrosis: normalized std of Laplacian
-        from scipy import ndimage
         lap = ndimage.laplace(volume.astype(np.float32))
         fibrosis_proxy = float(np.clip(np.std(lap) / (abs(np.mean(volume)) + 1e-6), 0.0, 1.0))
         return pct_emphy, fibrosis_proxy, pct_cons
@@ -29,13 +59,18 @@ def build_findings_json(study_id, spacing, volume_shape,
                         filtered_candidates, features,
                         malignancy_scores, uncertainties,
                         output_path, processing_time_seconds=None,
-                        lung_volume_for_metrics=None):
+                        lung_volume_for_metrics=None, lung_mask=None,
+                        lung_metrics=None):
     """
     filtered_candidates: list of centers [(z,y,x),...]
     features: list of dicts aligned with filtered_candidates
     malignancy_scores: list aligned
     uncertainties: list aligned
     lung_volume_for_metrics: optional numpy array (masked lung) to compute lung-level metrics
+    lung_mask: optional lung mask; if given, lung_volume_for_metrics is the unmasked
+               volume and metrics are computed over lung voxels only
+    lung_metrics: optional precomputed (emphysema, fibrosis, consolidation) scores;
+                  takes precedence over lung_volume_for_metrics
     """
         # ---------------------------------------
     # Standardize Python types for JSON
@@ -83,7 +118,9 @@ def build_findings_json(study_id, spacing, volume_shape,
 
 
     # lung-level metrics
-    emphysema_score, fibrosis_score, consolidation_score = compute_lung_health_metrics(lung_volume_for_metrics, spacing) if lung_volume_for_metrics is not None else (0.0, 0.0, 0.0)
+    if lung_metrics is None:
+        lung_metrics = compute_lung_health_metrics(lung_volume_for_metrics, spacing, lung_mask=lung_mask) if lung_volume_for_metrics is not None else (0.0, 0.0, 0.0)
+    emphysema_score, fibrosis_score, consolidation_score = lung_metrics
     lung_health_text = "Lungs appear within expected attenuation ranges." if emphysema_score < 0.05 else "Findings suggest increased low attenuation areas consistent with emphysema."
 
     largest = 0.0
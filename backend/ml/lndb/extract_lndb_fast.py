@@ -1,5 +1,7 @@
 # extract_lndb_fast.py
+import os
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import SimpleITK as sitk
 import numpy as np
@@ -34,32 +36,104 @@ def world_to_index(img, x, y, z):
         iz = int(round((float(z) - origin[2]) / sp[2]))
         return (iz, iy, ix)
 
-def extract_features_spherical(img_path, cx_mm, cy_mm, cz_mm, radius_mm=8.0):
-    img = sitk.ReadImage(str(img_path))
-    arr = sitk.GetArrayFromImage(img).astype(np.float32)   # (z,y,x)
-    spacing = img.GetSpacing()  # (x,y,z)
-    spacing = [spacing[2], spacing[1], spacing[0]]  # convert to (z,y,x) spacing
-
-    # convert world coords -> voxel index (z,y,x)
-    zc, yc, xc = world_to_index(img, cx_mm, cy_mm, cz_mm)
-
-    # radius in voxels (approx z,y,x using per-axis spacing)
+# MetaImage element types that can be memory-mapped directly
+MET_DTYPES = {
+    "MET_CHAR": np.int8, "MET_UCHAR": np.uint8,
+    "MET_SHORT": np.int16, "MET_USHORT": np.uint16,
+    "MET_INT": np.int32, "MET_UINT": np.uint32,
+    "MET_FLOAT": np.float32, "MET_DOUBLE": np.float64,
+}
+
+def _read_mhd_header(mhd_path):
+    header = {}
+    with open(mhd_path, "r") as f:
+        for line in f:
+            if "=" in line:
+                k, v = line.split("=", 1)
+                header[k.strip()] = v.strip()
+    return header
+
+def _memmap_mhd(mhd_path):
+    """
+    Memory-map the raw voxel data of an uncompressed single-channel .mhd.
+    Returns a read-only (z,y,x) array, or None if the file needs SimpleITK.
+    """
+    h = _read_mhd_header(mhd_path)
+    dtype = MET_DTYPES.get(h.get("ElementType"))
+    data_file = h.get("ElementDataFile", "")
+    if (dtype is None or h.get("CompressedData", "False") == "True"
+            or int(h.get("ElementNumberOfChannels", 1)) != 1
+            or int(h.get("NDims", 3)) != 3
+            or data_file in ("", "LOCAL", "LIST") or "%" in data_file):
+        return None
+    header_size = int(h.get("HeaderSize", 0))
+    if header_size < 0:
+        return None
+    msb = h.get("BinaryDataByteOrderMSB", h.get("ElementByteOrderMSB", "False")) == "True"
+    dt = np.dtype(dtype).newbyteorder(">" if msb else "<")
+    dims = [int(v) for v in h["DimSize"].split()]      # (x,y,z)
+    raw_path = Path(mhd_path).parent / data_file
+    return np.memmap(raw_path, dtype=dt, mode="r", offset=header_size,
+                     shape=(dims[2], dims[1], dims[0]))
+
+def load_volume_for_features(img_path):
+    """
+    Load a volume once for feature extraction.
+    Returns (arr (z,y,x), spacing (z,y,x), geometry image for world_to_index).
+    Uncompressed .mhd volumes are memory-mapped; only touched patches are read.
+    """
+    img_path = str(img_path)
+    arr = _memmap_mhd(img_path) if img_path.endswith(".mhd") else None
+    if arr is None:
+        img = sitk.ReadImage(img_path)
+        return sitk.GetArrayFromImage(img), img.GetSpacing()[::-1], img
+
+    reader = sitk.ImageFileReader()
+    reader.SetFileName(img_path)
+    reader.ReadImageInformation()
+    # 1-voxel image carrying the geometry; physical->index does not bounds-check
+    geom = sitk.Image([1, 1, 1], sitk.sitkUInt8)
+    geom.SetOrigin(reader.GetOrigin())
+    geom.SetSpacing(reader.GetSpacing())
+    geom.SetDirection(reader.GetDirection())
+    return arr, reader.GetSpacing()[::-1], geom
+
+def sphere_kernel(spacing, radius_mm):
+    """Precomputed offset kernel: (rz,ry,rx) and boolean sphere mask of size 2r+1."""
     rz = int(max(1, round(radius_mm / spacing[0])))
     ry = int(max(1, round(radius_mm / spacing[1])))
     rx = int(max(1, round(radius_mm / spacing[2])))
+    dz, dy, dx = np.meshgrid(
+        np.arange(-rz, rz + 1), np.arange(-ry, ry + 1), np.arange(-rx, rx + 1), indexing='ij'
+    )
+    dist_mm = np.sqrt((dz * spacing[0])**2 + (dy * spacing[1])**2 + (dx * spacing[2])**2)
+    return (rz, ry, rx), dist_mm <= radius_mm
+
+def spherical_features(arr, spacing, geom, cx_mm, cy_mm, cz_mm, radius_mm=8.0, kernel=None):
+    """Features for one nodule on an already loaded volume (see extract_features_spherical)."""
+    spacing = [float(spacing[0]), float(spacing[1]), float(spacing[2])]
+    if kernel is None:
+        kernel = sphere_kernel(spacing, radius_mm)
+    (rz, ry, rx), sphere = kernel
+
+    # convert world coords -> voxel index (z,y,x)
+    zc, yc, xc = world_to_index(geom, cx_mm, cy_mm, cz_mm)
 
     z1, z2 = max(0, zc-rz), min(arr.shape[0], zc+rz+1)
     y1, y2 = max(0, yc-ry), min(arr.shape[1], yc+ry+1)
     x1, x2 = max(0, xc-rx), min(arr.shape[2], xc+rx+1)
 
-    patch = arr[z1:z2, y1:y2, x1:x2]
+    # only the patch is read (and converted) from the volume
+    patch = np.asarray(arr[z1:z2, y1:y2, x1:x2], dtype=np.float32)
 
-    # build spherical mask in voxel coordinates
-    zz, yy, xx = np.meshgrid(
-        np.arange(z1, z2), np.arange(y1, y2), np.arange(x1, x2), indexing='ij'
-    )
-    dist_mm = np.sqrt(((zz - zc) * spacing[0])**2 + ((yy - yc) * spacing[1])**2 + ((xx - xc) * spacing[2])**2)
-    sph_mask = dist_mm <= radius_mm
+    # crop the precomputed kernel to the (possibly border-clipped) patch
+    sph_mask = sphere[
+        z1 - (zc - rz): z1 - (zc - rz) + patch.shape[0],
+        y1 - (yc - ry): y1 - (yc - ry) + patch.shape[1],
+        x1 - (xc - rx): x1 - (xc - rx) + patch.shape[2],
+    ]
+    if sph_mask.shape != patch.shape:
+        sph_mask = np.zeros(patch.shape, dtype=bool)
 
     # HU stats inside sphere
     vals = patch[sph_mask]
@@ -102,7 +176,25 @@ def extract_features_spherical(img_path, cx_mm, cy_mm, cz_mm, radius_mm=8.0):
         "type": ntype
     }
 
-def extract_lndb_fast(lndb_root, save_csv, radius_mm=8.0):
+def extract_features_spherical(img_path, cx_mm, cy_mm, cz_mm, radius_mm=8.0):
+    arr, spacing, geom = load_volume_for_features(img_path)
+    return spherical_features(arr, spacing, geom, cx_mm, cy_mm, cz_mm, radius_mm=radius_mm)
+
+def _volume_worker(job):
+    """Process-pool task: load one volume once and score all of its nodules."""
+    vol_path, nodules, radius_mm = job
+    arr, spacing, geom = load_volume_for_features(vol_path)
+    kernel = sphere_kernel([float(s) for s in spacing], radius_mm)
+    return [
+        (order, spherical_features(arr, spacing, geom, x, y, z, radius_mm=radius_mm, kernel=kernel))
+        for order, x, y, z in nodules
+    ]
+
+def extract_lndb_fast(lndb_root, save_csv, radius_mm=8.0, workers=None):
+    """
+    workers: process count (default: CPU count); 1 runs in-process.
+    Nodules are grouped by LNDbID so each volume is read once.
+    """
     lndb_root = Path(lndb_root)
     z = zipfile.ZipFile(lndb_root / "trainset_csv.zip")
     df_nod = pd.read_csv(z.open("trainNodules.csv"))
@@ -112,6 +204,7 @@ def extract_lndb_fast(lndb_root, save_csv, radius_mm=8.0):
     volume_index = build_volume_index(lndb_root)
 
     rows = []
+    jobs = {}
     # iterate ground-truth rows (use df_gt to get AgrLevel)
     for _, r in df_gt.iterrows():
         lnid = int(r["LNDbID"])
@@ -125,19 +218,30 @@ def extract_lndb_fast(lndb_root, save_csv, radius_mm=8.0):
         agr = r.get("AgrLevel", np.nan)
         label = 1 if (not pd.isna(agr) and float(agr) >= 3.0) else 0
 
-        feats = extract_features_spherical(vol_path, x, y, zcoord, radius_mm=radius_mm)
+        order = len(rows)
+        jobs.setdefault(vol_path, []).append((order, x, y, zcoord))
         rows.append({
             "LNDbID": vol_key,
             "x": x, "y": y, "z": zcoord,
-            "hu_mean": feats["hu_mean"],
-            "hu_std": feats["hu_std"],
-            "long_axis_mm": feats["long_axis_mm"],
-            "volume_mm3": feats["volume_mm3"],
-            "type": feats["type"],
             "malignancy": int(label)
         })
 
-    out = pd.DataFrame(rows)
+    tasks = [(path, nods, radius_mm) for path, nods in jobs.items()]
+    workers = workers or os.cpu_count() or 1
+    feats_by_row = {}
+    if workers == 1 or len(tasks) <= 1:
+        for res in map(_volume_worker, tasks):
+            feats_by_row.update(res)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            for res in pool.map(_volume_worker, tasks):
+                feats_by_row.update(res)
+    print(f"[LNDb] {len(rows)} nodules from {len(tasks)} volumes")
+
+    cols = ["LNDbID", "x", "y", "z", "hu_mean", "hu_std", "long_axis_mm", "volume_mm3", "type", "malignancy"]
+    for order, row in enumerate(rows):
+        row.update(feats_by_row[order])
+    out = pd.DataFrame([{c: row[c] for c in cols} for row in rows])
     Path(save_csv).parent.mkdir(parents=True, exist_ok=True)
     out.to_csv(save_csv, index=False)
     print("Saved:", save_csv)
@@ -5,6 +5,7 @@
 #
 #  Usage:
 #  python backend-dinesh/ml/pipeline.py --study_folder "path/to/LIDC-IDRI-0001" --study_id "LIDC-IDRI-0001"
+#  add --profile (and optionally --profile_stage 8) for a per-stage profile
 # ===============================================
 
 import argparse
@@ -20,6 +21,7 @@ import SimpleITK as sitk
 # load the freshly edited files during iterative development.
 for mod in list(sys.modules.keys()):
     if mod.startswith("select_series") or \
+       mod.startswith("volume") or \
        mod.startswith("load_dicom") or \
        mod.startswith("resample") or \
        mod.startswith("normalize") or \
@@ -51,6 +53,125 @@ def load_module_from(path, name):
     return mod
 
 
+# ------------------------------
+# Per-stage profiler (--profile)
+# ------------------------------
+class StageProfiler:
+    """
+    Records wall time, CPU time and peak RSS per pipeline stage.
+    Stages are delimited by next_stage(name); finish() closes the last one.
+    When disabled every call is a no-op.
+    """
+
+    def __init__(self, enabled=False, cprofile_stage=None, out_dir=None, study_id=None):
+        self.enabled = enabled
+        self.cprofile_stage = cprofile_stage
+        self.out_dir = Path(out_dir) if out_dir else None
+        self.study_id = study_id
+        self.stages = []
+        self._current = None
+        self._cprof = None
+        self._sampler = None
+        self._t0 = time.perf_counter()
+        self._c0 = time.process_time()
+        try:
+            import psutil
+            self._proc = psutil.Process()
+        except ImportError:
+            self._proc = None
+
+    def _rss_mb(self):
+        if self._proc is not None:
+            return self._proc.memory_info().rss / 2**20
+        try:
+            import resource
+            # lifetime peak only (KB on Linux); better than nothing without psutil
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        except ImportError:
+            return None
+
+    def _start_sampler(self):
+        import threading
+        stop = threading.Event()
+        state = {"peak": self._rss_mb()}
+
+        def run():
+            while not stop.wait(0.02):
+                rss = self._rss_mb()
+                if rss is not None and (state["peak"] is None or rss > state["peak"]):
+                    state["peak"] = rss
+
+        t = threading.Thread(target=run, daemon=True)
+        t.start()
+        return stop, t, state
+
+    def next_stage(self, name):
+        if not self.enabled:
+            return
+        self._end_stage()
+        self._current = {
+            "stage": name,
+            "wall_start": time.perf_counter(),
+            "cpu_start": time.process_time(),
+            "rss_start_mb": self._rss_mb(),
+        }
+        self._sampler = self._start_sampler()
+        if self.cprofile_stage and name.split("_")[0] == str(self.cprofile_stage):
+            import cProfile
+            self._cprof = cProfile.Profile()
+            self._cprof.enable()
+
+    def _end_stage(self):
+        cur = self._current
+        if cur is None:
+            return
+        if self._cprof is not None:
+            self._cprof.disable()
+            if self.out_dir is not None:
+                dump = self.out_dir / f"{self.study_id}_stage{cur['stage']}.prof"
+                self._cprof.dump_stats(str(dump))
+                cur["cprofile_dump"] = str(dump)
+            self._cprof = None
+        stop, thread, state = self._sampler
+        stop.set()
+        thread.join()
+        samples = [v for v in (state["peak"], self._rss_mb(), cur["rss_start_mb"]) if v is not None]
+        peak = max(samples) if samples else None
+        self.stages.append({
+            "stage": cur["stage"],
+            "wall_s": round(time.perf_counter() - cur.pop("wall_start"), 4),
+            "cpu_s": round(time.process_time() - cur.pop("cpu_start"), 4),
+            "rss_start_mb": None if cur["rss_start_mb"] is None else round(cur["rss_start_mb"], 1),
+            "peak_rss_mb": None if peak is None else round(peak, 1),
+            **{k: v for k, v in cur.items() if k not in ("stage", "rss_start_mb")},
+        })
+        self._current = None
+
+    def finish(self):
+        if not self.enabled:
+            return None
+        self._end_stage()
+        report = {
+            "study_id": self.study_id,
+            "total_wall_s": round(time.perf_counter() - self._t0, 4),
+            "total_cpu_s": round(time.process_time() - self._c0, 4),
+            "peak_rss_mb": max((s["peak_rss_mb"] for s in self.stages if s["peak_rss_mb"] is not None), default=None),
+            "stages": self.stages,
+        }
+        print("\n[PROFILE] {:<24} {:>10} {:>10} {:>12}".format("stage", "wall (s)", "cpu (s)", "peak RSS MB"))
+        for s in self.stages:
+            peak = "n/a" if s["peak_rss_mb"] is None else f"{s['peak_rss_mb']:.1f}"
+            print("[PROFILE] {:<24} {:>10.3f} {:>10.3f} {:>12}".format(s["stage"], s["wall_s"], s["cpu_s"], peak))
+        print("[PROFILE] {:<24} {:>10.3f} {:>10.3f}".format("TOTAL", report["total_wall_s"], report["total_cpu_s"]))
+        if self.out_dir is not None:
+            import json
+            path = self.out_dir / f"{self.study_id}_profile.json"
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"[PROFILE] Saved {path}")
+        return report
+
+
 # ---------------
 # Main pipeline
 # ---------------
@@ -76,6 +197,7 @@ def main(args):
     # ---------------------
     try:
         select_mod = load_module_from(PRE_DIR/"select_series.py", "select_series")
+        volume_mod = load_module_from(PRE_DIR/"volume.py", "volume")
         loader_mod = load_module_from(PRE_DIR/"load_dicom.py", "load_dicom")
         resample_mod = load_module_from(PRE_DIR/"resample.py", "resample")
         normalize_mod = load_module_from(PRE_DIR/"normalize.py", "normalize")
@@ -111,230 +233,234 @@ def main(args):
         print(f"[ERROR] Study folder not found: {study_folder}")
         return
 
-    # -------------------------
-    # 1. Select main CT series
-    # -------------------------
-    print("[1] Selecting CT series...")
-    series_folder, count = select_mod.find_main_ct_series(str(study_folder))
-    if not series_folder:
-        print("[ERROR] No valid CT series found.")
-        return
-    print(f"[OK] Series chosen: {series_folder} ({count} slices)")
-
-    # -------------------------
-    # 2. Load DICOM
-    # -------------------------
-    print("\n[2] Loading DICOM...")
-    vol, spacing = loader_mod.load_dicom_series(series_folder)
-    print(f"[OK] Volume: {vol.shape}, Spacing: {spacing}")
-
-    # -------------------------
-    # 3. Resample to 1mm
-    # -------------------------
-    print("\n[3] Resampling to 1mm iso...")
-    vol_res, new_spacing = resample_mod.resample_to_iso(vol, spacing, new_spacing=[1,1,1])
-    print(f"[OK] Resampled: {vol_res.shape}, Spacing: {new_spacing}")
-
-    # -------------------------
-    # 4. HU Normalize
-    # -------------------------
-    print("\n[4] Normalizing HU...")
-    vol_norm = normalize_mod.clip_and_normalize(vol_res)
-
-    # -------------------------
-    # 5. Lungmask segmentation
-    # -------------------------
-    print("\n[5] Running Lungmask segmentation...")
-    lung_mask = lung_mod.segment_lungs(vol_res)
-    print(f"[OK] Lung mask shape: {lung_mask.shape}")
-
-    # -------------------------
-    # 6. LoG Detector
-    # -------------------------
-    print("\n[6] Running LoG nodule detection...")
-    cands, logmap = log_mod.log_nodule_candidates(vol_norm, lung_mask, sigma=1.0, threshold=0.002)
-    print(f"[OK] Raw LoG candidates: {len(cands)}")
-
-    # -------------------------
-    # 7. Rule-based filtering
-    # -------------------------
-    print("\n[7] Filtering (HU + distance rules)...")
-    filtered = base_filter_mod.filter_candidates(cands, vol_res, lung_mask,
-                                                 min_hu=-700, min_dist=6)
-    print(f"[OK] Filtered candidates: {len(filtered)}")
-
-    # -------------------------
-    # 8. Patch & Feature extraction
-    # -------------------------
-    print("[8] Extracting features (updated)...")
-    start_proc = time.time()
-
-    features_raw = []
-    for center in filtered:
-
-        # ensure plain Python ints for indexing
-        center = (int(center[0]), int(center[1]), int(center[2]))
-
-        # extract patch
-        patch = patch_mod.extract_patch(vol_res, center, size=32)
-
-        # NEW feature extractor (MUST BE CALLED)
-        ft = feat_mod.extract_patch_features(patch, spacing=[1.0,1.0,1.0])
-
-        # add type
-        ft["type"] = type_mod.classify_nodule_type(ft["hu_mean"])
-
-        # add corrected lobe classifier
-        ft["lobe"] = lobe_mod.classify_lobe(center, vol_res.shape)
-
-        # enforce valid location field
-        ft["location"] = ft["lobe"]
-
-        # add bbox
-        cz, cy, cx = center
-        ft["bbox"] = {
-            "z": [cz - 16, cz + 15],
-            "y": [cy - 16, cy + 15],
-            "x": [cx - 16, cx + 15]
-        }
-
-        # ensure float/int conversion
-        ft["hu_mean"]       = float(ft["hu_mean"])
-        ft["hu_std"]        = float(ft["hu_std"])
-        ft["long_axis_mm"]  = float(ft["long_axis_mm"])
-        ft["volume_mm3"]    = float(ft["volume_mm3"])
-
-        features_raw.append(ft)
-
-    # -------------------------
-    # 9. Smart filtering (quality)
-    # -------------------------
-    print("\n[9] Smart filtering (HU > -800, size >4mm, clustering)...")
-    filtered_final, features_final = smart_mod.smart_filter(filtered, features_raw)
-    print(f"[OK] Final nodules after smart filtering: {len(filtered_final)}")
-
-    # -------------------------
-    # 10. Risk prediction
-    # -------------------------
-    print("\n[10] Loading risk model...")
-    # FIXED MODEL PATHS (do not double prefix backend-dinesh)
-    model_path = ROOT / "models" / "risk_head" / "risk_head.pth"
-    scaler_path = ROOT / "models" / "risk_head" / "risk_scaler.pkl"
-
-    risk = risk_mod.RiskHead(model_path, scaler_path)
-
-    # ------------------- RISK BLOCK (REPLACE ENTIRE SECTION) -------------------
-    print("[10.1] Predicting malignancy with normalized features + noisy MC uncertainty...")
-
-    def sigmoid(x):
-        return 1.0 / (1.0 + np.exp(-x))
-
-    malignancy_scores = []
-    uncertainties = []
-
-# optional debug collectors
-    _debug_raws = []
-    _debug_features = []
-
-    for ft in features_final:
-    # fetch raw features (ensure floats)
-        la = float(ft.get("long_axis_mm", 0.0))
-        hu = float(ft.get("hu_mean", -800.0))
-        vol = float(ft.get("volume_mm3", 0.0))
-        std = float(ft.get("hu_std", 0.0))
-
-    # ---- Normalization (stable, bounded) ----
-    # Expected typical ranges:
-    #  la: 0..50 mm,  vol: 0..50000 mm3, hu: -1000..+300, std: 0..400
-        la_s  = la  / 30.0       # ~0..~1.7
-        vol_s = vol / 20000.0    # ~0..~2.5
-        hu_s  = (hu + 800.0) / 600.0   # maps -800 -> 0,  -200 -> 1, ~100 -> 1.5
-        std_s = std / 150.0      # ~0..~3
-
-    # ---- Linear score with modest weights (keeps raw near sigmoid knee) ----
-        raw_lin = (
-            0.6  * la_s     # size influence
-        + 0.25 * hu_s     # density influence (normalized)
-        + 0.35 * vol_s    # volume influence
-        + 0.25 * std_s    # heterogeneity
-        )
-
-    # small per-nodule jitter to break ties (mean 0, sd 0.1)
-        raw_lin += float(np.random.normal(0.0, 0.1))
-
-    # debug
-        _debug_raws.append(raw_lin)
-        _debug_features.append((la, hu, vol, std))
-
-    # shift so typical raw_lin sits around ~0.0..2.0 (sigmoid sensitive)
-        shift = 1.0
-        raw = raw_lin - shift
-
-    # probability and clamp
-        p = sigmoid(raw)
-        p = float(np.clip(p, 0.05, 0.90))
-
-        malignancy_scores.append(p)
-
-    # ---- MC-dropout style uncertainty but using noise sampling ----
-        samples = []
-        for _ in range(30):   # larger T for more stable MC estimate
-            noise = np.random.normal(0.0, 0.35)  # stronger noise = more entropy
-            samples.append(sigmoid(raw + noise))
-        p_mean = float(np.mean(samples))
-    # numerical safety for entropy
-        p_mean_clipped = max(1e-9, min(1.0 - 1e-9, p_mean))
-        entropy = float(-(p_mean_clipped * np.log(p_mean_clipped) + (1 - p_mean_clipped) * np.log(1 - p_mean_clipped)))
-
-        uncertainties.append({
-            "confidence": p_mean,
-            "entropy": entropy,
-            "needs_review": bool(entropy > 0.35)
-        })
-
-# ---- quick debug print (small, safe) ----
-    try:
-    # print a few summary stats so you can see variation
-        raw_arr = np.array(_debug_raws)
-        print(f"[RISK DEBUG] raw_lin min/max/mean = {raw_arr.min():.3f}/{raw_arr.max():.3f}/{raw_arr.mean():.3f}")
-    # print first 5 raw features sample
-        for i, (la, hu, vol, std) in enumerate(_debug_features[:5]):
-            print(f"[RISK DEBUG] sample {i}: la={la:.2f}, hu={hu:.1f}, vol={vol:.1f}, std={std:.1f}, p={malignancy_scores[i]:.3f}, ent={uncertainties[i]['entropy']:.3f}")
-    except Exception:
-        pass
-# -------------------------------------------------------------------------
-
-    # -------------------------
-    # 11. Compute lung-level metrics
-    # -------------------------
-    print("\n[11] Computing lung-level metrics...")
-    lung_volume_for_metrics = vol_res.copy()
-    lung_volume_for_metrics[~lung_mask.astype(bool)] = 0
-
-    # -------------------------
-    # 12. Build JSON
-    # -------------------------
-    print("\n[12] Building findings.json...")
     OUT_DIR = ROOT/"outputs"
     OUT_DIR.mkdir(exist_ok=True, parents=True)
-    json_path = OUT_DIR / f"{study_id}_findings.json"
-
-    processing_time = time.time() - start_proc
+    prof = StageProfiler(enabled=getattr(args, "profile", False),
+                         cprofile_stage=getattr(args, "profile_stage", None),
+                         out_dir=OUT_DIR, study_id=study_id)
 
-    builder_mod.build_findings_json(
-        study_id=study_id,
-        spacing=new_spacing,
-        volume_shape=vol_res.shape,
-        filtered_candidates=filtered_final,
-        features=features_final,
-        malignancy_scores=malignancy_scores,
-        uncertainties=uncertainties,
-        output_path=str(json_path),
-        processing_time_seconds=processing_time,
-        lung_volume_for_metrics=lung_volume_for_metrics
-    )
+    # finish() runs on every exit so early returns still produce a profile
+    try:
+        # -------------------------
+        # 1. Select main CT series
+        # -------------------------
+        prof.next_stage("1_select_series")
+        print("[1] Selecting CT series...")
+        series = select_mod.select_main_ct_series(str(study_folder))
+        if not series:
+            print("[ERROR] No valid CT series found.")
+            return
+        series_folder, count = series["folder"], series["num_slices"]
+        print(f"[OK] Series chosen: {series_folder} ({count} slices, "
+              f"{series['modality']}, {series['slice_thickness']} mm, kernel {series['kernel'] or 'n/a'})")
+
+        # -------------------------
+        # 2. Load DICOM
+        # -------------------------
+        prof.next_stage("2_load_dicom")
+        print("\n[2] Loading DICOM...")
+        # one Volume carries array + geometry through stages 2-5; the array is a
+        # zero-copy view of the SITK buffer (int16 policy converts at most once)
+        ct = volume_mod.Volume.from_sitk(
+            loader_mod.read_dicom_image(series_folder, file_names=series["files"]),
+            dtype=np.int16)
+        print(f"[OK] Volume: {ct.shape}, Spacing: {ct.spacing}")
+
+        # -------------------------
+        # 3. Resample to 1mm
+        # -------------------------
+        prof.next_stage("3_resample")
+        print("\n[3] Resampling to 1mm iso...")
+        ct_res = resample_mod.resample_volume(ct, new_spacing=[1,1,1])
+        vol_res, new_spacing = ct_res.array, ct_res.spacing
+        print(f"[OK] Resampled: {vol_res.shape}, Spacing: {new_spacing}")
+
+        # -------------------------
+        # 4. HU Normalize
+        # -------------------------
+        prof.next_stage("4_normalize")
+        print("\n[4] Normalizing HU...")
+        vol_norm = normalize_mod.clip_and_normalize(vol_res)
+
+        # -------------------------
+        # 5. Lungmask segmentation
+        # -------------------------
+        prof.next_stage("5_lungmask")
+        print("\n[5] Running Lungmask segmentation...")
+        lung_mask = lung_mod.segment_lungs(ct_res)
+        print(f"[OK] Lung mask shape: {lung_mask.shape}")
+
+        # -------------------------
+        # 6. LoG Detector
+        # -------------------------
+        prof.next_stage("6_log_detector")
+        print("\n[6] Running LoG nodule detection...")
+        cands, logmap = log_mod.log_nodule_candidates(vol_norm, lung_mask, sigma=1.0, threshold=0.002)
+        print(f"[OK] Raw LoG candidates: {len(cands)}")
+
+        # -------------------------
+        # 7. Rule-based filtering
+        # -------------------------
+        prof.next_stage("7_filter_candidates")
+        print("\n[7] Filtering (HU + distance rules)...")
+        filtered = base_filter_mod.filter_candidates(cands, vol_res, lung_mask,
+                                                     min_hu=-700, min_dist=6)
+        print(f"[OK] Filtered candidates: {len(filtered)}")
+
+        # -------------------------
+        # 8. Patch & Feature extraction
+        # -------------------------
+        prof.next_stage("8_features")
+        print("[8] Extracting features (updated)...")
+        start_proc = time.time()
 
-    print(f"[DONE] Saved findings.json at {json_path}\n")
+        # ensure plain Python ints for indexing
+        centers = [(int(c[0]), int(c[1]), int(c[2])) for c in filtered]
+
+        # extract all patches, then score them in one batched pass
+        patches = [patch_mod.extract_patch(vol_res, center, size=32) for center in centers]
+        feats = feat_mod.extract_batch_features(patches, spacing=[1.0,1.0,1.0], size=32)
+
+        features_raw = []
+        for center, ft in zip(centers, feats):
+
+            # add type
+            ft["type"] = type_mod.classify_nodule_type(ft["hu_mean"])
+
+            # add corrected lobe classifier
+            ft["lobe"] = lobe_mod.classify_lobe(center, vol_res.shape)
+
+            # enforce valid location field
+            ft["location"] = ft["lobe"]
+
+            # add bbox
+            cz, cy, cx = center
+            ft["bbox"] = {
+                "z": [cz - 16, cz + 15],
+                "y": [cy - 16, cy + 15],
+                "x": [cx - 16, cx + 15]
+            }
+
+            features_raw.append(ft)
+
+        # -------------------------
+        # 9. Smart filtering (quality)
+        # -------------------------
+        prof.next_stage("9_smart_filter")
+        print("\n[9] Smart filtering (HU > -800, size >4mm, clustering)...")
+        filtered_final, features_final = smart_mod.smart_filter(filtered, features_raw)
+        print(f"[OK] Final nodules after smart filtering: {len(filtered_final)}")
+
+        # -------------------------
+        # 10. Risk prediction
+        # -------------------------
+        prof.next_stage("10_risk")
+        print("\n[10] Loading risk model...")
+        # FIXED MODEL PATHS (do not double prefix backend-dinesh)
+        model_path = ROOT / "models" / "risk_head" / "risk_head.pth"
+        scaler_path = ROOT / "models" / "risk_head" / "risk_scaler.pkl"
+
+        risk = risk_mod.RiskHead(model_path, scaler_path)
+
+        # ------------------- RISK BLOCK -------------------
+        def sigmoid(x):
+            return 1.0 / (1.0 + np.exp(-x))
+
+        # feature order matches training: hu_mean, hu_std, long_axis_mm, volume_mm3
+        X = np.array([
+            [float(ft.get("hu_mean", -800.0)),
+             float(ft.get("hu_std", 0.0)),
+             float(ft.get("long_axis_mm", 0.0)),
+             float(ft.get("volume_mm3", 0.0))]
+            for ft in features_final
+        ], dtype=np.float32).reshape(-1, 4)
+        hu, std, la, vol = (X[:, i].astype(np.float64) for i in range(4))
+        T = 30   # larger T for more stable MC estimate
+
+        if getattr(args, "risk_source", "heuristic") == "model":
+            print("[10.1] Predicting malignancy with batched MC-dropout (single forward pass)...")
+            p_mean, _ = risk.predict_mc_batch(X, T=T)
+            p_point = raw_lin = p_mean
+        else:
+            print("[10.1] Predicting malignancy with normalized features + noisy MC uncertainty...")
+
+            # ---- Normalization (stable, bounded) ----
+            # Expected typical ranges:
+            #  la: 0..50 mm,  vol: 0..50000 mm3, hu: -1000..+300, std: 0..400
+            # ---- Linear score with modest weights (keeps raw near sigmoid knee) ----
+            raw_lin = (
+                0.6  * (la / 30.0)              # size influence
+              + 0.25 * ((hu + 800.0) / 600.0)   # density influence (normalized)
+              + 0.35 * (vol / 20000.0)          # volume influence
+              + 0.25 * (std / 150.0)            # heterogeneity
+            )
+            # small per-nodule jitter to break ties (mean 0, sd 0.1)
+            raw_lin = raw_lin + np.random.normal(0.0, 0.1, size=raw_lin.shape)
+
+            # shift so typical raw_lin sits around ~0.0..2.0 (sigmoid sensitive)
+            raw = raw_lin - 1.0
+            p_point = sigmoid(raw)
+
+            # ---- MC-dropout style uncertainty using noise sampling, all (N, T) at once ----
+            noise = np.random.normal(0.0, 0.35, size=(raw.shape[0], T))  # stronger noise = more entropy
+            p_mean = sigmoid(raw[:, None] + noise).mean(axis=1)
+
+        # numerical safety for entropy
+        p_clip = np.clip(p_mean, 1e-9, 1.0 - 1e-9)
+        entropy = -(p_clip * np.log(p_clip) + (1 - p_clip) * np.log(1 - p_clip))
+
+        malignancy_scores = [float(p) for p in np.clip(p_point, 0.05, 0.90)]
+        uncertainties = [
+            {
+                "confidence": float(p),
+                "entropy": float(e),
+                "needs_review": bool(e > 0.35)
+            }
+            for p, e in zip(p_mean, entropy)
+        ]
+
+        # ---- quick debug print (small, safe) ----
+        try:
+            print(f"[RISK DEBUG] raw min/max/mean = {raw_lin.min():.3f}/{raw_lin.max():.3f}/{raw_lin.mean():.3f}")
+            for i in range(min(5, len(malignancy_scores))):
+                print(f"[RISK DEBUG] sample {i}: la={la[i]:.2f}, hu={hu[i]:.1f}, vol={vol[i]:.1f}, std={std[i]:.1f}, p={malignancy_scores[i]:.3f}, ent={uncertainties[i]['entropy']:.3f}")
+        except Exception:
+            pass
+        # -------------------------------------------------------------------------
+
+        # -------------------------
+        # 11. Compute lung-level metrics
+        # -------------------------
+        prof.next_stage("11_lung_metrics")
+        print("\n[11] Computing lung-level metrics...")
+        # metrics are gathered over lung voxels only (no masked full-volume copy)
+        lung_metrics = builder_mod.compute_lung_health_metrics(vol_res, new_spacing, lung_mask=lung_mask)
+        print("[OK] Emphysema {:.3f}, fibrosis {:.3f}, consolidation {:.3f}".format(*lung_metrics))
+
+        # -------------------------
+        # 12. Build JSON
+        # -------------------------
+        prof.next_stage("12_build_json")
+        print("\n[12] Building findings.json...")
+        json_path = OUT_DIR / f"{study_id}_findings.json"
+
+        processing_time = time.time() - start_proc
+
+        builder_mod.build_findings_json(
+            study_id=study_id,
+            spacing=new_spacing,
+            volume_shape=vol_res.shape,
+            filtered_candidates=filtered_final,
+            features=features_final,
+            malignancy_scores=malignancy_scores,
+            uncertainties=uncertainties,
+            output_path=str(json_path),
+            processing_time_seconds=processing_time,
+            lung_metrics=lung_metrics
+        )
+        print(f"[DONE] Saved findings.json at {json_path}\n")
+    finally:
+        prof.finish()
 
 
 
@@ -345,5 +471,11 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--study_folder", required=True, help="Path to patient folder containing DICOM series")
     parser.add_argument("--study_id", required=False, help="Study ID to save into JSON")
+    parser.add_argument("--risk_source", choices=["heuristic", "model"], default="heuristic",
+                        help="Malignancy score source: calibrated heuristic or RiskHead MC-dropout")
+    parser.add_argument("--profile", action="store_true",
+                        help="Record wall/CPU time and peak RSS per stage into {study_id}_profile.json")
+    parser.add_argument("--profile_stage", required=False,
+                        help="Stage number to run under cProfile (e.g. 8); dumped next to the profile")
     args = parser.parse_args()
     main(args)
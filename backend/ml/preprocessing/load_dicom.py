@@ -2,11 +2,19 @@ import SimpleITK as sitk
 import numpy as np
 import os
 
-def load_dicom_series(dicom_folder):
+def read_dicom_image(dicom_folder, file_names=None):
+    """
+    Read a DICOM series into a SITK image (no numpy conversion).
+    file_names: optional slice-ordered file list (e.g. from select_series.index_study);
+    when given, the folder is not rescanned and only that series is read.
+    """
     reader = sitk.ImageSeriesReader()
-    dicom_names = reader.GetGDCMSeriesFileNames(dicom_folder)
+    dicom_names = file_names or reader.GetGDCMSeriesFileNames(dicom_folder)
     reader.SetFileNames(dicom_names)
-    image = reader.Execute()
+    return reader.Execute()
+
+def load_dicom_series(dicom_folder, file_names=None):
+    image = read_dicom_image(dicom_folder, file_names)
 
     volume = sitk.GetArrayFromImage(image).astype(np.int16)  # (Z,Y,X)
     spacing = list(image.GetSpacing())[::-1]  # (Z,Y,X)
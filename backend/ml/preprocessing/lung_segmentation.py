@@ -2,8 +2,12 @@ import SimpleITK as sitk
 from lungmask import mask
 
 def segment_lungs(volume):
-    # Convert numpy array → SITK image
-    img = sitk.GetImageFromArray(volume)
+    # Volume objects hand over their cached SITK image (with real geometry);
+    # plain numpy arrays are converted here
+    if hasattr(volume, "to_sitk"):
+        img = volume.to_sitk()
+    else:
+        img = sitk.GetImageFromArray(volume)
 
     # This is the correct API for older lungmask versions
     mask_array = mask.apply(img)     # <-- THIS WORKS FOR YOUR VERSION
@@ -1,25 +1,128 @@
 import SimpleITK as sitk
 import numpy as np
 
-def resample_to_iso(volume, spacing, new_spacing=[1.0,1.0,1.0]):
-    img = sitk.GetImageFromArray(volume)
-    img.SetSpacing(spacing[::-1])  # simpleitk uses (x,y,z)
 
-    original_size = img.GetSize()
-    original_spacing = img.GetSpacing()
+def _as_array(volume):
+    """numpy (Z,Y,X) array for either an ndarray or a SITK image (zero-copy view)."""
+    if isinstance(volume, sitk.Image):
+        return sitk.GetArrayViewFromImage(volume)
+    return np.asarray(volume)
 
-    new_size = [
-        int(round(original_size[0] * original_spacing[0] / new_spacing[2])),
-        int(round(original_size[1] * original_spacing[1] / new_spacing[1])),
-        int(round(original_size[2] * original_spacing[2] / new_spacing[0])),
+
+def _axis_weights(n_in, n_out, scale):
+    """Source indices and linear weights for one axis (edge-clamped)."""
+    pos = np.arange(n_out, dtype=np.float64) * scale
+    pos = np.clip(pos, 0.0, n_in - 1)
+    i0 = np.floor(pos).astype(np.intp)
+    i1 = np.minimum(i0 + 1, n_in - 1)
+    w = (pos - i0).astype(np.float32)
+    return i0, i1, w
+
+
+def _lerp(arr, axis, i0, i1, w):
+    shape = [1, 1, 1]
+    shape[axis] = -1
+    w = w.reshape(shape)
+    a = np.take(arr, i0, axis=axis)
+    b = np.take(arr, i1, axis=axis)
+    return a * (1.0 - w) + b * w
+
+
+def lung_bbox(mask, margin=5):
+    """
+    Bounding box of a binary mask as ((z0,z1),(y0,y1),(x0,x1)), padded by
+    `margin` voxels and clipped to the volume. Returns None for an empty mask.
+    """
+    idx = np.nonzero(mask)
+    if idx[0].size == 0:
+        return None
+    return tuple(
+        (max(0, int(i.min()) - margin), min(n, int(i.max()) + 1 + margin))
+        for i, n in zip(idx, mask.shape)
+    )
+
+
+def resample_to_iso(volume, spacing, new_spacing=[1.0,1.0,1.0],
+                    tol=0.01, chunk_z=32, bbox=None, out=None):
+    """
+    Trilinear resampling of a (Z,Y,X) volume computed directly on numpy
+    buffers, one output z-chunk at a time, so peak memory is the output
+    plus a few slabs instead of several full-size SITK copies.
+
+    volume:      numpy array or SITK image (read through a zero-copy view; keep
+                 the image alive while the fast-path result is in use)
+    spacing:     [sz,sy,sx] in mm
+    tol:         axes whose spacing is within `tol` mm of the target are left
+                 untouched; if all three are, the input is returned as-is
+    bbox:        optional ((z0,z1),(y0,y1),(x0,x1)) in input voxels; only this
+                 region (e.g. from lung_bbox) is resampled
+    out:         optional preallocated output array
+
+    Returns (new_vol, new_spacing) as before. Axes skipped by the tolerance
+    check keep their original spacing in the returned list.
+    """
+    vol = _as_array(volume)
+    if bbox is not None:
+        (z0, z1), (y0, y1), (x0, x1) = bbox
+        vol = vol[z0:z1, y0:y1, x0:x1]
+
+    spacing = [float(s) for s in spacing]
+    new_spacing = [float(s) for s in new_spacing]
+    skip = [abs(s - n) <= tol for s, n in zip(spacing, new_spacing)]
+
+    # fast path: already (close enough to) the target grid
+    if all(skip):
+        return vol, spacing
+
+    out_spacing = [s if k else n for s, n, k in zip(spacing, new_spacing, skip)]
+    in_shape = vol.shape
+    out_shape = tuple(
+        n if k else int(round(n * s / ns))
+        for n, s, ns, k in zip(in_shape, spacing, new_spacing, skip)
+    )
+
+    if out is None:
+        out = np.empty(out_shape, dtype=vol.dtype)
+    elif out.shape != out_shape:
+        raise ValueError(f"out has shape {out.shape}, expected {out_shape}")
+
+    weights = [
+        None if k else _axis_weights(n_in, n_out, ns / s)
+        for n_in, n_out, s, ns, k in zip(in_shape, out_shape, spacing, new_spacing, skip)
     ]
+    is_int = np.issubdtype(out.dtype, np.integer)
+    step = max(1, int(chunk_z))
+
+    for oz0 in range(0, out_shape[0], step):
+        oz1 = min(out_shape[0], oz0 + step)
+
+        if weights[0] is None:
+            slab = vol[oz0:oz1].astype(np.float32)
+        else:
+            i0, i1, w = (a[oz0:oz1] for a in weights[0])
+            lo, hi = int(i0.min()), int(i1.max()) + 1
+            src = vol[lo:hi].astype(np.float32)
+            slab = _lerp(src, 0, i0 - lo, i1 - lo, w)
+
+        for axis in (1, 2):
+            if weights[axis] is not None:
+                slab = _lerp(slab, axis, *weights[axis])
+
+        if is_int:
+            np.rint(slab, out=slab)
+        out[oz0:oz1] = slab
 
-    resampler = sitk.ResampleImageFilter()
-    resampler.SetOutputSpacing(new_spacing[::-1])
-    resampler.SetSize(new_size[::-1])
-    resampler.SetInterpolator(sitk.sitkLinear)
+    return out, out_spacing
 
-    new_img = resampler.Execute(img)
-    new_vol = sitk.GetArrayFromImage(new_img)
 
-    return new_vol, new_spacing
+def resample_volume(volume, new_spacing=[1.0,1.0,1.0], **kwargs):
+    """
+    resample_to_iso() for a Volume: reads the array without copying and
+    returns a new Volume on the resampled grid (origin shifted if bbox is used).
+    """
+    arr, spacing = resample_to_iso(volume.array, volume.spacing, new_spacing, **kwargs)
+    bbox = kwargs.get("bbox")
+    origin = volume.index_to_physical([lo for lo, _ in bbox]) if bbox is not None else None
+    if arr is volume.array and origin is None:
+        return volume
+    return volume.with_array(arr, spacing=spacing, origin=origin)
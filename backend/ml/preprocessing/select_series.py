@@ -1,4 +1,32 @@
 import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pydicom
+from pydicom.errors import InvalidDicomError
+
+INDEX_VERSION = 1
+INDEX_FILENAME = ".series_index.json"
+
+# Index caches live outside the (possibly read-only / shared) study folders,
+# one file per study under backend/outputs/series_index/ by default.
+INDEX_CACHE_DIR = os.getenv(
+    "SERIES_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                 "outputs", "series_index"),
+)
+
+# Only these tags are parsed; pixel data is never read.
+HEADER_TAGS = [
+    "StudyInstanceUID", "SeriesInstanceUID", "Modality", "SliceThickness",
+    "ConvolutionKernel", "ImageType", "SeriesDescription",
+    "ImagePositionPatient", "ImageOrientationPatient", "InstanceNumber",
+]
+
+# Reconstruction kernels preferred for HU-based detection (soft/standard).
+SOFT_KERNELS = ("STANDARD", "SOFT", "B30", "B31", "B35", "FC10", "FC18", "FC02")
+
 
 def find_main_ct_series(patient_folder):
     """
@@ -17,3 +45,165 @@ def find_main_ct_series(patient_folder):
             best_folder = root
 
     return best_folder, best_count
+
+
+# ---------------------------------------------------------------
+# Header-based study index
+# ---------------------------------------------------------------
+def _slice_position(ds):
+    """Position along the slice normal (falls back to InstanceNumber)."""
+    try:
+        ipp = [float(v) for v in ds.ImagePositionPatient]
+        iop = [float(v) for v in ds.ImageOrientationPatient]
+        nx = iop[1] * iop[5] - iop[2] * iop[4]
+        ny = iop[2] * iop[3] - iop[0] * iop[5]
+        nz = iop[0] * iop[4] - iop[1] * iop[3]
+        return ipp[0] * nx + ipp[1] * ny + ipp[2] * nz
+    except (AttributeError, TypeError, ValueError, IndexError):
+        try:
+            return float(getattr(ds, "InstanceNumber", 0) or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+
+def _read_header(path):
+    """Parse the selected header tags of one file; None if it is not DICOM."""
+    try:
+        ds = pydicom.dcmread(path, stop_before_pixels=True, specific_tags=HEADER_TAGS)
+    except (InvalidDicomError, OSError, ValueError):
+        return None
+    uid = getattr(ds, "SeriesInstanceUID", None)
+    if not uid:
+        return None
+    kernel = getattr(ds, "ConvolutionKernel", "") or ""
+    if isinstance(kernel, (list, pydicom.multival.MultiValue)):
+        kernel = "\\".join(str(k) for k in kernel)
+    try:
+        thickness = float(getattr(ds, "SliceThickness", 0) or 0)
+    except (TypeError, ValueError):
+        thickness = 0.0
+    return {
+        "study_uid": str(getattr(ds, "StudyInstanceUID", "")),
+        "series_uid": str(uid),
+        "modality": str(getattr(ds, "Modality", "")),
+        "slice_thickness": thickness,
+        "kernel": str(kernel),
+        "image_type": [str(t) for t in (getattr(ds, "ImageType", []) or [])],
+        "description": str(getattr(ds, "SeriesDescription", "")),
+        "position": _slice_position(ds),
+    }
+
+
+def _load_cache(cache_path):
+    try:
+        with open(cache_path, "r") as f:
+            data = json.load(f)
+        if data.get("version") == INDEX_VERSION:
+            return data.get("dirs", {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def default_cache_path(patient_folder):
+    """Index cache file for a study, keyed by its absolute path."""
+    key = hashlib.sha1(os.path.abspath(patient_folder).encode("utf-8")).hexdigest()[:16]
+    name = f"{os.path.basename(os.path.normpath(patient_folder))}_{key}.json"
+    return os.path.join(INDEX_CACHE_DIR, name)
+
+
+def _save_cache(cache_path, dirs):
+    try:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": INDEX_VERSION, "dirs": dirs}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # unwritable cache location: run without a persistent index
+        pass
+
+
+def index_study(patient_folder, cache_path=None, max_workers=None):
+    """
+    Read DICOM headers under `patient_folder` and group them by SeriesInstanceUID.
+
+    Headers are read in parallel. The per-directory results are cached on disk
+    (default: outputs/series_index/, see default_cache_path) keyed by each
+    directory's mtime, so re-indexing a study only re-reads directories whose contents
+    changed.
+
+    Returns a list of series dicts:
+      {series_uid, folder, files, num_slices, modality, slice_thickness,
+       kernel, image_type, description, study_uid}
+    with `files` sorted by slice position.
+    """
+    patient_folder = os.path.abspath(patient_folder)
+    if cache_path is None:
+        cache_path = default_cache_path(patient_folder)
+
+    cached = _load_cache(cache_path)
+    dirs = {}
+    to_read = []
+
+    for root, _, files in os.walk(patient_folder):
+        rel = os.path.relpath(root, patient_folder)
+        mtime = os.stat(root).st_mtime_ns
+        entry = cached.get(rel)
+        if entry is not None and entry.get("mtime_ns") == mtime:
+            dirs[rel] = entry
+            continue
+        dirs[rel] = {"mtime_ns": mtime, "files": {}}
+        for name in files:
+            if name == INDEX_FILENAME:
+                continue  # in-study index left by older versions
+            to_read.append((rel, name, os.path.join(root, name)))
+
+    if to_read:
+        workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            headers = pool.map(_read_header, [p for _, _, p in to_read])
+            for (rel, name, _), hdr in zip(to_read, headers):
+                dirs[rel]["files"][name] = hdr
+        _save_cache(cache_path, dirs)
+    elif dirs.keys() != cached.keys():
+        _save_cache(cache_path, dirs)
+
+    series = {}
+    for rel, entry in dirs.items():
+        folder = os.path.normpath(os.path.join(patient_folder, rel))
+        for name, hdr in entry["files"].items():
+            if hdr is None:
+                continue
+            s = series.get(hdr["series_uid"])
+            if s is None:
+                s = {k: v for k, v in hdr.items() if k != "position"}
+                s.update(folder=folder, files=[])
+                series[hdr["series_uid"]] = s
+            s["files"].append((hdr.get("position", 0.0), os.path.join(folder, name)))
+
+    for s in series.values():
+        # slice order along the patient axis, ready for sitk.ImageSeriesReader
+        s["files"] = [p for _, p in sorted(s["files"])]
+        s["num_slices"] = len(s["files"])
+    return list(series.values())
+
+
+def rank_series(series):
+    """Sort key: CT first, non-localizer, most slices, thinnest, soft kernel."""
+    is_ct = series["modality"].upper() == "CT"
+    is_localizer = any(t.upper() == "LOCALIZER" for t in series["image_type"])
+    thickness = series["slice_thickness"] or 99.0
+    soft = any(k in series["kernel"].upper() for k in SOFT_KERNELS)
+    return (is_ct, not is_localizer, series["num_slices"], -thickness, soft)
+
+
+def select_main_ct_series(patient_folder, cache_path=None, max_workers=None):
+    """
+    Header-based replacement for find_main_ct_series().
+    Returns the best-ranked series dict from index_study(), or None.
+    """
+    series = index_study(patient_folder, cache_path=cache_path, max_workers=max_workers)
+    if not series:
+        return None
+    return max(series, key=rank_series)
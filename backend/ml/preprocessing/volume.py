@@ -0,0 +1,83 @@
+import SimpleITK as sitk
+import numpy as np
+
+
+class Volume:
+    """
+    CT volume shared between pipeline stages.
+
+    array:     numpy (Z,Y,X); materialised lazily from `image` as a zero-copy view
+    spacing:   [sz,sy,sx] in mm (numpy axis order, like the rest of the pipeline)
+    origin:    [oz,oy,ox] in mm
+    direction: SITK direction cosines (9 floats, SITK x,y,z order)
+    dtype:     dtype policy; the array is converted once on first access if
+               the source buffer differs (e.g. np.int16 for HU volumes)
+
+    The SITK image is only built when a stage asks for it (to_sitk) and is
+    cached, so a case allocates each full-size buffer once.
+    """
+
+    def __init__(self, array=None, spacing=(1.0, 1.0, 1.0), origin=(0.0, 0.0, 0.0),
+                 direction=None, dtype=None, image=None):
+        if array is None and image is None:
+            raise ValueError("Volume needs an array or a SITK image")
+        self._array = array
+        self._image = image
+        self.spacing = [float(s) for s in spacing]
+        self.origin = [float(o) for o in origin]
+        self.direction = tuple(direction) if direction is not None else (1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0)
+        self.dtype = np.dtype(dtype) if dtype is not None else None
+
+    @classmethod
+    def from_sitk(cls, image, dtype=None):
+        return cls(
+            spacing=list(image.GetSpacing())[::-1],
+            origin=list(image.GetOrigin())[::-1],
+            direction=image.GetDirection(),
+            dtype=dtype,
+            image=image,
+        )
+
+    @property
+    def array(self):
+        if self._array is None:
+            view = sitk.GetArrayViewFromImage(self._image)
+            if self.dtype is not None and view.dtype != self.dtype:
+                # one conversion; the SITK image no longer mirrors the array
+                self._array = view.astype(self.dtype)
+                self._image = None
+            else:
+                self._array = view
+        return self._array
+
+    @property
+    def shape(self):
+        if self._array is None:
+            return tuple(self._image.GetSize()[::-1])
+        return self._array.shape
+
+    def to_sitk(self):
+        """SITK image with this volume's geometry (built once, then cached)."""
+        if self._image is None:
+            img = sitk.GetImageFromArray(self.array)
+            img.SetSpacing(self.spacing[::-1])
+            img.SetOrigin(self.origin[::-1])
+            img.SetDirection(self.direction)
+            self._image = img
+        return self._image
+
+    def index_to_physical(self, index):
+        """(z,y,x) voxel index -> (z,y,x) physical position in mm."""
+        d = np.array(self.direction, dtype=np.float64).reshape(3, 3)
+        offset_xyz = d @ (np.asarray(index, dtype=np.float64)[::-1] * np.asarray(self.spacing[::-1]))
+        return [float(v) for v in (np.asarray(self.origin[::-1]) + offset_xyz)[::-1]]
+
+    def with_array(self, array, spacing=None, origin=None):
+        """New Volume on the same geometry (optionally new spacing/origin)."""
+        return Volume(
+            array=array,
+            spacing=self.spacing if spacing is None else spacing,
+            origin=self.origin if origin is None else origin,
+            direction=self.direction,
+            dtype=self.dtype,
+        )
@@ -40,6 +40,16 @@ class RiskHead:
         x_scaled = self.scaler.transform(x)
         return torch.tensor(x_scaled, dtype=torch.float32).to(self.device)
 
+    def _preprocess_batch(self, feature_matrix):
+        x = np.asarray(feature_matrix, dtype=np.float32).reshape(-1, 4)
+        x_scaled = self.scaler.transform(x)
+        return torch.tensor(x_scaled, dtype=torch.float32).to(self.device)
+
+    def _set_dropout(self, enabled):
+        for m in self.model.modules():
+            if isinstance(m, nn.Dropout):
+                m.train(enabled)
+
     def predict(self, feature_list):
         """Deterministic single prediction"""
         x_t = self._preprocess(feature_list)
@@ -75,3 +85,42 @@ class RiskHead:
         p_mean = float(np.clip(probs.mean(), 1e-9, 1.0 - 1e-9))
         entropy = float(-(p_mean * np.log(p_mean) + (1 - p_mean) * np.log(1 - p_mean)))
         return p_mean, entropy
+
+    def predict_batch(self, feature_matrix):
+        """
+        Deterministic prediction for many nodules at once.
+        feature_matrix: (N,4) rows of [hu_mean, hu_std, long_axis_mm, volume_mm3]
+        Returns np.ndarray (N,) of probabilities in [0,1]
+        """
+        if len(feature_matrix) == 0:
+            return np.zeros(0, dtype=np.float64)
+        x_t = self._preprocess_batch(feature_matrix)
+        with torch.no_grad():
+            self.model.eval()
+            out = self.model(x_t).cpu().numpy().ravel().astype(np.float64)
+        return np.clip(out, 0.0, 1.0)
+
+    def predict_mc_batch(self, feature_matrix, T=20):
+        """
+        MC-dropout for all nodules in a single (N*T, 4) forward pass.
+        Returns (p_mean (N,), entropy (N,)) as np.ndarrays
+        """
+        if len(feature_matrix) == 0:
+            return np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.float64)
+        T = int(T)
+        x_t = self._preprocess_batch(feature_matrix)
+        n = x_t.shape[0]
+        x_rep = x_t.repeat_interleave(T, dim=0)   # rows: n0 x T, n1 x T, ...
+
+        self._set_dropout(True)
+        try:
+            with torch.no_grad():
+                probs = self.model(x_rep).cpu().numpy().reshape(n, T).astype(np.float64)
+        finally:
+            # restore eval mode
+            self.model.eval()
+
+        probs = np.clip(probs, 1e-9, 1.0 - 1e-9)
+        p_mean = np.clip(probs.mean(axis=1), 1e-9, 1.0 - 1e-9)
+        entropy = -(p_mean * np.log(p_mean) + (1 - p_mean) * np.log(1 - p_mean))
+        return p_mean, entropy
@@ -1,5 +1,10 @@
 import os
 import glob
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 import pydicom
 import scipy.ndimage
@@ -12,6 +17,8 @@ import cv2
 LIDC_PATH = Path("../../../../LIDC-IDRI")
 OUTPUT_PATH = Path("data/lidc_patches")
 OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
+SHARD_PATH = OUTPUT_PATH / "shards"
+MANIFEST_PATH = OUTPUT_PATH / "manifest.jsonl"
 PATCH_SIZE = 64
 TARGET_SPACING = (1.0, 1.0, 1.0)
 
@@ -73,80 +80,191 @@ def find_dicom_series(root_path):
             series_paths.append(Path(root))
     return series_paths
 
+def extract_scan_patches(series_path, scan_id, max_nodules=5, max_patches=3):
+    """
+    Load, resample and cut nodule patches for one series.
+    Returns a list of dicts {name, image, label, malignancy}; nothing is written.
+    """
+    # Load Scan
+    slices = load_scan(series_path)
+    image = get_pixels_hu(slices)
+    image_resampled, resize_factor = resample(image, slices, TARGET_SPACING)
+
+    # Find XML
+    xml_files = list(series_path.parent.glob("*.xml")) # usually in parent or same dir
+    # In LIDC structure, XML is often one level up or in same folder.
+    # Check current folder first, then parent.
+    if not xml_files:
+         xml_files = list(series_path.glob("*.xml"))
+
+    if not xml_files:
+        print(f"No XML found for {scan_id}")
+        return []
+
+    nodules = parse_xml_nodules(xml_files[0])
+    print(f"Scan {scan_id}: {len(nodules)} nodule annotations found.")
+
+    # Group by Z-position simplified (real clustering is complex, we just take unique Zs with >2 annotations for demo)
+    # For this demo, simply take the first 3 nodules found
+    z_positions = np.array([float(s.ImagePositionPatient[2]) for s in slices])
+    patches = []
+    for i, nod in enumerate(nodules[:max_nodules]):
+         # Find Z-index in resampled volume
+         # Match Z-position: closest slice index
+         z_idx = int(np.argmin(np.abs(z_positions - nod['z_pos'])))
+
+         # Scale Z index to resampled space
+         z_resampled = int(z_idx * resize_factor[0])
+
+         # Center X, Y (Assume centered for demo since XML ROI parsing is tedious without pylidc)
+         # In real implementation we need ROI center.
+         # Here we take center of image as placeholder if ROI center not parsed
+         y_resampled = image_resampled.shape[1] // 2
+         x_resampled = image_resampled.shape[2] // 2
+
+         # Extract Patch
+         z_start = max(0, z_resampled - PATCH_SIZE // 2)
+         y_start = max(0, y_resampled - PATCH_SIZE // 2)
+         x_start = max(0, x_resampled - PATCH_SIZE // 2)
+
+         patch = image_resampled[z_start:z_start+PATCH_SIZE, y_start:y_start+PATCH_SIZE, x_start:x_start+PATCH_SIZE]
+
+         if patch.shape != (PATCH_SIZE, PATCH_SIZE, PATCH_SIZE):
+             continue # padding needed, skip for now
+
+         patches.append({
+             "name": f"{scan_id}_nodule_{i}",
+             "image": patch,
+             "label": 1 if nod['malignancy'] > 3 else 0,
+             "malignancy": nod['malignancy'],
+         })
+         if len(patches) >= max_patches:
+             break
+    return patches
+
 def process_single_scan(series_path, scan_id):
     try:
-        # Load Scan
-        slices = load_scan(series_path)
-        image = get_pixels_hu(slices)
-        image_resampled, resize_factor = resample(image, slices, TARGET_SPACING)
-        
-        # Find XML
-        xml_files = list(series_path.parent.glob("*.xml")) # usually in parent or same dir
-        # In LIDC structure, XML is often one level up or in same folder.
-        # Check current folder first, then parent.
-        if not xml_files:
-             xml_files = list(series_path.glob("*.xml"))
-
-        if not xml_files:
-            print(f"No XML found for {scan_id}")
-            return
-
-        nodules = parse_xml_nodules(xml_files[0])
-        print(f"Scan {scan_id}: {len(nodules)} nodule annotations found.")
-        
-        # Group by Z-position simplified (real clustering is complex, we just take unique Zs with >2 annotations for demo)
-        # For this demo, simply take the first 3 nodules found
-        processed_nodules = 0
-        for i, nod in enumerate(nodules[:5]): 
-             # Find Z-index in resampled volume
-             # Match Z-position. slices[k].ImagePositionPatient[2]
-             
-             # Find closest slice index
-             min_dist = 9999
-             z_idx = -1
-             for k, s in enumerate(slices):
-                 dist = abs(s.ImagePositionPatient[2] - nod['z_pos'])
-                 if dist < min_dist:
-                     min_dist = dist
-                     z_idx = k
-             
-             if z_idx == -1: continue
-
-             # Scale Z index to resampled space
-             z_resampled = int(z_idx * resize_factor[0])
-             
-             # Center X, Y (Assume centered for demo since XML ROI parsing is tedious without pylidc)
-             # In real implementation we need ROI center. 
-             # Here we take center of image as placeholder if ROI center not parsed
-             y_resampled = image_resampled.shape[1] // 2
-             x_resampled = image_resampled.shape[2] // 2
-             
-             # Extract Patch
-             z_start = max(0, z_resampled - PATCH_SIZE // 2)
-             y_start = max(0, y_resampled - PATCH_SIZE // 2)
-             x_start = max(0, x_resampled - PATCH_SIZE // 2)
-             
-             patch = image_resampled[z_start:z_start+PATCH_SIZE, y_start:y_start+PATCH_SIZE, x_start:x_start+PATCH_SIZE]
-             
-             if patch.shape != (PATCH_SIZE, PATCH_SIZE, PATCH_SIZE):
-                 continue # padding needed, skip for now
-                 
-             # Save
-             if processed_nodules < 3:
-                 out_name = OUTPUT_PATH / f"{scan_id}_nodule_{i}.npz"
-                 np.savez_compressed(out_name, image=patch, label=1 if nod['malignancy'] > 3 else 0, malignancy=nod['malignancy'])
-                 print(f"Saved {out_name}")
-                 
-                 # Save a debug image of middle slice
-                 # cv2.imwrite(str(OUTPUT_PATH / f"{scan_id}_nodule_{i}.png"), ((patch[32,:,:] + 1000) / 2000 * 255).astype(np.uint8))
-                 processed_nodules += 1
+        for p in extract_scan_patches(series_path, scan_id):
+            out_name = OUTPUT_PATH / f"{p['name']}.npz"
+            np.savez_compressed(out_name, image=p["image"], label=p["label"], malignancy=p["malignancy"])
+            print(f"Saved {out_name}")
+
+            # Save a debug image of middle slice
+            # cv2.imwrite(str(OUTPUT_PATH / f"{p['name']}.png"), ((p['image'][32,:,:] + 1000) / 2000 * 255).astype(np.uint8))
 
     except Exception as e:
         print(f"Error processing {scan_id}: {e}")
 
+# ---------------------------------------------------------------
+# Parallel, resumable extraction
+# ---------------------------------------------------------------
+def series_key(series_path, root=None):
+    """Stable manifest key for a series (path relative to the LIDC root)."""
+    try:
+        return Path(series_path).relative_to(root or LIDC_PATH).as_posix()
+    except ValueError:
+        return Path(series_path).as_posix()
+
+def load_manifest(manifest_path=MANIFEST_PATH):
+    """Keys of series already finished (status 'done') in the manifest."""
+    done = set()
+    if not Path(manifest_path).exists():
+        return done
+    with open(manifest_path, "r") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # torn last line after a crash
+            if rec.get("status") == "done":
+                done.add(rec["key"])
+    return done
+
+def _append_manifest(manifest_path, record):
+    with open(manifest_path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+def write_shard(patches, shard_file):
+    """
+    One compressed shard per series: patches stacked into an int16
+    (N,64,64,64) array plus label/malignancy/name vectors. Written to a temp
+    file and renamed, so a crash never leaves a half-written shard.
+    """
+    tmp = shard_file.with_name(shard_file.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.savez_compressed(
+            f,
+            image=np.stack([p["image"] for p in patches]).astype(np.int16),
+            label=np.array([p["label"] for p in patches], dtype=np.int8),
+            malignancy=np.array([p["malignancy"] for p in patches], dtype=np.int8),
+            name=np.array([p["name"] for p in patches]),
+        )
+    os.replace(tmp, shard_file)
+
+def _shard_worker(job):
+    """Process-pool task: extract one series and write its shard."""
+    series_path, key, shard_dir = job
+    t0 = time.time()
+    scan_id = Path(series_path).parent.name
+    record = {"key": key, "scan_id": scan_id}
+    try:
+        patches = extract_scan_patches(Path(series_path), scan_id)
+        shard = None
+        if patches:
+            digest = hashlib.sha1(key.encode()).hexdigest()[:8]
+            shard = Path(shard_dir) / f"{scan_id}_{digest}.npz"
+            write_shard(patches, shard)
+            shard = shard.name
+        record.update(status="done", shard=shard, num_patches=len(patches))
+    except Exception as e:
+        record.update(status="error", error=str(e))
+    record["seconds"] = round(time.time() - t0, 2)
+    return record
+
+def run_parallel(series, workers=None, shard_dir=SHARD_PATH, manifest_path=MANIFEST_PATH, resume=True):
+    """
+    Extract patches for all series with a process pool. Finished series are
+    appended to a JSONL manifest as they complete; with resume=True they are
+    skipped on the next run.
+    """
+    shard_dir = Path(shard_dir)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    done = load_manifest(manifest_path) if resume else set()
+    jobs = [(str(s), series_key(s), str(shard_dir)) for s in series]
+    todo = [j for j in jobs if j[1] not in done]
+    print(f"{len(jobs)} series, {len(jobs) - len(todo)} already done, {len(todo)} to process")
+    if not todo:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    t0 = time.time()
+    n_ok = n_err = n_patches = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_shard_worker, j) for j in todo]
+        for fut in tqdm(as_completed(futures), total=len(futures), desc="series"):
+            rec = fut.result()
+            _append_manifest(manifest_path, rec)
+            if rec["status"] == "done":
+                n_ok += 1
+                n_patches += rec["num_patches"]
+            else:
+                n_err += 1
+                print(f"Error processing {rec['scan_id']}: {rec['error']}")
+
+    minutes = max(time.time() - t0, 1e-9) / 60.0
+    print(f"Done: {n_ok} series ({n_patches} patches), {n_err} errors, "
+          f"{(n_ok + n_err) / minutes:.1f} series/min with {workers} workers")
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract LIDC-IDRI nodule patches into shards")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--limit", type=int, default=None, help="Only process the first N series")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore the manifest and redo every series")
+    args = parser.parse_args()
+
     series = find_dicom_series(LIDC_PATH)
-    print(f"Processing first 2 of {len(series)} scans...")
-    for s in series[:2]:
-        scan_id = s.parent.name # LIDC-IDRI-XXXX
-        process_single_scan(s, scan_id)
+    if args.limit:
+        series = series[:args.limit]
+    run_parallel(series, workers=args.workers, resume=not args.no_resume)
@@ -0,0 +1,198 @@
+"""
+Test the pooled LLM client against a local stub chat-completions server.
+
+Run with pytest, or directly: python test_llm_client.py
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+os.environ.setdefault("LLM_BACKOFF_BASE", "0.05")
+import app.llm_client as llm_client
+from app.llm_client import AsyncLLMClient, LLMError
+
+
+# --- Stub server: scripted status codes per request, tracks concurrency ---
+class Stub:
+    script = []          # status codes to return, in order (then 200)
+    delay = 0.0
+    lock = threading.Lock()
+    calls = 0
+    in_flight = 0
+    peak = 0
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with Stub.lock:
+            Stub.calls += 1
+            Stub.in_flight += 1
+            Stub.peak = max(Stub.peak, Stub.in_flight)
+            status = Stub.script.pop(0) if Stub.script else 200
+        time.sleep(Stub.delay)
+        with Stub.lock:
+            Stub.in_flight -= 1
+
+        if status == 200:
+            reply = {"choices": [{"message": {"content": f"echo: {body['messages'][-1]['content']}"}}]}
+            data = json.dumps(reply).encode()
+        else:
+            data = b'{"error": "stub"}'
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", "0.05")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except BrokenPipeError:
+            pass  # client timed out
+
+
+def reset(script=(), delay=0.0):
+    Stub.script, Stub.delay, Stub.calls, Stub.peak = list(script), delay, 0, 0
+
+
+_server = None
+
+
+def base_url() -> str:
+    """Start the stub server on first use; returns its URL."""
+    global _server
+    if _server is None:
+        _server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{_server.server_port}"
+
+
+MSG = [{"role": "user", "content": "hi"}]
+
+
+def run_with_client(test, **kwargs):
+    """Run `await test(client)` with a fresh client pointed at the stub."""
+    options = dict(api_key="test", base_url=base_url(), max_in_flight=3,
+                   rate_per_min=6000, burst=100, timeout=2, max_retries=3)
+    options.update(kwargs)
+
+    async def main():
+        client = AsyncLLMClient(**options)
+        try:
+            return await test(client)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(main())
+
+
+# --- Tests ---
+def test_plain_call():
+    reset()
+    assert run_with_client(lambda c: c.chat(MSG)) == "echo: hi"
+
+
+def test_retries_429_and_503_then_succeeds():
+    reset(script=[429, 503])
+    assert run_with_client(lambda c: c.chat(MSG)) == "echo: hi"
+    assert Stub.calls == 3
+
+
+def test_400_is_not_retried():
+    reset(script=[400])
+    try:
+        run_with_client(lambda c: c.chat(MSG))
+        assert False, "expected LLMError"
+    except LLMError as e:
+        assert e.status == 400
+    assert Stub.calls == 1
+
+
+def test_gives_up_after_max_retries():
+    reset(script=[500] * 10)
+    try:
+        run_with_client(lambda c: c.chat(MSG))
+        assert False, "expected LLMError"
+    except LLMError:
+        pass
+    assert Stub.calls == 4
+
+
+def test_max_in_flight_respected():
+    reset(delay=0.1)
+
+    async def burst(client):
+        await asyncio.gather(*(client.chat(MSG) for _ in range(12)))
+
+    run_with_client(burst)
+    assert Stub.peak <= 3, f"peak={Stub.peak}"
+
+
+def test_per_call_timeout():
+    reset(delay=1.0)
+    t0 = time.perf_counter()
+    try:
+        run_with_client(lambda c: c.chat(MSG, timeout=0.2))
+        assert False, "expected LLMError"
+    except LLMError:
+        pass
+    assert time.perf_counter() - t0 < 1.0 * 4
+
+
+def test_token_bucket():
+    reset()
+
+    async def burst(client):
+        await asyncio.gather(*(client.chat(MSG) for _ in range(6)))
+
+    t0 = time.perf_counter()
+    run_with_client(burst, rate_per_min=600, burst=1)  # 10/s, burst 1
+    elapsed = time.perf_counter() - t0
+    assert elapsed >= 0.45, f"{elapsed:.2f}s for 6 calls"
+
+
+def test_sync_facade_from_threads():
+    saved = llm_client.LLM_BASE_URL, llm_client.LLM_API_KEY
+    llm_client.shutdown_llm_client()
+    llm_client.LLM_BASE_URL, llm_client.LLM_API_KEY = base_url(), "test"
+    reset(delay=0.05)
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(llm_client.chat_sync(MSG))) for _ in range(10)]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        llm_client.shutdown_llm_client()
+        llm_client.LLM_BASE_URL, llm_client.LLM_API_KEY = saved
+    assert out == ["echo: hi"] * 10
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Pooled LLM client vs stub server")
+    print("=" * 60)
+
+    tests = [(name, fn) for name, fn in list(globals().items()) if name.startswith("test_")]
+    passed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            passed += 1
+            print(f"   [+] PASS  {name}")
+        except Exception as e:
+            print(f"   [x] FAIL  {name} ({type(e).__name__}: {e})")
+
+    print(f"\n   {passed}/{len(tests)} passed")
+    sys.exit(0 if passed == len(tests) else 1)
@@ -0,0 +1,161 @@
+"""
+Test single-flight coalescing and prompt hashing of llm_service._call_llm.
+
+The upstream call and the response cache are replaced by in-memory stubs.
+Run with pytest, or directly: python test_llm_service.py
+"""
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import app.llm_service as llm_service
+from app.cache_service import make_prompt_hash
+
+
+@contextmanager
+def stubbed(upstream):
+    """Run with `upstream(messages, **kwargs)` as the LLM and a dict as the cache."""
+    store = {}
+    saved = {name: getattr(llm_service, name) for name in
+             ("GROQ_API_KEY", "chat_sync", "get_cached_llm_response", "cache_llm_response")}
+    llm_service.GROQ_API_KEY = "test"
+    llm_service.chat_sync = upstream
+    llm_service.get_cached_llm_response = store.get
+    llm_service.cache_llm_response = store.__setitem__
+    try:
+        yield store
+    finally:
+        for name, value in saved.items():
+            setattr(llm_service, name, value)
+
+
+def call_concurrently(n=2, release=None):
+    """Start n identical _call_llm calls; returns [(result, exception)] per call."""
+    out = [None] * n
+
+    def worker(i):
+        try:
+            out[i] = (llm_service._call_llm("system", "question"), None)
+        except Exception as e:
+            out[i] = (None, e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+        time.sleep(0.05)  # later calls arrive while the first is in flight
+    if release is not None:
+        release.set()
+    for t in threads:
+        t.join()
+    return out
+
+
+class SlowUpstream:
+    """Blocks until released, counts calls."""
+
+    def __init__(self, reply="answer", error=None):
+        self.calls = 0
+        self.release = threading.Event()
+        self.reply, self.error = reply, error
+
+    def __call__(self, messages, **kwargs):
+        self.calls += 1
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return self.reply
+
+
+# --- Tests ---
+def test_identical_calls_share_one_request():
+    upstream = SlowUpstream()
+    with stubbed(upstream) as cache:
+        out = call_concurrently(2, upstream.release)
+        assert upstream.calls == 1
+        assert out == [("answer", None), ("answer", None)]
+        assert not llm_service._inflight
+        assert len(cache) == 1
+
+        # Later identical call is a cache hit
+        assert llm_service._call_llm("system", "question") == "answer"
+        assert upstream.calls == 1
+
+
+def test_waiters_get_leader_none_result():
+    upstream = SlowUpstream(error=RuntimeError("upstream down"))
+    with stubbed(upstream) as cache:
+        out = call_concurrently(3, upstream.release)
+        assert upstream.calls == 1
+        assert out == [(None, None)] * 3
+        assert not cache and not llm_service._inflight
+
+
+def test_waiters_get_leader_exception():
+    release = threading.Event()
+    calls = []
+
+    def failing_request(*args):
+        calls.append(args)
+        release.wait(5)
+        raise ValueError("boom")
+
+    saved = llm_service._request_llm
+    llm_service._request_llm = failing_request
+    try:
+        with stubbed(SlowUpstream()):
+            out = call_concurrently(2, release)
+    finally:
+        llm_service._request_llm = saved
+
+    assert len(calls) == 1
+    assert all(isinstance(e, ValueError) and str(e) == "boom" for _, e in out)
+    assert not llm_service._inflight
+
+
+def test_different_requests_are_not_coalesced():
+    upstream = SlowUpstream()
+    upstream.release.set()
+    with stubbed(upstream):
+        llm_service._call_llm("system", "question", temperature=0.2)
+        llm_service._call_llm("system", "question", temperature=0.3)
+        llm_service._call_llm("system", "question", max_tokens=256)
+    assert upstream.calls == 3
+
+
+def test_prompt_hash_covers_full_request():
+    base = make_prompt_hash("q", "s" * 100 + "A", model="m", temperature=0.3, max_tokens=1024)
+    assert base == make_prompt_hash("q", "s" * 100 + "A", model="m", temperature=0.3, max_tokens=1024)
+    assert base != make_prompt_hash("q", "s" * 100 + "B", model="m", temperature=0.3, max_tokens=1024)
+    assert base != make_prompt_hash("q", "s" * 100 + "A", model="other", temperature=0.3, max_tokens=1024)
+    assert base != make_prompt_hash("q", "s" * 100 + "A", model="m", temperature=0.2, max_tokens=1024)
+    assert base != make_prompt_hash("q", "s" * 100 + "A", model="m", temperature=0.3, max_tokens=256)
+
+
+def test_request_uses_hashed_model():
+    sent = []
+    with stubbed(lambda messages, **kwargs: sent.append(kwargs["model"]) or "ok"):
+        llm_service._call_llm("system", "model check")
+    assert sent == [llm_service.GROQ_MODEL]
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("llm_service single-flight + prompt hash")
+    print("=" * 60)
+
+    tests = [(name, fn) for name, fn in list(globals().items()) if name.startswith("test_")]
+    passed = 0
+    for name, fn in tests:
+        try:
+            fn()
+            passed += 1
+            print(f"   [+] PASS  {name}")
+        except Exception as e:
+            print(f"   [x] FAIL  {name} ({type(e).__name__}: {e})")
+
+    print(f"\n   {passed}/{len(tests)} passed")
+    sys.exit(0 if passed == len(tests) else 1)
@@ -37,7 +37,7 @@ export default function ReportCard({ studyId, type, disabled }: ReportCardProps)
 
         try {
             // 1. Get path from API
-            const urls = await api.getReportUrls(studyId);
+            const urls = await api.getReportUrls(studyId, isClinician ? 'clinician_report' : 'patient_report');
             const reportPath = isClinician
                 ? urls.clinician_report?.url
                 : urls.patient_report?.url;
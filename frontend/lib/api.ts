@@ -133,8 +133,10 @@ class ApiClient {
         }
     }
 
-    async getReportUrls(caseId: string): Promise<{ patient_report?: { url: string }, clinician_report?: { url: string } }> {
-        return this.request<{ patient_report?: { url: string }, clinician_report?: { url: string } }>(`/cases/reports/${caseId}`);
+    // reportType: the report about to be opened; a lazily prepared PDF is rendered only for it
+    async getReportUrls(caseId: string, reportType?: 'patient_report' | 'clinician_report'): Promise<{ patient_report?: { url: string }, clinician_report?: { url: string } }> {
+        const query = reportType ? `?report_type=${reportType}` : '';
+        return this.request<{ patient_report?: { url: string }, clinician_report?: { url: string } }>(`/cases/reports/${caseId}${query}`);
     }
 
     async getFindings(scanId: string): Promise<Findings> {